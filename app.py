@@ -1,19 +1,35 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
-import os
-from pathlib import Path
-import requests
-from io import StringIO
-from excel_storage import (
-    load_data_from_excel, save_data_to_excel,
-    add_record_to_excel, export_excel
+# Plotly, openpyxl, xlsxwriter, smtplib e requests são importados só nos caminhos
+# que os usam (gráficos, gravação, exportação, e-mail e Gist); o tempo de importação
+# é verificado com python -m wegscan.import_budget
+from email_alerts import get_email_config, send_alert_email
+from wegscan.alerts import limit_violations
+from wegscan import changelog, profiling, storage
+from wegscan.ingest import ingest_readings, update_readings
+from wegscan.dataset import apply_changes, get_dataset
+from wegscan.derived import get_derived
+from wegscan.writer import get_writer
+from wegscan.measurements import ALERT_LIMITS, MEASURED_VARIABLES
+from wegscan.charts import (
+    build_fleet_heatmap, build_load_chart, build_load_scatter, build_spectrum_chart, build_trend_chart, has_chart_data
 )
-from email_alerts import (
-    check_and_send_alerts, get_recent_alerts, is_alert_triggered, ALERT_LIMITS
+from wegscan.reports import generate_report, REPORT_FORMATS
+from wegscan.data_index import TimeIndex, next_data_version
+from wegscan.stats_engine import get_statistics, variable_statistics, is_vibration
+from wegscan.exports import (
+    export_to_excel, export_to_csv, export_analytics, cached_export, ANALYTICS_FORMATS, EXPORT_LABELS
+)
+from wegscan.fleet import MAX_GAP, cached_fleet_grid
+from wegscan.load_analysis import (
+    ANOMALY_SIGMA, DEFAULT_WINDOW, LOAD_VARIABLES, WINDOWS, cached_load_analysis, load_summary, period_rows
+)
+from wegscan.spectra import BANDS
+from wegscan.waveforms import AXES, KINDS, cached_features, cached_spectrum, get_waveform_store, read_capture_file
+from wegscan.data_table import (
+    PAGE_SIZES, out_of_limits_mask, cached_row_positions, page_count, get_page, column_summary, cell_changes
 )
 
 # Configuração da página
@@ -32,8 +48,8 @@ if 'change_log' not in st.session_state:
 # Dados são salvos automaticamente em CSV no repositório
 
 
-# Estilos personalizados
-st.markdown("""
+# Estilos personalizados (injetados só onde são usados, na aba de alertas)
+CUSTOM_STYLES = """
     <style>
     .metric-card {
         background-color: #f0f2f6;
@@ -56,32 +72,35 @@ st.markdown("""
         margin: 10px 0;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
 
 # Inicializar session state
 if 'data' not in st.session_state:
     st.session_state.data = None
 if 'data_modified' not in st.session_state:
     st.session_state.data_modified = False
+if 'data_version' not in st.session_state:
+    st.session_state.data_version = 0
+if 'time_index' not in st.session_state:
+    st.session_state.time_index = None
+if 'dataset_version' not in st.session_state:
+    st.session_state.dataset_version = 0
+if 'data_months' not in st.session_state:
+    st.session_state.data_months = ()
+if 'data_shared' not in st.session_state:
+    st.session_state.data_shared = False
+if 'data_base' not in st.session_state:
+    # (versão anterior dos dados, equipamentos alterados desde ela) para recalcular só esses
+    st.session_state.data_base = None
+if 'last_rerun_spans' not in st.session_state:
+    st.session_state.last_rerun_spans = []
 
-# Definir limites de alerta para cada variável
-ALERT_LIMITS = {
-    'VIBRAÇÃO AXIAL(mm/s)': {'min': 0, 'max': 5},
-    'VIBRAÇÃO RADIAL-Y (mm/s)': {'min': 0, 'max': 5},
-    'VIBRAÇÃO RADIAL-X (mm/s)': {'min': 0, 'max': 7},
-    'TEMPERATURA(°C)': {'min': 0, 'max': 70},
-    'CORRENTE ELÉTRICA (A)': {'min': 0, 'max': 100}
-}
-
-# Colunas de variáveis medidas
-MEASURED_VARIABLES = [
-    'VIBRAÇÃO AXIAL(mm/s)',
-    'VIBRAÇÃO RADIAL-Y (mm/s)',
-    'VIBRAÇÃO RADIAL-X (mm/s)',
-    'TEMPERATURA(°C)',
-    'CORRENTE ELÉTRICA (A)'
-]
+# Medição de desempenho da execução (sem efeito quando PROFILING está desligado)
+profiling.get_profiler().start_rerun()
 
+# Intervalo (segundos) da verificação de dados novos com atualização automática
+AUTO_REFRESH_INTERVAL = 5
 
 # ============================================================================
 # FUNÇÕES DE PERSISTÊNCIA COM GITHUB GIST
@@ -92,67 +111,45 @@ def get_github_token():
     """Obtém token do GitHub dos secrets"""
     return st.secrets.get("GITHUB_TOKEN", None)
 
+@st.cache_resource
+def get_gist_sync():
+    """Retorna o sincronizador do Gist (sessão HTTP com pool, compartilhada entre sessões)"""
+    token = get_github_token()
+    gist_id = st.secrets.get("GIST_ID", None)
+    
+    if not token or not gist_id:
+        return None
+    
+    from wegscan.gist_sync import DEFAULT_API_URL, GistSync
+    return GistSync(token, gist_id, api_url=st.secrets.get("GIST_API_URL", DEFAULT_API_URL))
+
 def load_data_from_gist():
-    """Carrega dados do GitHub Gist"""
+    """Carrega dados do GitHub Gist (consulta condicional; só baixa o que mudou)"""
     try:
-        token = get_github_token()
-        gist_id = st.secrets.get("GIST_ID", None)
-        
-        if not token or not gist_id:
+        sync = get_gist_sync()
+        if sync is None:
             return None
-        
-        headers = {"Authorization": f"token {token}"}
-        url = f"https://api.github.com/gists/{gist_id}"
-        response = requests.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            gist_data = response.json()
-            csv_content = gist_data['files']['dados_dashboard.csv']['content']
-            df = pd.read_csv(StringIO(csv_content))
-            
-            if 'DATA' in df.columns:
-                df['DATA'] = pd.to_datetime(df['DATA'], errors='coerce').dt.date
-            
-            return df
+        return sync.load()
     except Exception as e:
         st.warning(f"Erro ao carregar de Gist: {e}")
     
     return None
 
 def save_data_to_gist(df):
-    """Salva dados no GitHub Gist"""
+    """Salva dados no GitHub Gist (envia só as linhas novas)"""
     try:
-        token = get_github_token()
-        gist_id = st.secrets.get("GIST_ID", None)
+        sync = get_gist_sync()
         
-        if not token or not gist_id:
+        if sync is None:
             st.warning("GitHub não configurado. Dados serão salvos apenas em memória.")
-            st.session_state.data = df.copy()
+            set_session_data(df.copy())
             return
         
-        csv_content = df.to_csv(index=False)
-        
-        headers = {"Authorization": f"token {token}"}
-        url = f"https://api.github.com/gists/{gist_id}"
-        
-        payload = {
-            "files": {
-                "dados_dashboard.csv": {
-                    "content": csv_content
-                }
-            }
-        }
-        
-        response = requests.patch(url, json=payload, headers=headers)
-        
-        if response.status_code == 200:
-            st.session_state.data = df.copy()
-        else:
-            st.warning(f"Erro ao salvar em Gist: {response.status_code}")
-            st.session_state.data = df.copy()
+        sync.save(df)
+        set_session_data(df.copy())
     except Exception as e:
         st.warning(f"Erro ao salvar em Gist: {e}")
-        st.session_state.data = df.copy()
+        set_session_data(df.copy())
 
 # ============================================================================
 # FUNÇÕES DE LOG DE ALTERAÇÕES
@@ -160,81 +157,92 @@ def save_data_to_gist(df):
 
 def load_change_log():
     """Carrega o log de alterações do arquivo JSON"""
-    log_file = 'alteracoes_log.json'
-    if os.path.exists(log_file):
-        try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                log_data = json.load(f)
-            return log_data
-        except Exception as e:
-            st.warning(f"Erro ao carregar log: {e}")
-            return []
-    return []
-
-def save_change_log(log_data):
-    """Salva o log de alterações em arquivo JSON"""
-    log_file = 'alteracoes_log.json'
     try:
-        with open(log_file, 'w', encoding='utf-8') as f:
-            json.dump(log_data, f, ensure_ascii=False, indent=2)
+        return changelog.load_change_log()
     except Exception as e:
-        st.error(f"Erro ao salvar log: {e}")
+        st.warning(f"Erro ao carregar log: {e}")
+        return []
 
 def add_change_log_entry(equipamento, variavel, valor_anterior, novo_valor, usuario="Operador Local"):
     """Adiciona uma entrada ao log de alterações"""
-    log_data = load_change_log()
-    
-    entry = {
-        'timestamp': datetime.now().isoformat(),
-        'equipamento': equipamento,
-        'variavel': variavel,
-        'valor_anterior': valor_anterior,
-        'novo_valor': novo_valor,
-        'usuario': usuario
-    }
-    
-    log_data.append(entry)
-    save_change_log(log_data)
+    entry = changelog.make_change_log_entry(equipamento, variavel, valor_anterior, novo_valor, usuario)
+    try:
+        get_writer().submit_change_log([entry]).result()
+    except Exception as e:
+        st.error(f"Erro ao salvar log: {e}")
 
 # ============================================================================
 # FUNÇÕES DE CARREGAMENTO E SALVAMENTO DE DADOS
 # ============================================================================
 
+def set_session_data(df):
+    """Substitui os dados da sessão por uma cópia local e invalida o índice temporal"""
+    st.session_state.data = df
+    st.session_state.data_version = next_data_version()
+    st.session_state.data_shared = False
+    st.session_state.data_base = None
+
+def adopt_shared_data(months=()):
+    """Usa na sessão a cópia compartilhada: partição recente + meses antigos pedidos
+
+    As sessões com a mesma janela compartilham o DataFrame, o índice e os caches.
+    """
+    dataset = get_dataset()
+    # Estatísticas, alertas e tendências de cada versão passam a ser recalculados em segundo plano
+    get_derived().attach(dataset)
+    dataset_version, version, df = dataset.window(months)
+    st.session_state.data = df
+    st.session_state.data_version = version
+    st.session_state.dataset_version = dataset_version
+    st.session_state.data_months = tuple(months)
+    st.session_state.data_shared = True
+    st.session_state.data_base = None
+
+def sync_session_data():
+    """Aplica à sessão as linhas acrescentadas e as células alteradas no conjunto compartilhado desde a sua versão"""
+    dataset = get_dataset()
+    try:
+        dataset.refresh_if_changed()
+        version, delta = dataset.changes_since(st.session_state.dataset_version)
+    except Exception as e:
+        st.warning(f"Erro ao verificar dados novos: {e}")
+        return
+
+    if version == st.session_state.dataset_version:
+        return
+    previous_version = st.session_state.data_version
+    if delta is None or st.session_state.data_shared:
+        # Sessão sem alterações locais: basta adotar a cópia compartilhada (já corrigida)
+        adopt_shared_data(st.session_state.data_months)
+    else:
+        try:
+            set_session_data(apply_changes(st.session_state.data, delta))
+        except KeyError:
+            # Célula alterada fora da cópia local: só a cópia compartilhada está correta
+            adopt_shared_data(st.session_state.data_months)
+            return
+        st.session_state.dataset_version = version
+    if delta is not None:
+        # Estatísticas dos demais equipamentos são reaproveitadas da versão anterior
+        st.session_state.data_base = (previous_version, delta.equipments)
+
+def get_time_index():
+    """Retorna o índice temporal da versão atual dos dados, reconstruindo se necessário"""
+    if st.session_state.data_shared:
+        index = get_dataset().time_index(st.session_state.data_version)
+        if index is not None:
+            return index
+    index = st.session_state.time_index
+    if index is None or index.version != st.session_state.data_version:
+        index = TimeIndex(st.session_state.data, version=st.session_state.data_version)
+        st.session_state.time_index = index
+    return index
+
 # Função para carregar dados do Excel
 def load_excel_data(file_path):
     """Carrega dados da planilha principal do Excel"""
     try:
-        df = pd.read_excel(file_path, sheet_name='Planilha1', header=1)
-        # Limpar colunas sem nome
-        df = df.dropna(how='all', axis=1)
-        df = df.dropna(how='all', axis=0)
-        
-        # Preencher valores de DATA
-        df['DATA'] = df['DATA'].ffill()
-        
-        # Combinar DATA e HORÁRIO em uma coluna datetime
-        df['DateTime'] = pd.to_datetime(
-            df['DATA'].astype(str) + ' ' + df['HORÁRIO'].astype(str),
-            format='%Y-%m-%d %H:%M:%S',
-            errors='coerce'
-        )
-        
-        # Remover linhas com DateTime inválido
-        df = df.dropna(subset=['DateTime'])
-        
-        # Converter colunas numéricas
-        for col in MEASURED_VARIABLES:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # Adicionar coluna CORRENTE ELÉTRICA se não existir
-        if 'CORRENTE ELÉTRICA (A)' not in df.columns:
-            df['CORRENTE ELÉTRICA (A)'] = None
-        
-        # Ordenar por DateTime
-        df = df.sort_values('DateTime').reset_index(drop=True)
-        
-        return df
+        return storage.load_readings(file_path)
     except Exception as e:
         st.error(f"Erro ao carregar arquivo: {e}")
         return None
@@ -266,178 +274,226 @@ def save_data_to_json(df):
 
 # Função para carregar dados (Excel DADOSWEGSCAN.xlsx)
 def load_data_from_json():
-    """Carrega dados do arquivo Excel DADOSWEGSCAN.xlsx"""
+    """Carrega dados do conjunto compartilhado (o Excel é lido uma vez por processo)"""
     if st.session_state.data is not None:
         return st.session_state.data
     
-    # Carregar do Excel
-    df = load_data_from_excel()
-    if df is not None:
-        st.session_state.data = df
-        return df
-    
-    return None
+    try:
+        adopt_shared_data()
+    except Exception as e:
+        st.error(f"Erro ao carregar arquivo: {e}")
+        return None
+    return st.session_state.data
+
+def reload_shared_data():
+    """Recarrega a planilha no conjunto compartilhado (todas as sessões recebem a nova cópia)"""
+    try:
+        get_dataset().reload()
+        adopt_shared_data()
+    except Exception as e:
+        st.error(f"Erro ao carregar arquivo: {e}")
+        return False
+    return True
+
+def load_period(date_min, date_max):
+    """Carrega na sessão os meses antigos que o período pedido alcança"""
+    if not st.session_state.data_shared:
+        return
+    try:
+        months = get_dataset().cold_months(date_min, date_max)
+        if months != st.session_state.data_months:
+            adopt_shared_data(months)
+    except Exception as e:
+        st.error(f"Erro ao carregar período: {e}")
+
+@st.fragment(run_every=AUTO_REFRESH_INTERVAL)
+def watch_shared_data():
+    """Verifica a versão do conjunto compartilhado e atualiza a página quando há dados novos"""
+    if get_dataset().refresh_if_changed() != st.session_state.dataset_version:
+        st.rerun()
 
 # Função para criar gráfico de tendência
-def create_trend_chart(df, equipment, variable, title):
-    """Cria gráfico de linha com tendência para uma variável"""
+def create_trend_chart(df_equipment, equipment, variable, title, artifacts=None):
+    """Cria gráfico de linha com tendência para uma variável (df já filtrado pelo equipamento)"""
+    if df_equipment.empty:
+        st.warning(f"Sem dados para {equipment}")
+        return None
+    
+    if not has_chart_data(df_equipment, variable):
+        st.warning(f"Sem dados válidos para {equipment} - {variable}")
+        return None
+    
     try:
-        # Filtrar dados do equipamento
-        df_equipment = df[df['EQUIPAMENTO'] == equipment].copy()
-        
-        if df_equipment.empty:
-            st.warning(f"Sem dados para {equipment}")
-            return None
-        
-        # Remover valores NaN
-        df_equipment = df_equipment.dropna(subset=[variable])
-        
-        if df_equipment.empty:
-            st.warning(f"Sem dados válidos para {equipment} - {variable}")
-            return None
-        
-        # Criar figura
-        fig = go.Figure()
-        
-        # Adicionar linha de dados
-        fig.add_trace(go.Scatter(
-            x=df_equipment['DateTime'],
-            y=df_equipment[variable],
-            mode='lines+markers',
-            name=variable,
-            line=dict(color='#1f77b4', width=2),
-            marker=dict(size=6)
-        ))
-        
-        # Adicionar linha de tendência (média móvel)
-        if len(df_equipment) > 1:
-            df_equipment['Trend'] = df_equipment[variable].rolling(window=min(3, len(df_equipment)), center=True).mean()
-            fig.add_trace(go.Scatter(
-                x=df_equipment['DateTime'],
-                y=df_equipment['Trend'],
-                mode='lines',
-                name='Tendência',
-                line=dict(color='#ff7f0e', width=2, dash='dash')
-            ))
-        
-        # Adicionar limites de alerta
-        if variable in ALERT_LIMITS:
-            limits = ALERT_LIMITS[variable]
-            fig.add_hline(y=limits['max'], line_dash="dash", line_color="red", 
-                         annotation_text=f"Limite Máx: {limits['max']}", annotation_position="right")
-            fig.add_hline(y=limits['min'], line_dash="dash", line_color="green",
-                         annotation_text=f"Limite Mín: {limits['min']}", annotation_position="right")
-        
-        # Atualizar layout
-        fig.update_layout(
-            title=f"{title} - {equipment}",
-            xaxis_title="Data/Hora",
-            yaxis_title=variable,
-            hovermode='x unified',
-            height=400,
-            template='plotly_white'
-        )
-        
-        return fig
+        trend = artifacts['tendencias'].get(variable) if artifacts else None
+        return build_trend_chart(df_equipment, equipment, variable, title, trend=trend)
     except Exception as e:
         st.error(f"Erro ao criar gráfico: {e}")
         return None
 
+# Artefatos calculados em segundo plano para a versão exibida (None enquanto calculam)
+def derived_snapshot():
+    """Instantâneo dos artefatos derivados da versão dos dados da sessão"""
+    return get_derived().snapshot(st.session_state.data_version)
+
+def equipment_artifacts(df_equipment, equipment):
+    """Artefatos em segundo plano do equipamento, se o filtro tem todas as leituras dele"""
+    snapshot = derived_snapshot()
+    return snapshot.equipment(equipment, len(df_equipment)) if snapshot else None
+
 # Função para calcular estatísticas
-def calculate_statistics(df, equipment, variable):
-    """Calcula estatísticas para uma variável"""
-    df_equipment = df[df['EQUIPAMENTO'] == equipment].copy()
-    df_equipment = df_equipment.dropna(subset=[variable])
+def calculate_statistics(df, variables, filter_key):
+    """Obtém as estatísticas do segundo plano ou calcula (com cache) as do filtro"""
+    snapshot = derived_snapshot()
+    if snapshot is not None:
+        stats = snapshot.statistics(filter_key[0], len(df), variables)
+        if stats is not None:
+            return stats
+    base = st.session_state.data_base
+    if base is not None:
+        base = ((base[0], filter_key), base[1])
+    return get_statistics(df, variables, key=(st.session_state.data_version, filter_key), base=base)
+
+# Função para verificar alertas
+def check_alerts(df_equipment, equipment, variable):
+    """Verifica se há valores fora dos limites (df já filtrado pelo equipamento)"""
+    artifacts = equipment_artifacts(df_equipment, equipment)
+    if artifacts is not None:
+        return list(artifacts['alertas'].get(variable, []))
+    return limit_violations(df_equipment, variable, ALERT_LIMITS)
+
+# Formas de onda e espectro
+def show_waveform_panel(equipments, time_index, date_min, date_max):
+    """Capturas de vibração do equipamento: importação, indicadores em lote e espectro da captura escolhida"""
+    store = get_waveform_store()
+    equipment = st.selectbox("Equipamento", equipments, key="waveform_equipment")
+    if equipment is None:
+        return
     
-    if df_equipment.empty:
-        return None
+    try:
+        features = cached_features(store, equipment)
+    except Exception as e:
+        st.error(f"Erro ao ler as formas de onda: {e}")
+        return
     
-    stats = {
-        'Média': df_equipment[variable].mean(),
-        'Máximo': df_equipment[variable].max(),
-        'Mínimo': df_equipment[variable].min(),
-        'Desvio Padrão': df_equipment[variable].std(),
-        'Última Leitura': df_equipment[variable].iloc[-1]
-    }
+    if features.empty:
+        st.info("📝 Nenhuma captura de forma de onda para este equipamento.")
+    else:
+        # Energia por faixa como fração da energia total da captura
+        band_names = [name for name, _, _ in BANDS]
+        table = features.copy()
+        total = table[band_names].sum(axis=1).replace(0, float('nan'))
+        for name in band_names:
+            table[name] = (100 * table[name] / total).round(1)
+        table = table.rename(columns={name: f"{name} (%)" for name in band_names})
+        table['DateTime'] = table['DateTime'].dt.strftime("%d/%m/%Y %H:%M")
+        st.dataframe(table.drop(columns=['id', 'EQUIPAMENTO']), use_container_width=True, hide_index=True)
+        
+        # Só a captura escolhida é lida do arquivo de amostras
+        options = dict(zip(features['id'], features['DateTime'].dt.strftime("%d/%m/%Y %H:%M") + " - " + features['eixo']))
+        capture_id = st.selectbox(
+            "Captura", list(options)[::-1], format_func=options.get, key="waveform_capture"
+        )
+        entry = store.entry(capture_id)
+        try:
+            freqs, amplitudes, env_freqs, env_amplitudes = cached_spectrum(store, capture_id)
+        except Exception as e:
+            st.error(f"Erro ao calcular o espectro: {e}")
+            return
+        
+        row = features[features['id'] == capture_id].iloc[0]
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric(f"RMS ({entry['unidade']})", f"{row['RMS']:.3f}")
+        with col2:
+            st.metric(f"Pico ({entry['unidade']})", f"{row['Pico']:.3f}")
+        with col3:
+            st.metric("Fator de Crista", f"{row['Fator de Crista']:.2f}")
+        with col4:
+            st.metric("Taxa (Hz)", f"{entry['taxa']:g}")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.plotly_chart(build_spectrum_chart(
+                freqs, amplitudes, f"Espectro - {AXES[entry['eixo']]}", entry['unidade'], BANDS
+            ), use_container_width=True)
+        with col2:
+            st.plotly_chart(build_spectrum_chart(
+                env_freqs, env_amplitudes, "Espectro do envelope", entry['unidade']
+            ), use_container_width=True)
     
-    return stats
+    # Importar uma captura ligada a uma leitura do período
+    readings = time_index.slice(equipment, date_min, date_max)['DateTime'].sort_values(ascending=False)
+    with st.form("form_forma_onda"):
+        st.markdown("**Importar captura:**")
+        uploaded = st.file_uploader("Arquivo da captura (.csv, .txt ou .npy)", type=['csv', 'txt', 'npy'])
+        col1, col2 = st.columns(2)
+        with col1:
+            moment = st.selectbox(
+                "Leitura", readings.head(200).tolist(),
+                format_func=lambda value: value.strftime("%d/%m/%Y %H:%M")
+            )
+            axis = st.selectbox("Eixo", list(AXES))
+        with col2:
+            kind = st.selectbox("Grandeza", list(KINDS))
+            rate = st.number_input("Taxa de amostragem (Hz)", min_value=0.0, value=0.0, step=100.0,
+                                   help="0: deduzida da coluna de tempo do arquivo")
+        
+        if st.form_submit_button("📥 Importar captura"):
+            if uploaded is None or moment is None:
+                st.error("❌ Escolha o arquivo e a leitura da captura!")
+            else:
+                try:
+                    samples, sample_rate = read_capture_file(uploaded, rate or None, name=uploaded.name)
+                    store.add(equipment, moment, axis, samples, sample_rate, kind)
+                except Exception as e:
+                    st.error(f"❌ Erro ao importar captura: {e}")
+                else:
+                    st.success(f"✅ Captura importada: {len(samples)} amostras a {sample_rate:g} Hz")
+                    st.rerun()
 
-# Função para verificar alertas
-def check_alerts(df, equipment, variable):
-    """Verifica se há valores fora dos limites"""
-    df_equipment = df[df['EQUIPAMENTO'] == equipment].copy()
-    df_equipment = df_equipment.dropna(subset=[variable])
+# Painel de desempenho
+def show_performance_panel():
+    """Mostra a última execução da sessão e os histogramas de todas as sessões do processo"""
+    profiler = profiling.get_profiler()
+    st.markdown("## Desempenho")
     
-    if df_equipment.empty or variable not in ALERT_LIMITS:
-        return []
+    last_rerun = st.session_state.last_rerun_spans
+    if last_rerun:
+        st.markdown("### Última execução desta sessão")
+        st.dataframe(pd.DataFrame([
+            {'Fase': '· ' * depth + name, 'Tempo (ms)': round(seconds * 1000, 1)}
+            for name, seconds, depth in last_rerun
+        ]), use_container_width=True, hide_index=True)
     
-    limits = ALERT_LIMITS[variable]
-    alerts = []
+    histograms = profiler.snapshot()
+    if not histograms:
+        st.info("Nenhuma medição registrada ainda.")
+        return
     
-    for idx, row in df_equipment.iterrows():
-        value = row[variable]
-        if value > limits['max']:
-            alerts.append({
-                'type': 'danger',
-                'message': f"⚠️ {variable}: {value:.2f} (Acima do limite máximo: {limits['max']})",
-                'datetime': row['DateTime']
-            })
-        elif value < limits['min']:
-            alerts.append({
-                'type': 'warning',
-                'message': f"⚠️ {variable}: {value:.2f} (Abaixo do limite mínimo: {limits['min']})",
-                'datetime': row['DateTime']
-            })
+    st.markdown("### Todas as sessões")
+    st.dataframe(pd.DataFrame(profiling.summary_rows(histograms)), use_container_width=True, hide_index=True)
     
-    return alerts
-
-# Função para exportar dados para Excel
-def export_to_excel(df):
-    """Exporta dados para arquivo Excel"""
-    try:
-        output_file = 'dados_exportados.xlsx'
-        
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-            # Planilha principal
-            df_export = df[['DateTime', 'EQUIPAMENTO'] + MEASURED_VARIABLES].copy()
-            df_export.columns = ['Data/Hora', 'Equipamento'] + [
-                'Vibração Axial (mm/s)',
-                'Vibração Radial-Y (mm/s)',
-                'Vibração Radial-X (mm/s)',
-                'Temperatura (°C)',
-                'Corrente Elétrica (A)'
-            ]
-            df_export.to_excel(writer, sheet_name='Dados', index=False)
-            
-            # Planilha de resumo por equipamento
-            summary_data = []
-            for equipment in df['EQUIPAMENTO'].unique():
-                df_eq = df[df['EQUIPAMENTO'] == equipment]
-                summary_row = {
-                    'Equipamento': equipment,
-                    'Registros': len(df_eq)
-                }
-                for var in MEASURED_VARIABLES:
-                    summary_row[f'{var} (Média)'] = df_eq[var].mean()
-                summary_data.append(summary_row)
-            
-            df_summary = pd.DataFrame(summary_data)
-            df_summary.to_excel(writer, sheet_name='Resumo', index=False)
-        
-        return output_file
-    except Exception as e:
-        st.error(f"Erro ao exportar dados: {e}")
-        return None
-
-# Função para exportar gráfico como PNG
-def export_chart_as_png(fig, filename):
-    """Exporta gráfico Plotly como PNG"""
-    try:
-        fig.write_image(filename, width=1200, height=600)
-        return filename
-    except Exception as e:
-        st.warning(f"Não foi possível exportar como PNG: {e}. Instale kaleido para esta funcionalidade.")
-        return None
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button(
+            label="📄 Prometheus",
+            data=profiling.to_prometheus(histograms),
+            file_name="metricas_weg_scan.prom",
+            mime="text/plain",
+            use_container_width=True
+        )
+    with col2:
+        st.download_button(
+            label="📄 JSONL",
+            data=profiling.to_jsonl_line(histograms),
+            file_name="metricas_weg_scan.jsonl",
+            mime="application/x-ndjson",
+            use_container_width=True
+        )
+    with col3:
+        if st.button("🗑️ Zerar medições", use_container_width=True):
+            profiler.reset()
+            st.rerun()
 
 # ============================================================================
 # INTERFACE PRINCIPAL
@@ -453,34 +509,27 @@ with st.sidebar:
     
     # Carregar dados
     if st.button("🔄 Carregar Dados do Excel", use_container_width=True):
-        st.session_state.data = load_excel_data('DADOSWEGSCAN.xlsx')
-        st.success("Dados carregados com sucesso!")
+        if reload_shared_data():
+            st.success("Dados carregados com sucesso!")
     
-    # Se não há dados em session_state, tentar carregar do JSON primeiro
-    if st.session_state.data is None:
-        # Tentar carregar do JSON (dados salvos com novos registros)
-        json_data = load_data_from_json()
-        if json_data is not None:
-            try:
-                if len(json_data) > 0:
-                    st.session_state.data = json_data
-                    st.info(f"✅ Carregados {len(json_data)} registros do arquivo salvo")
+    # Se não há dados em session_state, usar o conjunto compartilhado do processo
+    with profiling.span('carga'):
+        if st.session_state.data is None:
+            shared_data = load_data_from_json()
+            if shared_data is not None:
+                total_rows = get_dataset().total_rows() if st.session_state.data_shared else len(shared_data)
+                if total_rows > len(shared_data):
+                    st.info(f"✅ Carregados {len(shared_data)} registros recentes de {total_rows} no histórico; "
+                            "os meses anteriores são carregados quando o período os inclui")
                 else:
-                    raise ValueError("JSON vazio")
-            except Exception as e:
-                st.warning(f"Erro ao carregar JSON: {e}. Carregando do Excel...")
-                excel_data = load_excel_data('DADOSWEGSCAN.xlsx')
-                if excel_data is not None:
-                    st.session_state.data = excel_data
-                    save_data_to_json(excel_data)
+                    st.info(f"✅ Carregados {len(shared_data)} registros do arquivo salvo")
         else:
-            # Se não houver JSON, carregar do Excel
-            excel_data = load_excel_data('DADOSWEGSCAN.xlsx')
-            if excel_data is not None:
-                st.session_state.data = excel_data
-                # Salvar em JSON para próximas cargas
-                save_data_to_json(excel_data)
-                st.info(f"✅ Carregados {len(excel_data)} registros do Excel")
+            # Aplicar as leituras gravadas por outras sessões desde a última execução
+            sync_session_data()
+    
+    if st.toggle("Atualização automática", key='auto_refresh',
+                 help=f"Verifica dados novos de outras sessões a cada {AUTO_REFRESH_INTERVAL}s"):
+        watch_shared_data()
     
     st.markdown("---")
     
@@ -488,8 +537,16 @@ with st.sidebar:
     if st.session_state.data is not None:
         st.markdown("### 🔍 Filtros")
         
+        # Limites e equipamentos de todo o histórico, sem carregar os meses antigos
+        if st.session_state.data_shared:
+            first_reading, last_reading, equipamentos = get_dataset().catalog()
+        else:
+            first_reading, last_reading = get_time_index().time_bounds()
+            equipamentos = get_time_index().equipments
+        hot_start = get_dataset().hot_start
+        default_start = max(first_reading, hot_start) if hot_start is not None else first_reading
+        
         # Filtro de equipamento
-        equipamentos = sorted(st.session_state.data['EQUIPAMENTO'].unique())
         selected_equipment = st.multiselect(
             "Equipamentos",
             equipamentos,
@@ -502,14 +559,19 @@ with st.sidebar:
         with col1:
             date_min = st.date_input(
                 "De",
-                st.session_state.data['DateTime'].min().date()
+                pd.Timestamp(default_start).date(),
+                min_value=pd.Timestamp(first_reading).date(),
+                help="Meses anteriores à partição recente são carregados sob demanda"
             )
         with col2:
             date_max = st.date_input(
                 "Até",
-                st.session_state.data['DateTime'].max().date()
+                pd.Timestamp(last_reading).date()
             )
         
+        load_period(date_min, date_max)
+        time_index = get_time_index()
+        
         # Filtro de variável
         selected_variables = st.multiselect(
             "Variáveis",
@@ -524,29 +586,61 @@ with st.sidebar:
         
         col_export1, col_export2 = st.columns(2)
         
+        # Chave do filtro ativo: exportações são geradas só no clique e reaproveitadas do cache
+        export_key = (
+            st.session_state.data_version, tuple(selected_equipment),
+            date_min, date_max, tuple(selected_variables)
+        )
+        
+        def build_excel_export():
+            """Gera o Excel com os dados do filtro ativo"""
+            export_data = time_index.query(selected_equipment, date_min, date_max)
+            export_stats = calculate_statistics(
+                export_data, selected_variables, (tuple(selected_equipment), date_min, date_max)
+            )
+            return export_to_excel(export_data, export_stats, selected_variables)
+        
         with col_export1:
-            if st.button("📊 Excel", use_container_width=True):
-                export_file = export_to_excel(st.session_state.data)
-                if export_file:
-                    with open(export_file, 'rb') as f:
-                        st.download_button(
-                            label="⬇️ Baixar",
-                            data=f.read(),
-                            file_name="dados_weg_scan.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            use_container_width=True
-                        )
+            st.download_button(
+                label="📊 Excel",
+                data=lambda: cached_export('xlsx', export_key, build_excel_export),
+                file_name="dados_weg_scan.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True
+            )
+        
+        def build_filtered_export(export_format):
+            """Gera a exportação pedida com os dados do filtro ativo"""
+            export_data = time_index.query(selected_equipment, date_min, date_max)
+            if export_format == 'csv':
+                return export_to_csv(export_data, selected_variables)
+            return export_analytics(export_format, export_data, selected_variables)
         
         with col_export2:
-            if st.button("📋 CSV", use_container_width=True):
-                csv_data = st.session_state.data[['DateTime', 'EQUIPAMENTO'] + MEASURED_VARIABLES].to_csv(index=False)
-                st.download_button(
-                    label="⬇️ Baixar",
-                    data=csv_data,
-                    file_name="dados_weg_scan.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
+            st.download_button(
+                label="📋 CSV",
+                data=lambda: cached_export('csv', export_key, lambda: build_filtered_export('csv')),
+                file_name="dados_weg_scan.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+        
+        # Formatos analíticos (tipos nativos, comprimidos) para a equipe de confiabilidade
+        analytics_format = st.selectbox(
+            "Formato analítico",
+            list(ANALYTICS_FORMATS),
+            format_func=lambda fmt: ANALYTICS_FORMATS[fmt]['label']
+        )
+        format_info = ANALYTICS_FORMATS[analytics_format]
+        st.download_button(
+            label=f"🗜️ {format_info['label']}",
+            data=lambda: cached_export(
+                analytics_format, export_key, lambda: build_filtered_export(analytics_format)
+            ),
+            file_name=f"dados_weg_scan.{format_info['extension']}",
+            mime=format_info['mime'],
+            use_container_width=True
+        )
         
         st.markdown("---")
         
@@ -579,7 +673,6 @@ with st.sidebar:
                 else:
                     # Criar novo registro
                     new_record = {
-                        'DateTime': pd.Timestamp(datetime.combine(new_datetime, new_time)),
                         'DATA': new_datetime,
                         'HORÁRIO': new_time,
                         'EQUIPAMENTO': new_equipment,
@@ -590,84 +683,170 @@ with st.sidebar:
                         'CORRENTE ELÉTRICA (A)': new_current
                     }
                     
-                    # Adicionar ao DataFrame
-                    new_df = pd.DataFrame([new_record])
-                    st.session_state.data = pd.concat([st.session_state.data, new_df], ignore_index=True)
-                    st.session_state.data = st.session_state.data.sort_values('DateTime').reset_index(drop=True)
-                    
-                    # Salvar no Excel
-                    success = add_record_to_excel(
-                        data=new_datetime,
-                        horario=new_time,
-                        equipamento=new_equipment,
-                        vibracao_axial=new_vib_axial,
-                        vibracao_radial_y=new_vib_radial_y,
-                        vibracao_radial_x=new_vib_radial_x,
-                        temperatura=new_temp,
-                        corrente_eletrica=new_current
-                    )
-                    
-                    if not success:
-                        st.error("❌ Erro ao salvar no Excel!")
+                    # Salvar no Excel, registrar alterações no log e enviar alertas por e-mail
+                    try:
+                        with profiling.span('registro.novo'):
+                            result = ingest_readings(
+                                [new_record],
+                                alert_config=get_email_config(),
+                                alert_sender=send_alert_email
+                            )
+                    except Exception as e:
+                        st.error(f"❌ Erro ao salvar no Excel! {e}")
                         st.stop()
                     
-                    # Registrar alterações no log
-                    for var in MEASURED_VARIABLES:
-                        add_change_log_entry(
-                            equipamento=new_equipment,
-                            variavel=var,
-                            valor_anterior=None,
-                            novo_valor=new_record[var]
-                        )
-                    
-                    # Verificar e enviar alertas por e-mail
-                    alertas = check_and_send_alerts(
-                        equipamento=new_equipment,
-                        data=new_datetime,
-                        horario=new_time,
-                        vibracao_axial=new_vib_axial,
-                        vibracao_radial_y=new_vib_radial_y,
-                        vibracao_radial_x=new_vib_radial_x,
-                        temperatura=new_temp,
-                        corrente_eletrica=new_current
-                    )
+                    # Adicionar ao DataFrame (o escritor já publicou o lote no conjunto compartilhado)
+                    sync_session_data()
+                    alertas = result['alertas']
                     
                     if alertas:
                         st.warning(f"⚠️ Alertas enviados por e-mail: {', '.join(alertas)}")
+                    if result.get('aviso_log'):
+                        st.warning(f"⚠️ {result['aviso_log']}")
                     
                     st.success("✅ Registro adicionado com sucesso!")
                     st.rerun()
 
 # Conteúdo principal
 if st.session_state.data is not None:
-    # Filtrar dados
-    df_filtered = st.session_state.data[
-        (st.session_state.data['EQUIPAMENTO'].isin(selected_equipment)) &
-        (st.session_state.data['DateTime'].dt.date >= date_min) &
-        (st.session_state.data['DateTime'].dt.date <= date_max)
-    ].copy()
+    # Filtrar dados pelo índice temporal (busca binária por equipamento)
+    with profiling.span('filtro'):
+        time_index = get_time_index()
+        df_filtered = time_index.query(selected_equipment, date_min, date_max)
+        equipment_views = {
+            equipment: time_index.slice(equipment, date_min, date_max)
+            for equipment in selected_equipment
+        }
+    filter_key = (tuple(selected_equipment), date_min, date_max)
+    with profiling.span('estatisticas'):
+        stats_table = calculate_statistics(df_filtered, MEASURED_VARIABLES, filter_key)
     
     if df_filtered.empty:
         st.warning("Nenhum dado encontrado com os filtros selecionados.")
     else:
         # Tabs para diferentes visualizações
-        tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Gráficos", "📊 Estatísticas", "⚠️ Alertas", "📋 Dados", "🕓 Histórico"])
+        tab_names = ["📈 Gráficos", "🗺️ Frota", "⚖️ Carga", "📊 Estatísticas", "⚠️ Alertas", "📋 Dados", "🕓 Histórico"]
+        # Painel de administração, só com a medição de desempenho ligada
+        if profiling.enabled():
+            tab_names.append("⏱️ Desempenho")
+        tabs = st.tabs(tab_names)
+        tab1, tab_fleet, tab_load, tab2, tab3, tab4, tab5 = tabs[:7]
         
-        with tab1:
+        with tab1, profiling.span('aba.graficos'):
             st.markdown("## Gráficos de Tendência")
             
+            # Relatório com todos os gráficos do filtro, gerado só no clique
+            col_report1, col_report2 = st.columns([1, 3])
+            with col_report1:
+                report_format = st.selectbox(
+                    "Formato do relatório",
+                    list(REPORT_FORMATS),
+                    format_func=lambda fmt: REPORT_FORMATS[fmt]['label']
+                )
+            report_key = (st.session_state.data_version, filter_key, tuple(selected_variables))
+            with col_report2:
+                st.download_button(
+                    label="🖨️ Baixar relatório de gráficos",
+                    data=lambda: cached_export(
+                        f"report-{report_format}",
+                        report_key,
+                        lambda: generate_report(
+                            time_index, selected_equipment, selected_variables,
+                            date_min, date_max, report_format
+                        )
+                    ),
+                    file_name=f"relatorio_weg_scan.{report_format}",
+                    mime=REPORT_FORMATS[report_format]['mime']
+                )
+            
             # Criar gráficos para cada variável
             for variable in selected_variables:
                 st.markdown(f"### {variable}")
                 
                 cols = st.columns(len(selected_equipment))
                 for idx, equipment in enumerate(selected_equipment):
-                    with cols[idx]:
-                        fig = create_trend_chart(df_filtered, equipment, variable, variable)
+                    with cols[idx], profiling.span('grafico'):
+                        fig = create_trend_chart(
+                            equipment_views[equipment], equipment, variable, variable,
+                            equipment_artifacts(equipment_views[equipment], equipment)
+                        )
                         if fig:
                             st.plotly_chart(fig, use_container_width=True)
+            
+            # Capturas brutas dos sensores (só a captura escolhida é lida do arquivo de amostras)
+            st.markdown("## Formas de Onda e Espectro")
+            with st.expander("🔊 Capturas de vibração"), profiling.span('formas_onda'):
+                show_waveform_panel(selected_equipment, time_index, date_min, date_max)
+        
+        with tab_fleet, profiling.span('aba.frota'):
+            st.markdown("## Saúde da Frota")
+            
+            # Todos os equipamentos do filtro em um único mapa, em vez da grade de gráficos
+            if not selected_variables:
+                st.info("Selecione ao menos uma variável.")
+            else:
+                fleet_variable = st.selectbox(
+                    "Variável",
+                    [None] + selected_variables,
+                    format_func=lambda var: "Pior variável" if var is None else var,
+                    key="fleet_variable"
+                )
+                grid = cached_fleet_grid(
+                    (st.session_state.data_version, filter_key), df_filtered, selected_variables
+                )
+                if grid is None:
+                    st.info("Sem leituras no período selecionado.")
+                else:
+                    st.plotly_chart(build_fleet_heatmap(grid, fleet_variable), use_container_width=True)
+                    step = f"{grid.step.days} dia(s)" if grid.step.days else f"{grid.step.seconds // 3600} h"
+                    st.caption(
+                        f"Cada coluna é um intervalo de {step} com a maior leitura do intervalo. "
+                        f"Sem leitura, a última é repetida por até {MAX_GAP.days} dias; depois disso a célula fica em branco."
+                    )
+        
+        with tab_load, profiling.span('aba.carga'):
+            st.markdown("## Vibração e Temperatura em Relação à Carga")
+            
+            # Análise de todo o histórico do equipamento em cache por (equipamento, janela, versão);
+            # o filtro de período só recorta as linhas
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                load_equipment = st.selectbox("Equipamento", selected_equipment, key="load_equipment")
+            with col2:
+                load_variable = st.selectbox("Variável", LOAD_VARIABLES, key="load_variable")
+            with col3:
+                load_window = st.selectbox(
+                    "Janela",
+                    WINDOWS,
+                    index=WINDOWS.index(DEFAULT_WINDOW),
+                    format_func=lambda n: f"{n} leituras",
+                    key="load_window"
+                )
+            
+            analyses = {
+                equipment: period_rows(cached_load_analysis(time_index, equipment, load_window), date_min, date_max)
+                for equipment in selected_equipment
+            }
+            summary = load_summary(analyses, load_variable)
+            if not summary.empty:
+                st.dataframe(summary.round(2), hide_index=True, use_container_width=True)
+            
+            analysis = analyses.get(load_equipment)
+            if analysis is None or analysis.empty:
+                st.info("Sem leituras de corrente no período para este equipamento.")
+            else:
+                st.plotly_chart(build_load_chart(analysis, load_equipment, load_variable, ANOMALY_SIGMA),
+                                use_container_width=True)
+                st.plotly_chart(build_load_scatter(analysis, load_equipment, load_variable),
+                                use_container_width=True)
+                st.caption(
+                    f"Normalizado: valor na corrente de referência (mediana, "
+                    f"{analysis.attrs['corrente_referencia']:.1f} A). Esperado: reta valor × corrente das "
+                    f"{load_window} leituras anteriores; leituras a {ANOMALY_SIGMA:g}σ ou mais dela são anormais "
+                    f"para a carga. Leituras com o motor parado são ignoradas."
+                )
         
-        with tab2:
+        with tab2, profiling.span('aba.estatisticas'):
             st.markdown("## Estatísticas por Equipamento")
             
             for equipment in selected_equipment:
@@ -676,7 +855,7 @@ if st.session_state.data is not None:
                 cols = st.columns(len(selected_variables))
                 for idx, variable in enumerate(selected_variables):
                     with cols[idx]:
-                        stats = calculate_statistics(df_filtered, equipment, variable)
+                        stats = variable_statistics(stats_table, equipment, variable)
                         if stats:
                             st.metric(f"{variable}", f"{stats['Última Leitura']:.2f}")
                             with st.expander("Ver detalhes"):
@@ -684,19 +863,25 @@ if st.session_state.data is not None:
                                 st.write(f"**Máximo:** {stats['Máximo']:.2f}")
                                 st.write(f"**Mínimo:** {stats['Mínimo']:.2f}")
                                 st.write(f"**Desvio Padrão:** {stats['Desvio Padrão']:.2f}")
+                                st.write(f"**P5 / Mediana / P95:** {stats['P5']:.2f} / {stats['Mediana']:.2f} / {stats['P95']:.2f}")
+                                if is_vibration(variable):
+                                    st.write(f"**RMS:** {stats['RMS']:.2f}")
+                                    st.write(f"**Pico a Pico:** {stats['Pico a Pico']:.2f}")
                 
                 st.markdown("---")
         
-        with tab3:
+        with tab3, profiling.span('aba.alertas'):
             st.markdown("## Alertas de Valores Fora de Limites")
             
             all_alerts = []
             for equipment in selected_equipment:
                 for variable in selected_variables:
-                    alerts = check_alerts(df_filtered, equipment, variable)
+                    alerts = check_alerts(equipment_views[equipment], equipment, variable)
                     all_alerts.extend(alerts)
             
             if all_alerts:
+                st.markdown(CUSTOM_STYLES, unsafe_allow_html=True)
+                
                 # Ordenar alertas por data (mais recentes primeiro)
                 all_alerts.sort(key=lambda x: x['datetime'], reverse=True)
                 
@@ -708,31 +893,109 @@ if st.session_state.data is not None:
             else:
                 st.success("✅ Nenhum alerta no período selecionado!")
         
-        with tab4:
+        with tab4, profiling.span('aba.dados'):
             st.markdown("## Visualização de Dados")
             
-            # Mostrar tabela de dados
-            df_display = df_filtered[['DateTime', 'EQUIPAMENTO'] + MEASURED_VARIABLES].copy()
-            df_display.columns = ['Data/Hora', 'Equipamento', 'Vibração Axial (mm/s)',
-                                 'Vibração Radial-Y (mm/s)', 'Vibração Radial-X (mm/s)', 
-                                 'Temperatura (°C)', 'Corrente Elétrica (A)']
+            # Ordenação, filtro e paginação feitos no servidor: só a página visível vai ao navegador
+            table_columns = ['DateTime', 'EQUIPAMENTO'] + MEASURED_VARIABLES
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                sort_column = st.selectbox(
+                    "Ordenar por",
+                    table_columns,
+                    format_func=lambda col: EXPORT_LABELS.get(col, col),
+                    key="table_sort_column"
+                )
+            with col2:
+                sort_descending = st.toggle("Decrescente", value=True, key="table_sort_desc")
+            with col3:
+                page_size = st.selectbox("Linhas por página", PAGE_SIZES, index=1, key="table_page_size")
+            with col4:
+                only_alerts = st.toggle("Somente fora dos limites", value=False, key="table_only_alerts")
+            
+            positions = cached_row_positions(
+                (st.session_state.data_version, filter_key, sort_column, sort_descending, only_alerts),
+                df_filtered,
+                sort_column,
+                ascending=not sort_descending,
+                mask_builder=(
+                    (lambda: out_of_limits_mask(df_filtered, ALERT_LIMITS, MEASURED_VARIABLES))
+                    if only_alerts else None
+                )
+            )
+            total_pages = page_count(len(positions), page_size)
+            page = st.number_input("Página", min_value=1, max_value=total_pages, value=1, step=1)
+            
+            df_page = get_page(df_filtered, positions, min(page, total_pages), page_size)
+            df_display = df_page[[col for col in table_columns if col in df_page.columns]]
+            df_display = df_display.rename(columns=EXPORT_LABELS)
             
-            st.dataframe(df_display, use_container_width=True, height=400)
+            # Edição das medições da página: só as células alteradas são gravadas na planilha
+            if st.toggle("Editar leituras", value=False, key="table_edit",
+                         help="Corrige medições da página; cada célula alterada é registrada no histórico"):
+                editable = [col for col in MEASURED_VARIABLES if col in df_page.columns]
+                edited = st.data_editor(
+                    df_display,
+                    use_container_width=True,
+                    height=400,
+                    hide_index=True,
+                    disabled=[EXPORT_LABELS['DateTime'], EXPORT_LABELS['EQUIPAMENTO']],
+                    key=f"data_editor_{st.session_state.data_version}_{hash((filter_key, sort_column, sort_descending, only_alerts, page, page_size))}"
+                )
+                changes = cell_changes(
+                    df_page.reset_index(drop=True),
+                    edited.rename(columns={label: col for col, label in EXPORT_LABELS.items()}).reset_index(drop=True),
+                    editable
+                )
+                if changes:
+                    st.dataframe(
+                        pd.DataFrame(changes).rename(columns=EXPORT_LABELS),
+                        use_container_width=True, hide_index=True
+                    )
+                    if st.button(f"💾 Salvar {len(changes)} alteração(ões)", key="save_cell_changes"):
+                        try:
+                            with profiling.span('registro.alteracao'):
+                                result = update_readings(
+                                    changes,
+                                    alert_config=get_email_config(),
+                                    alert_sender=send_alert_email
+                                )
+                        except Exception as e:
+                            st.error(f"❌ Erro ao salvar alterações! {e}")
+                        else:
+                            sync_session_data()
+                            if result['alertas']:
+                                st.warning(f"⚠️ Alertas enviados por e-mail: {', '.join(result['alertas'])}")
+                            if result.get('aviso_log'):
+                                st.warning(f"⚠️ {result['aviso_log']}")
+                            st.success(f"✅ {len(result['alteracoes'])} célula(s) alterada(s)!")
+                            st.rerun()
+            else:
+                st.dataframe(df_display, use_container_width=True, height=400, hide_index=True)
+            first_row = (min(page, total_pages) - 1) * page_size
+            st.caption(
+                f"Linhas {min(first_row + 1, len(positions))}–{first_row + len(df_page)} "
+                f"de {len(positions)} | Página {min(page, total_pages)} de {total_pages}"
+            )
             
-            # Estatísticas gerais
+            # Estatísticas gerais (a partir dos agregados já calculados)
             st.markdown("### Resumo Geral")
             col1, col2, col3, col4 = st.columns(4)
             
+            first_reading = df_filtered['DateTime'].min()
+            last_reading = df_filtered['DateTime'].max()
             with col1:
                 st.metric("Total de Registros", len(df_filtered))
             with col2:
-                st.metric("Equipamentos", len(df_filtered['EQUIPAMENTO'].unique()))
+                st.metric("Equipamentos", len(stats_table.index))
             with col3:
-                st.metric("Período (dias)", (df_filtered['DateTime'].max() - df_filtered['DateTime'].min()).days + 1)
+                st.metric("Período (dias)", (last_reading - first_reading).days + 1)
             with col4:
-                st.metric("Última Atualização", df_filtered['DateTime'].max().strftime("%d/%m/%Y %H:%M"))
+                st.metric("Última Atualização", last_reading.strftime("%d/%m/%Y %H:%M"))
+            
+            st.dataframe(column_summary(stats_table, selected_variables), use_container_width=True, hide_index=True)
         
-        with tab5:
+        with tab5, profiling.span('aba.historico'):
             st.markdown("## Histórico de Alterações")
             
             # Carregar log de alterações
@@ -788,6 +1051,10 @@ if st.session_state.data is not None:
                 st.markdown(f"**Total de alterações:** {len(df_log_filtered)}")
             else:
                 st.info("📝 Nenhuma alteração registrada ainda.")
+        
+        if profiling.enabled():
+            with tabs[7]:
+                show_performance_panel()
 
 else:
     st.info("👈 Clique em 'Carregar Dados do Excel' no painel lateral para começar!")
@@ -799,3 +1066,7 @@ st.markdown("""
     <p>WEG SCAN Dashboard v2.0 | Monitoramento de Equipamentos | Desenvolvido com Streamlit</p>
 </div>
 """, unsafe_allow_html=True)
+
+# Encerrar a medição (o painel mostra a última execução completa da sessão)
+if profiling.enabled():
+    st.session_state.last_rerun_spans = profiling.get_profiler().finish_rerun()
@@ -0,0 +1,43 @@
+"""
+Fixtures dos testes do núcleo
+Cada teste roda em um diretório temporário com uma planilha sintética e com o
+conjunto compartilhado e o escritor do processo recriados
+"""
+
+from datetime import date, time
+
+import pytest
+
+from wegscan import dataset, writer
+from wegscan.measurements import MEASURED_VARIABLES
+from wegscan.synthetic import generate_fleet
+
+
+def make_reading(equipment, day, hour, minute=0, value=1.0):
+    """Leitura normalizada (como ingest.normalize_reading) com todas as medições iguais a value"""
+    reading = {'DATA': day, 'HORÁRIO': time(hour, minute), 'EQUIPAMENTO': equipment}
+    reading.update({var: value for var in MEASURED_VARIABLES})
+    return reading
+
+
+def no_email(*args):
+    """Envio de alerta de teste: não envia nada e informa sucesso"""
+    return True
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Diretório de trabalho com DADOSWEGSCAN.xlsx sintético (3 motores, ~4 meses)"""
+    monkeypatch.chdir(tmp_path)
+    generate_fleet('DADOSWEGSCAN.xlsx', motors=3, readings_per_day=2, years=0.35)
+    monkeypatch.setattr(dataset, '_dataset', None)
+    monkeypatch.setattr(writer, '_writer', None)
+    yield tmp_path
+    if writer._writer is not None:
+        writer._writer.close(timeout=10)
+
+
+@pytest.fixture
+def future_day():
+    """Dia posterior a todas as leituras sintéticas"""
+    return date(2031, 1, 1)
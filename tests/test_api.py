@@ -0,0 +1,65 @@
+import json
+
+import pandas as pd
+
+from wegscan.api import QueryAPI, decode_cursor, keyset_page
+from wegscan.data_index import TimeIndex
+from wegscan.measurements import MEASURED_VARIABLES
+
+
+def _frame():
+    """Duas leituras por instante em A (empates) e uma série simples em B"""
+    moments = pd.to_datetime(['2025-01-01 08:00'] * 3 + ['2025-01-02 08:00'] * 2 + ['2025-01-03 08:00'])
+    df = pd.DataFrame({
+        'DateTime': list(moments) + list(pd.date_range('2025-01-01', periods=4, freq='D')),
+        'EQUIPAMENTO': ['A'] * 6 + ['B'] * 4,
+    })
+    for var in MEASURED_VARIABLES:
+        df[var] = range(len(df))
+    return df
+
+
+def test_keyset_page_delivers_ties_exactly_once():
+    index = TimeIndex(_frame(), version=1)
+    seen, cursor, pages = [], None, 0
+    while True:
+        page, cursor = keyset_page(index, ['A', 'B'], None, None, limit=2,
+                                   after=decode_cursor(cursor) if cursor else None)
+        seen.extend(page[MEASURED_VARIABLES[0]].tolist())
+        pages += 1
+        if cursor is None:
+            break
+    assert sorted(seen) == list(range(10))
+    assert len(seen) == 10
+    assert pages == 5
+
+
+def test_keyset_page_ignores_rows_appended_before_the_cursor():
+    df = _frame()
+    page, cursor = keyset_page(TimeIndex(df, version=1), ['A', 'B'], None, None, limit=4)
+    # Leitura nova de A em um instante anterior ao cursor não desloca a página seguinte
+    extra = df.iloc[[0]].assign(DateTime=pd.Timestamp('2024-12-31'), **{MEASURED_VARIABLES[0]: 99})
+    grown = TimeIndex(pd.concat([df, extra], ignore_index=True), version=2)
+    rest, _ = keyset_page(grown, ['A', 'B'], None, None, limit=100, after=decode_cursor(cursor))
+    assert sorted(page[MEASURED_VARIABLES[0]].tolist() + rest[MEASURED_VARIABLES[0]].tolist()) == list(range(10))
+
+
+def test_respond_etag_and_not_modified(workdir):
+    api = QueryAPI()
+    status, body, etag = api.respond('/ultimas')
+    assert status == 200 and body and etag
+    assert api.respond('/ultimas', if_none_match=etag) == (304, b'', etag)
+    # Outra consulta tem outro ETag
+    assert api.respond('/ultimas?equipamento=X')[2] != etag
+    assert api.respond('/leituras?limite=0')[0] == 400
+
+
+def test_readings_with_only_end_bound_reach_old_months(workdir):
+    api = QueryAPI()
+    first, _, _ = api.dataset.catalog()
+    end = (first + pd.Timedelta(days=20)).date()
+    only_end = json.loads(api.respond(f'/leituras?fim={end}&limite=5000')[1])
+    both = json.loads(api.respond(f'/leituras?inicio={first.date()}&fim={end}&limite=5000')[1])
+    assert only_end['leituras'] and only_end['leituras'] == both['leituras']
+    assert only_end['periodo']['somente_recentes'] is False
+    assert json.loads(api.respond('/agregados')[1])['periodo']['somente_recentes'] is True
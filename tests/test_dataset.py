@@ -0,0 +1,103 @@
+import pandas as pd
+import pytest
+
+from wegscan import stats_engine
+from wegscan.dataset import apply_changes, get_dataset
+from wegscan.ingest import ingest_readings, update_readings
+from wegscan.measurements import MEASURED_VARIABLES
+
+from conftest import make_reading, no_email
+
+VARIABLE = 'TEMPERATURA(°C)'
+
+
+def _edit(row, value):
+    return {
+        'EQUIPAMENTO': row['EQUIPAMENTO'], 'DateTime': row['DateTime'],
+        'variavel': VARIABLE, 'valor_anterior': row[VARIABLE], 'novo_valor': value,
+    }
+
+
+def test_changes_since_carries_cell_updates(workdir):
+    dataset = get_dataset()
+    first, _, _ = dataset.catalog()
+    months = dataset.cold_months(first, None)
+    assert months, "a planilha sintética deve ter meses fora da partição quente"
+    version, window_version, window = dataset.window(months)
+    _, hot_version, hot = dataset.window()
+    local = window.copy()
+
+    cold_row = window.iloc[0]
+    hot_row = hot.dropna(subset=[VARIABLE]).iloc[-1]
+    update_readings([_edit(cold_row, 12.5), _edit(hot_row, 13.5)], alert_sender=no_email)
+
+    current, changes = dataset.changes_since(version)
+    assert current == dataset.version != version
+    assert changes.rows.empty
+    assert [u['novo_valor'] for u in changes.updates] == [12.5, 13.5]
+    assert changes.equipments == {cold_row['EQUIPAMENTO'], hot_row['EQUIPAMENTO']}
+
+    # A cópia local corrigida pelo feed é igual à janela compartilhada (corrigida no lugar)
+    _, new_window_version, new_window = dataset.window(months)
+    assert new_window_version != window_version
+    pd.testing.assert_frame_equal(apply_changes(local, changes), new_window)
+
+    # Sem leitura alterada na janela, ela mantém a versão: só a partição quente mudou
+    _, new_hot_version, new_hot = dataset.window()
+    assert new_hot_version != hot_version
+    same = (new_hot['DateTime'] == hot_row['DateTime']) & (new_hot['EQUIPAMENTO'] == hot_row['EQUIPAMENTO'])
+    assert new_hot.loc[same, VARIABLE].tolist() == [13.5]
+
+
+def test_changes_since_combines_appends_and_updates(workdir):
+    dataset = get_dataset()
+    version, _, hot = dataset.window()
+    local = hot.copy()
+    # No último dia com dados: a partição quente não é deslocada
+    moment = hot['DateTime'].max() + pd.Timedelta(minutes=1)
+    ingest_readings([make_reading("NOVO 1", moment.date(), moment.hour, moment.minute)], alert_sender=no_email)
+    row = hot.dropna(subset=[VARIABLE]).iloc[-1]
+    update_readings([_edit(row, 21.0)], alert_sender=no_email)
+
+    _, changes = dataset.changes_since(version)
+    assert len(changes.rows) == 1
+    assert len(changes.updates) == 1
+    assert changes.equipments == {"NOVO 1", row['EQUIPAMENTO']}
+    patched = apply_changes(local, changes)
+    _, _, shared = dataset.window()
+    pd.testing.assert_frame_equal(patched, shared)
+
+
+def test_changes_since_is_none_after_reload(workdir):
+    dataset = get_dataset()
+    version = dataset.version or dataset.window()[0]
+    dataset.reload()
+    assert dataset.changes_since(version)[1] is None
+
+
+def test_incremental_statistics_match_full_recompute(workdir):
+    dataset = get_dataset()
+    version, _, hot = dataset.window()
+    previous = stats_engine.get_statistics(hot, MEASURED_VARIABLES, key=(version, 'todos'))
+    row = hot.dropna(subset=[VARIABLE]).iloc[-1]
+    update_readings([_edit(row, 66.0)], alert_sender=no_email)
+    new_version, changes = dataset.changes_since(version)
+    _, _, new_hot = dataset.window()
+
+    stats = stats_engine.get_statistics(
+        new_hot, MEASURED_VARIABLES, key=(new_version, 'todos'),
+        base=((version, 'todos'), changes.equipments)
+    )
+    pd.testing.assert_frame_equal(stats, stats_engine.compute_statistics(new_hot, MEASURED_VARIABLES))
+    unchanged = [eq for eq in stats.index if eq != row['EQUIPAMENTO']]
+    pd.testing.assert_frame_equal(stats.loc[unchanged], previous.loc[unchanged])
+
+
+def test_apply_changes_rejects_missing_cell(workdir):
+    dataset = get_dataset()
+    version, _, hot = dataset.window()
+    row = hot.dropna(subset=[VARIABLE]).iloc[-1]
+    update_readings([_edit(row, 30.0)], alert_sender=no_email)
+    _, changes = dataset.changes_since(version)
+    with pytest.raises(KeyError):
+        apply_changes(hot[hot['EQUIPAMENTO'] != row['EQUIPAMENTO']], changes)
@@ -0,0 +1,80 @@
+import os
+from pathlib import Path
+import subprocess
+import sys
+import threading
+
+from wegscan import changelog, storage
+from wegscan.ingest import ingest_readings
+from wegscan.writer import IngestWriter
+
+from conftest import make_reading, no_email
+
+
+def test_group_commit_resolves_every_future(workdir, future_day):
+    before = len(storage.load_readings())
+    writer = IngestWriter(max_wait=0.5)
+    futures = []
+    barrier = threading.Barrier(8)
+
+    def submit(n):
+        barrier.wait()
+        futures.append(writer.submit_readings([make_reading(f"LOTE {n}", future_day, n)], 'teste'))
+
+    threads = [threading.Thread(target=submit, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results = [future.result(timeout=30) for future in futures]
+    writer.close(timeout=10)
+
+    assert len(storage.load_readings()) == before + 8
+    # Gravadas em menos lotes do que pedidos, cada pedido com a sua linha
+    assert max(result['lote'] for result in results) > 1
+    assert len({row for result in results for row in result['linhas']}) == 8
+    assert all('aviso_log' not in result for result in results)
+    assert len(changelog.load_change_log()) == 8 * 5
+
+
+def test_change_log_failure_keeps_saved_readings_and_alerts(workdir, future_day, monkeypatch):
+    def fail(entries, path=None):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(changelog, 'append_change_log_entries', fail)
+    before = len(storage.load_readings())
+    reading = make_reading("FALHA LOG", future_day, 8)
+    reading['TEMPERATURA(°C)'] = 99.0
+
+    result = ingest_readings([reading], alert_config={}, alert_sender=no_email)
+
+    assert len(storage.load_readings()) == before + 1
+    assert 'disco cheio' in result['aviso_log']
+    assert result['alertas'] == ['TEMPERATURA(°C): 99.0 (acima do limite máximo (70))']
+
+
+_CHILD = """
+import sys
+from datetime import date
+sys.path.insert(0, sys.argv[2])
+from conftest import make_reading, no_email
+from wegscan.ingest import ingest_readings
+n = int(sys.argv[1])
+for i in range(15):
+    ingest_readings([make_reading(f"PROCESSO {n}", date(2031, 1, 1 + i), n, i)], alert_sender=no_email)
+"""
+
+
+def test_two_processes_do_not_lose_readings(workdir):
+    before = len(storage.load_readings())
+    tests_dir = Path(__file__).parent
+    env = {**os.environ, 'PYTHONPATH': str(tests_dir.parent)}
+    processes = [
+        subprocess.Popen([sys.executable, '-c', _CHILD, str(n), str(tests_dir)], env=env)
+        for n in (1, 2)
+    ]
+    assert [process.wait(timeout=300) for process in processes] == [0, 0]
+
+    df = storage.load_readings()
+    assert len(df) == before + 30
+    assert df['EQUIPAMENTO'].isin(["PROCESSO 1", "PROCESSO 2"]).sum() == 30
@@ -0,0 +1,5 @@
+"""
+Núcleo do WEG SCAN
+Armazenamento, ingestão, alertas e análises independentes do Streamlit;
+o dashboard (app.py) e o serviço (python -m wegscan) são clientes deste pacote
+"""
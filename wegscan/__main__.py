@@ -0,0 +1,5 @@
+"""Ponto de entrada: python -m wegscan"""
+
+from wegscan.service import main
+
+main()
@@ -0,0 +1,262 @@
+"""
+Módulo de alertas
+Avalia as medições contra os limites de segurança e envia os alertas por e-mail,
+sem depender de uma sessão do dashboard
+"""
+
+from datetime import datetime
+import logging
+
+from wegscan.config import ALERT_LOG_FILE, get_email_config
+from wegscan.files import read_json, write_json
+from wegscan.measurements import ALERT_LIMITS, MEASURED_VARIABLES
+from wegscan.profiling import timed
+
+logger = logging.getLogger(__name__)
+
+# Quantidade de alertas mantidos no log
+ALERT_LOG_SIZE = 1000
+
+
+def is_alert_triggered(variavel, valor):
+    """Verifica se o valor ultrapassa os limites de alerta"""
+    if variavel not in ALERT_LIMITS or valor is None:
+        return False, None
+    
+    limits = ALERT_LIMITS[variavel]
+    
+    if valor > limits['max']:
+        return True, f"acima do limite máximo ({limits['max']})"
+    elif valor < limits['min']:
+        return True, f"abaixo do limite mínimo ({limits['min']})"
+    
+    return False, None
+
+
+def limit_violations(df_equipment, variable, limits):
+    """Lista as leituras fora dos limites (df já filtrado pelo equipamento)"""
+    df_equipment = df_equipment.dropna(subset=[variable])
+    
+    if df_equipment.empty or variable not in limits:
+        return []
+    
+    limits = limits[variable]
+    alerts = []
+    
+    for idx, row in df_equipment.iterrows():
+        value = row[variable]
+        if value > limits['max']:
+            alerts.append({
+                'type': 'danger',
+                'message': f"⚠️ {variable}: {value:.2f} (Acima do limite máximo: {limits['max']})",
+                'datetime': row['DateTime']
+            })
+        elif value < limits['min']:
+            alerts.append({
+                'type': 'warning',
+                'message': f"⚠️ {variable}: {value:.2f} (Abaixo do limite mínimo: {limits['min']})",
+                'datetime': row['DateTime']
+            })
+    
+    return alerts
+
+
+def evaluate_reading(reading):
+    """Retorna (variável, valor, motivo) de cada medição da leitura fora dos limites"""
+    triggered_alerts = []
+    for variavel in MEASURED_VARIABLES:
+        valor = reading.get(variavel)
+        if valor is None or valor == '':
+            continue
+        try:
+            valor_float = float(valor)
+        except (ValueError, TypeError):
+            continue
+        triggered, motivo = is_alert_triggered(variavel, valor_float)
+        if triggered:
+            triggered_alerts.append((variavel, valor_float, motivo))
+    return triggered_alerts
+
+
+def email_config_problem(config):
+    """Retorna a descrição do problema de configuração de e-mail, ou None se estiver completa"""
+    if not config['sender_email'] or not config['sender_password']:
+        return "E-mail não configurado. Configure EMAIL_SENDER e EMAIL_PASSWORD nos secrets."
+    if not config['recipient_emails'] or config['recipient_emails'][0] == '':
+        return "Destinatários não configurados. Configure EMAIL_RECIPIENTS nos secrets."
+    return None
+
+
+def build_alert_message(equipamento, variavel, valor, motivo, data, horario, config):
+    """Monta a mensagem de e-mail (HTML) do alerta"""
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    msg = MIMEMultipart()
+    msg['From'] = config['sender_email']
+    msg['To'] = ', '.join(config['recipient_emails'])
+    msg['Subject'] = f"🚨 ALERTA WEG SCAN - {equipamento} - {variavel}"
+    
+    # Corpo do e-mail em HTML
+    limits = ALERT_LIMITS.get(variavel, {})
+    
+    html_body = f"""
+    <html>
+        <head>
+            <style>
+                body {{ font-family: Arial, sans-serif; }}
+                .container {{ max-width: 600px; margin: 0 auto; }}
+                .header {{ background-color: #d32f2f; color: white; padding: 20px; border-radius: 5px; }}
+                .content {{ padding: 20px; background-color: #f5f5f5; }}
+                .alert-box {{ background-color: #ffebee; border-left: 4px solid #d32f2f; padding: 15px; margin: 10px 0; }}
+                .info-box {{ background-color: #e3f2fd; border-left: 4px solid #1976d2; padding: 15px; margin: 10px 0; }}
+                .footer {{ text-align: center; color: #666; font-size: 12px; margin-top: 20px; }}
+                table {{ width: 100%; border-collapse: collapse; }}
+                td {{ padding: 10px; border-bottom: 1px solid #ddd; }}
+                .label {{ font-weight: bold; width: 30%; }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>🚨 ALERTA DE SEGURANÇA</h1>
+                    <p>Medição fora dos limites de segurança detectada</p>
+                </div>
+                
+                <div class="content">
+                    <div class="alert-box">
+                        <h2>{variavel}</h2>
+                        <p><strong>Valor:</strong> {valor:.2f}</p>
+                        <p><strong>Status:</strong> {motivo}</p>
+                    </div>
+                    
+                    <div class="info-box">
+                        <table>
+                            <tr>
+                                <td class="label">Equipamento:</td>
+                                <td>{equipamento}</td>
+                            </tr>
+                            <tr>
+                                <td class="label">Data:</td>
+                                <td>{data}</td>
+                            </tr>
+                            <tr>
+                                <td class="label">Horário:</td>
+                                <td>{horario}</td>
+                            </tr>
+                            <tr>
+                                <td class="label">Limite Máximo:</td>
+                                <td>{limits.get('max', 'N/A')}</td>
+                            </tr>
+                            <tr>
+                                <td class="label">Limite Mínimo:</td>
+                                <td>{limits.get('min', 'N/A')}</td>
+                            </tr>
+                            <tr>
+                                <td class="label">Timestamp:</td>
+                                <td>{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</td>
+                            </tr>
+                        </table>
+                    </div>
+                    
+                    <p style="margin-top: 20px; color: #d32f2f;">
+                        <strong>⚠️ Ação Recomendada:</strong> Verifique o equipamento imediatamente.
+                    </p>
+                </div>
+                
+                <div class="footer">
+                    <p>Este é um e-mail automático do WEG SCAN Dashboard</p>
+                    <p>Não responda este e-mail</p>
+                </div>
+            </div>
+        </body>
+    </html>
+    """
+    
+    msg.attach(MIMEText(html_body, 'html'))
+    return msg
+
+
+@timed('email.envio')
+def deliver_alert_email(equipamento, variavel, valor, motivo, data, horario, config=None):
+    """Envia o e-mail de alerta e registra o envio (exceções de SMTP são propagadas)"""
+    import smtplib
+
+    config = config or get_email_config()
+    msg = build_alert_message(equipamento, variavel, valor, motivo, data, horario, config)
+    
+    with smtplib.SMTP(config['smtp_server'], config['smtp_port']) as server:
+        server.starttls()
+        server.login(config['sender_email'], config['sender_password'])
+        server.send_message(msg)
+    
+    log_alert_sent(equipamento, variavel, valor, motivo)
+
+
+def send_alert_email(equipamento, variavel, valor, motivo, data, horario, config=None):
+    """Envia e-mail de alerta, registrando falhas no log do processo"""
+    config = config or get_email_config()
+    
+    problem = email_config_problem(config)
+    if problem:
+        logger.warning(problem)
+        return False
+    
+    try:
+        deliver_alert_email(equipamento, variavel, valor, motivo, data, horario, config)
+        return True
+    except Exception as e:
+        logger.error("Erro ao enviar e-mail: %s", e)
+        return False
+
+
+@timed('gravacao.log_alertas')
+def append_alert_log_entries(entries, path=ALERT_LOG_FILE):
+    """Acrescenta registros de alertas ao arquivo JSON, mantendo apenas os últimos"""
+    alerts = read_json(path, [])
+    alerts.extend(entries)
+    write_json(path, alerts[-ALERT_LOG_SIZE:])
+
+
+def log_alert_sent(equipamento, variavel, valor, motivo):
+    """Registra alertas enviados em arquivo JSON (gravação em lote pelo escritor único)"""
+    from wegscan.writer import get_writer
+
+    entry = {
+        'timestamp': datetime.now().isoformat(),
+        'equipamento': equipamento,
+        'variavel': variavel,
+        'valor': float(valor),
+        'motivo': motivo
+    }
+    future = get_writer().submit_alert_log([entry])
+    future.add_done_callback(
+        lambda done: done.exception() and logger.error("Erro ao registrar alerta: %s", done.exception())
+    )
+    return future
+
+
+def get_recent_alerts(limit=10, path=ALERT_LOG_FILE):
+    """Retorna alertas recentes"""
+    try:
+        return read_json(path, [])[-limit:]
+    except Exception:
+        return []
+
+
+def dispatch_alerts(reading, config=None, sender=send_alert_email):
+    """Avalia uma leitura e envia um alerta por variável fora dos limites
+
+    Retorna a descrição de cada alerta enviado com sucesso.
+    """
+    alertas_enviados = []
+    
+    for variavel, valor, motivo in evaluate_reading(reading):
+        success = sender(
+            reading['EQUIPAMENTO'], variavel, valor, motivo,
+            reading.get('DATA'), reading.get('HORÁRIO'), config
+        )
+        if success:
+            alertas_enviados.append(f"{variavel}: {valor} ({motivo})")
+    
+    return alertas_enviados
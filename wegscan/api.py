@@ -0,0 +1,454 @@
+"""
+Módulo da API de consulta
+API HTTP local, somente leitura, em JSON, para sistemas da planta (CMMS,
+SCADA): últimas leituras por equipamento, consulta por período com paginação
+por chave, estatísticas agregadas e alertas ativos. Lê o conjunto de dados
+compartilhado do processo (partições mensais, sem reler a planilha a cada
+consulta) e não depende do Streamlit
+
+Sem inicio/fim, /leituras e /agregados cobrem só os meses recentes mantidos em
+memória; o campo periodo da resposta informa o período coberto. /ultimas e
+/alertas incluem os equipamentos que pararam de enviar leituras, com a última
+leitura deles nos meses antigos
+
+Cada resposta tem um ETag derivado da versão dos dados e da consulta: com
+If-None-Match igual a resposta é 304 sem corpo, e as respostas de uma versão
+ficam em cache até os dados mudarem
+
+Uso:
+    python -m wegscan.api                        # http://127.0.0.1:8503
+    python -m wegscan.api --host 0.0.0.0 --porta 8600
+
+Rotas (GET):
+    /saude
+    /equipamentos
+    /ultimas?equipamento=GARO 10
+    /leituras?equipamento=GARO 10&inicio=2025-01-01&fim=2025-01-31&limite=500&apos=<cursor>
+    /agregados?equipamento=GARO 10&inicio=2025-01-01&fim=2025-01-31&variavel=TEMPERATURA(°C)
+    /alertas?equipamento=GARO 10
+"""
+
+import argparse
+import base64
+from datetime import date
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import math
+import os
+import threading
+import time
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from wegscan.alerts import evaluate_reading
+from wegscan.data_index import TimeIndex
+from wegscan.dataset import get_dataset
+from wegscan.measurements import ALERT_LIMITS, MEASURED_VARIABLES
+from wegscan.result_cache import ResultCache
+from wegscan.stats_engine import get_statistics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8503
+
+# Intervalo mínimo (segundos) entre verificações de alteração da planilha
+REFRESH_INTERVAL = 1.0
+
+# Tamanho de página padrão e máximo de /leituras
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+
+# Respostas mantidas em cache (todas da versão atual dos dados)
+RESPONSE_CACHE_SIZE = 512
+
+# Parte do ETag única por execução: os números de versão recomeçam a cada processo
+_ETAG_SEED = f"{os.getpid()}-{time.time_ns()}"
+
+
+class QueryError(ValueError):
+    """Parâmetro de consulta inválido (resposta 400)"""
+
+
+def _json_value(value):
+    """Converte valores do pandas/NumPy para JSON (NaN -> null, datas em ISO)"""
+    if value is None:
+        return None
+    if isinstance(value, (pd.Timestamp, date)):
+        return value.isoformat()
+    if isinstance(value, np.datetime64):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return None if math.isnan(value) else float(value)
+    return value
+
+
+def _records(frame, variables=MEASURED_VARIABLES):
+    """Linhas de leituras como dicionários JSON"""
+    variables = [var for var in variables if var in frame.columns]
+    values = frame[variables].to_numpy(dtype=float, na_value=np.nan)
+    moments = frame['DateTime'].dt.strftime('%Y-%m-%dT%H:%M:%S').tolist()
+    return [
+        {
+            'DateTime': moment,
+            'EQUIPAMENTO': equipment,
+            **{var: (None if math.isnan(value) else float(value)) for var, value in zip(variables, row)},
+        }
+        for moment, equipment, row in zip(moments, frame['EQUIPAMENTO'].tolist(), values.tolist())
+    ]
+
+
+def _parse_moment(value, name):
+    """Data (AAAA-MM-DD, dia inteiro no fim do período) ou data e hora ISO"""
+    try:
+        if len(value) == 10:
+            return date.fromisoformat(value)
+        return pd.Timestamp(value).to_pydatetime()
+    except ValueError as e:
+        raise QueryError(f"{name} inválido: {value}") from e
+
+
+def encode_cursor(equipment, moment, ties):
+    """Cursor da paginação por chave: última linha entregue (equipamento, DateTime, empates já entregues)"""
+    raw = json.dumps([equipment, int(pd.Timestamp(moment).value), ties]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        equipment, nanoseconds, ties = json.loads(raw)
+        return str(equipment), np.datetime64(int(nanoseconds), 'ns'), int(ties)
+    except (ValueError, TypeError) as e:
+        raise QueryError("Cursor 'apos' inválido") from e
+
+
+def keyset_page(index, equipments, start, end, limit, after=None):
+    """Página de leituras na ordem (equipamento, DateTime) a partir do cursor after
+
+    A posição é encontrada por busca binária na fatia do equipamento: a página
+    não depende de quantas linhas vêm antes, e leituras acrescentadas depois não
+    deslocam as páginas seguintes. Retorna (linhas, próximo cursor ou None).
+    """
+    pieces = []
+    remaining = limit + 1
+    for equipment in sorted(equipments):
+        if after is not None and equipment < after[0]:
+            continue
+        view = index.slice(equipment, start, end)
+        offset = 0
+        if after is not None and equipment == after[0]:
+            times = view['DateTime'].to_numpy('datetime64[ns]')
+            offset = int(np.searchsorted(times, after[1], side='left')) + after[2]
+        piece = view.iloc[offset:offset + remaining]
+        if not piece.empty:
+            pieces.append(piece)
+            remaining -= len(piece)
+        if remaining <= 0:
+            break
+
+    page = pd.concat(pieces) if len(pieces) > 1 else (pieces[0] if pieces else index.frame.iloc[:0])
+    if len(page) <= limit:
+        return page, None
+
+    page = page.iloc[:limit]
+    last = page.iloc[-1]
+    # Empates: linhas do mesmo equipamento e instante já entregues (incluindo páginas anteriores)
+    moment = np.datetime64(last['DateTime'], 'ns')
+    delivered = page[(page['EQUIPAMENTO'] == last['EQUIPAMENTO']) & (page['DateTime'] == last['DateTime'])]
+    ties = len(delivered)
+    if after is not None and after[0] == last['EQUIPAMENTO'] and after[1] == moment:
+        ties += after[2]
+    return page, encode_cursor(last['EQUIPAMENTO'], moment, ties)
+
+
+class QueryAPI:
+    """Consultas sobre o conjunto compartilhado, com cache de respostas por versão"""
+
+    def __init__(self, dataset=None, refresh_interval=REFRESH_INTERVAL):
+        self.dataset = dataset or get_dataset()
+        self.refresh_interval = refresh_interval
+        self._responses = ResultCache(maxsize=RESPONSE_CACHE_SIZE)
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+        self.routes = {
+            '/saude': self._health,
+            '/equipamentos': self._equipments,
+            '/ultimas': self._latest,
+            '/leituras': self._readings,
+            '/agregados': self._aggregates,
+            '/alertas': self._alerts,
+        }
+
+    def _refresh(self):
+        """Confere a assinatura da planilha no máximo a cada refresh_interval (só um stat)"""
+        if not self.dataset.loaded:
+            # Primeira consulta: carregar antes de derivar o ETag da versão
+            self.dataset.window()
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_refresh < self.refresh_interval:
+                return
+            self._last_refresh = now
+        self.dataset.refresh_if_changed()
+
+    def _index(self, months=()):
+        """(versão, índice temporal) da partição recente mais os meses antigos pedidos"""
+        _, version, frame = self.dataset.window(months)
+        index = self.dataset.time_index(version)
+        if index is None:
+            index = TimeIndex(frame, version=version)
+        return version, index
+
+    def _period_index(self, params):
+        """(versão, índice) com os meses antigos do período; sem período, só a partição recente"""
+        start, end = params['inicio'], params['fim']
+        if start is None and end is None:
+            return self._index()
+        first, last, _ = self.dataset.catalog()
+        return self._index(self.dataset.cold_months(start or first, end or last))
+
+    def _period(self, params):
+        """Período coberto pela resposta; somente_recentes indica que os meses antigos ficaram de fora"""
+        start, end = params['inicio'], params['fim']
+        first, last, _ = self.dataset.catalog()
+        if start is not None or end is not None:
+            return {'inicio': _json_value(start or first), 'fim': _json_value(end or last), 'somente_recentes': False}
+        hot_start = self.dataset.hot_start
+        partial = hot_start is not None and first is not None and first < hot_start
+        return {
+            'inicio': _json_value(hot_start if partial else first),
+            'fim': _json_value(last),
+            'somente_recentes': partial,
+        }
+
+    def respond(self, target, if_none_match=None):
+        """Resposta de um GET: (status, corpo JSON em bytes, ETag ou None)
+
+        Com if_none_match igual ao ETag atual a resposta é 304 sem consultar os dados.
+        """
+        parts = urlsplit(target)
+        handler = self.routes.get(parts.path.rstrip('/') or '/')
+        if handler is None:
+            return 404, _dump({'erro': 'Rota não encontrada', 'rotas': sorted(self.routes)}), None
+        try:
+            params = _parse_params(parts.query)
+        except QueryError as e:
+            return 400, _dump({'erro': str(e)}), None
+
+        self._refresh()
+        canonical = urlencode(sorted((k, v) for k, values in parse_qs(parts.query).items() for v in values))
+        version = self.dataset.version
+        key = (version, parts.path, canonical)
+        etag = '"' + hashlib.sha1(f"{_ETAG_SEED}:{key}".encode('utf-8')).hexdigest()[:20] + '"'
+        if if_none_match == etag:
+            return 304, b'', etag
+
+        cached = self._responses.get(key)
+        if cached is not None:
+            return 200, cached, etag
+        try:
+            body = _dump(handler(params))
+        except QueryError as e:
+            return 400, _dump({'erro': str(e)}), None
+        # Os dados mudaram durante a consulta: não guardar sob a versão antiga
+        if self.dataset.version == version:
+            self._responses.put(key, body)
+        return 200, body, etag
+
+    def _selected(self, index, params):
+        """Equipamentos pedidos (todos os indexados se nenhum); desconhecidos resultam em listas vazias"""
+        return params['equipamento'] or index.equipments
+
+    def _health(self, params):
+        first, last, equipments = self.dataset.catalog()
+        return {
+            'status': 'ok',
+            'equipamentos': len(equipments),
+            'primeira_leitura': _json_value(first),
+            'ultima_leitura': _json_value(last),
+        }
+
+    def _equipments(self, params):
+        _, index = self._index()
+        _, _, equipments = self.dataset.catalog()
+        latest = self._latest_rows(index, {'equipamento': equipments})
+        last_moments = dict(zip(latest['EQUIPAMENTO'], latest['DateTime']))
+        return {'equipamentos': [
+            {
+                'equipamento': equipment,
+                'leituras_recentes': len(index.slice(equipment)),
+                'ultima_leitura': _json_value(last_moments.get(equipment)),
+            }
+            for equipment in equipments
+        ]}
+
+    def _latest_rows(self, index, params):
+        """Última leitura de cada equipamento, inclusive dos que pararam de enviar leituras
+
+        Equipamentos sem leituras na partição recente são procurados no mês antigo
+        mais recente em que aparecem.
+        """
+        _, _, catalog = self.dataset.catalog()
+        rows = []
+        for equipment in params['equipamento'] or catalog:
+            row = index.slice(equipment).iloc[-1:]
+            if row.empty:
+                row = self.dataset.latest_cold_reading(equipment)
+            if row is not None and not row.empty:
+                rows.append(row)
+        return pd.concat(rows) if rows else index.frame.iloc[:0]
+
+    def _latest(self, params):
+        _, index = self._index()
+        return {'leituras': _records(self._latest_rows(index, params))}
+
+    def _readings(self, params):
+        _, index = self._period_index(params)
+        page, cursor = keyset_page(
+            index, self._selected(index, params), params['inicio'], params['fim'],
+            params['limite'], params['apos']
+        )
+        return {'leituras': _records(page), 'proximo': cursor, 'periodo': self._period(params)}
+
+    def _aggregates(self, params):
+        version, index = self._period_index(params)
+        equipments = self._selected(index, params)
+        variables = params['variavel'] or MEASURED_VARIABLES
+        unknown = [var for var in variables if var not in MEASURED_VARIABLES]
+        if unknown:
+            raise QueryError(f"Variável desconhecida: {', '.join(unknown)}")
+        frame = index.query(equipments, params['inicio'], params['fim'])
+        stats = get_statistics(
+            frame, variables, key=(version, 'api', tuple(equipments), params['inicio'], params['fim'])
+        )
+        result = {}
+        for equipment in stats.index:
+            row = stats.loc[equipment]
+            entry = {'registros': int(row[('Geral', 'Registros')])}
+            for var in variables:
+                if var in row.index.get_level_values(0):
+                    entry[var] = {stat: _json_value(value) for stat, value in row[var].items()}
+            result[equipment] = entry
+        return {'agregados': result, 'periodo': self._period(params)}
+
+    def _alerts(self, params):
+        _, index = self._index()
+        alerts = []
+        for reading in self._latest_rows(index, params).to_dict('records'):
+            for variable, value, reason in evaluate_reading(reading):
+                alerts.append({
+                    'equipamento': reading['EQUIPAMENTO'],
+                    'DateTime': _json_value(reading['DateTime']),
+                    'variavel': variable,
+                    'valor': value,
+                    'motivo': reason,
+                    'limites': ALERT_LIMITS.get(variable),
+                })
+        return {'alertas': alerts}
+
+
+def _dump(payload):
+    return json.dumps(payload, ensure_ascii=False, default=_json_value).encode('utf-8')
+
+
+def _parse_params(query):
+    """Parâmetros comuns das rotas, validados"""
+    raw = parse_qs(query)
+
+    def many(name):
+        return [item.strip() for value in raw.get(name, []) for item in value.split(',') if item.strip()]
+
+    def one(name):
+        values = raw.get(name)
+        return values[-1] if values else None
+
+    try:
+        limit = int(one('limite') or DEFAULT_LIMIT)
+    except ValueError as e:
+        raise QueryError("limite deve ser um número inteiro") from e
+    if not 1 <= limit <= MAX_LIMIT:
+        raise QueryError(f"limite deve estar entre 1 e {MAX_LIMIT}")
+
+    return {
+        'equipamento': many('equipamento'),
+        'variavel': raw.get('variavel', []),
+        'inicio': _parse_moment(one('inicio'), 'inicio') if one('inicio') else None,
+        'fim': _parse_moment(one('fim'), 'fim') if one('fim') else None,
+        'limite': limit,
+        'apos': decode_cursor(one('apos')) if one('apos') else None,
+    }
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """GET das rotas da API; conexões mantidas abertas (HTTP/1.1)"""
+
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalhos e corpo saem em gravações separadas: sem isso o Nagle segura a resposta
+    disable_nagle_algorithm = True
+
+    def _send(self, status, body=b'', etag=None):
+        self.send_response(status)
+        if body:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        try:
+            status, body, etag = self.server.api.respond(self.path, self.headers.get('If-None-Match'))
+        except Exception as e:
+            logger.exception("Erro ao atender %s", self.path)
+            self._send(500, _dump({'erro': str(e)}))
+            return
+        self._send(status, body, etag)
+
+    def _read_only(self):
+        self._send(405, _dump({'erro': 'API somente leitura'}))
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = _read_only
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, api=None):
+    """Cria o servidor da API (porta 0: escolhida pelo sistema)"""
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.daemon_threads = True
+    server.api = api or QueryAPI()
+    return server
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Atende a API indefinidamente"""
+    server = make_server(host, port)
+    logger.info("API de consulta em http://%s:%d/", host, server.server_address[1])
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    """Ponto de entrada (python -m wegscan.api)"""
+    parser = argparse.ArgumentParser(prog='python -m wegscan.api', description="API de consulta do WEG SCAN")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--porta', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    serve(args.host, args.porta)
+
+
+if __name__ == '__main__':
+    main()
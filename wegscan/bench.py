@@ -0,0 +1,265 @@
+"""
+Módulo de benchmarks dos caminhos críticos
+Gera frotas sintéticas de vários tamanhos (wegscan.synthetic) e mede cada
+caminho crítico do dashboard, mostra as curvas de escala e compara com uma
+execução de referência gravada
+
+Os caminhos do app.py são medidos pelas funções do núcleo que eles chamam:
+load_excel_data (storage.load_readings), calculate_statistics
+(stats_engine.compute_statistics, sem cache), check_alerts
+(alerts.limit_violations), create_trend_chart (charts.build_trend_chart) e o
+mapa da frota (fleet.build_fleet_grid)
+
+Uso:
+    python -m wegscan.bench                                  # tamanhos padrão
+    python -m wegscan.bench --tamanhos 5x4x0.25,20x6x2       # motores x leituras/dia x anos
+    python -m wegscan.bench --salvar base.json               # grava a referência
+    python -m wegscan.bench --comparar base.json             # falha se houver regressão
+"""
+
+import argparse
+import contextlib
+from datetime import date, time as clock
+import json
+import logging
+import math
+import statistics
+import sys
+import tempfile
+import time
+
+# Tamanhos padrão: (motores, leituras por dia, anos)
+DEFAULT_SIZES = [(5, 4, 0.25), (10, 4, 1.0), (20, 4, 2.0)]
+
+DEFAULT_REPEATS = 3
+
+# Aumento tolerado do tempo mínimo antes de acusar regressão
+DEFAULT_TOLERANCE = 0.25
+
+# Diferenças abaixo disso (segundos) são ruído de medição
+NOISE_FLOOR = 0.002
+
+# Período consultado pelo filtro da barra lateral (últimos dias da frota)
+FILTER_DAYS = 30
+
+
+def parse_size(text):
+    """Converte 'motoresxleituras_por_diaxanos' em tupla"""
+    motors, readings, years = text.lower().split('x')
+    return int(motors), int(readings), float(years)
+
+
+def size_label(size):
+    motors, readings, years = size
+    return f"{motors}x{readings}x{years:g}"
+
+
+class Fleet:
+    """Frota sintética gravada em um diretório temporário, usado como diretório de trabalho"""
+
+    def __init__(self, size, seed=0):
+        from wegscan.synthetic import generate_fleet
+
+        self.size = size
+        self._tmp = tempfile.TemporaryDirectory(prefix='wegscan-bench-')
+        self.directory = self._tmp.name
+        with contextlib.chdir(self.directory):
+            from wegscan.config import EXCEL_FILE
+
+            motors, readings, years = size
+            self.readings = generate_fleet(EXCEL_FILE, motors, readings, years, seed=seed)
+            self._seed_change_log()
+
+    def _seed_change_log(self):
+        """Log de alterações com uma entrada por leitura, como depois de meses de uso"""
+        from wegscan import changelog
+
+        entries = [
+            changelog.make_change_log_entry(equipment, 'TEMPERATURA(°C)', None, 50.0)
+            for equipment in self.readings['EQUIPAMENTO'].to_numpy()
+        ]
+        changelog.save_change_log(entries)
+
+    def cleanup(self):
+        self._tmp.cleanup()
+
+
+def _benchmarks(fleet):
+    """Caminhos medidos: nome -> função sem argumentos (executada no diretório da frota)"""
+    import excel_storage
+    from wegscan import changelog, storage
+    from wegscan.alerts import limit_violations
+    from wegscan.charts import build_trend_chart
+    from wegscan.data_index import TimeIndex
+    from wegscan.exports import export_to_excel
+    from wegscan.fleet import build_fleet_grid
+    from wegscan.load_analysis import analyze_load
+    from wegscan.measurements import ALERT_LIMITS, MEASURED_VARIABLES
+    from wegscan.stats_engine import compute_statistics
+    from wegscan.writer import get_writer
+
+    # Os adaptadores Streamlit avisam que estão fora de uma sessão; irrelevante aqui
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith('streamlit'):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+    df = fleet.readings
+    index = TimeIndex(df)
+    equipments = index.equipments
+    _, last = index.time_bounds()
+    end = last.astype('datetime64[D]').item()
+    start = date.fromordinal(end.toordinal() - FILTER_DAYS)
+    filtered = index.query(equipments, start, end)
+    stats = compute_statistics(filtered, MEASURED_VARIABLES)
+    first_equipment = index.slice(equipments[0])
+
+    def sidebar_filter():
+        TimeIndex(df).query(equipments, start, end)
+
+    def check_alerts():
+        for equipment in equipments:
+            view = index.slice(equipment, start, end)
+            for variable in MEASURED_VARIABLES:
+                limit_violations(view, variable, ALERT_LIMITS)
+
+    def add_record():
+        excel_storage.add_record_to_excel(
+            end, clock(23, 59), equipments[0], 1.0, 1.0, 1.0, 50.0, 40.0
+        )
+
+    def change_log_entry():
+        return changelog.make_change_log_entry(equipments[0], 'TEMPERATURA(°C)', 50.0, 51.0)
+
+    return {
+        'load_excel_data': lambda: storage.load_readings(),
+        'load_data_from_excel': excel_storage.load_data_from_excel,
+        'filtro_lateral': sidebar_filter,
+        'calculate_statistics': lambda: compute_statistics(filtered, MEASURED_VARIABLES),
+        'check_alerts': check_alerts,
+        'create_trend_chart': lambda: build_trend_chart(
+            first_equipment, equipments[0], MEASURED_VARIABLES[3], "Tendência"
+        ),
+        'mapa_frota': lambda: build_fleet_grid(filtered, MEASURED_VARIABLES),
+        'analise_carga': lambda: [analyze_load(index.slice(equipment)) for equipment in equipments],
+        'export_to_excel': lambda: export_to_excel(filtered, stats, MEASURED_VARIABLES),
+        'add_record_to_excel': add_record,
+        'log_alteracoes': lambda: changelog.append_change_log_entries([change_log_entry()]),
+        'log_alteracoes_escritor': lambda: get_writer().submit_change_log([change_log_entry()]).result(),
+    }
+
+
+def run_size(size, repeats=DEFAULT_REPEATS, only=None):
+    """Mede todos os caminhos para um tamanho de frota; retorna o resultado serializável"""
+    fleet = Fleet(size)
+    try:
+        with contextlib.chdir(fleet.directory):
+            timings = {}
+            for name, func in _benchmarks(fleet).items():
+                if only and name not in only:
+                    continue
+                # Uma execução de aquecimento (importações tardias, caches do SO)
+                func()
+                samples = []
+                for _ in range(repeats):
+                    started = time.perf_counter()
+                    func()
+                    samples.append(time.perf_counter() - started)
+                timings[name] = {'mediana': statistics.median(samples), 'min': min(samples)}
+        return {'linhas': len(fleet.readings), 'tempos': timings}
+    finally:
+        fleet.cleanup()
+
+
+def scaling_exponent(points):
+    """Expoente k de tempo ~ linhas^k entre o menor e o maior tamanho"""
+    (rows_a, time_a), (rows_b, time_b) = points[0], points[-1]
+    if rows_b <= rows_a or time_a <= 0 or time_b <= 0:
+        return None
+    return math.log(time_b / time_a) / math.log(rows_b / rows_a)
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Lista as regressões (tamanho, caminho, referência, atual) acima da tolerância"""
+    regressions = []
+    for label, result in results.items():
+        reference = baseline.get(label)
+        if reference is None:
+            continue
+        for name, timing in result['tempos'].items():
+            before = reference['tempos'].get(name)
+            if before is None:
+                continue
+            # O mínimo é a medida menos sujeita a ruído entre execuções
+            old, new = before['min'], timing['min']
+            if new > old * (1 + tolerance) and new - old > NOISE_FLOOR:
+                regressions.append((label, name, old, new))
+    return regressions
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:10.1f}"
+
+
+def print_report(results, out=sys.stdout):
+    """Imprime os tempos por tamanho e as curvas de escala"""
+    labels = list(results)
+    names = list(dict.fromkeys(name for result in results.values() for name in result['tempos']))
+
+    print("Mediana em ms por tamanho de frota (motores x leituras/dia x anos)", file=out)
+    header = f"{'caminho':<26}" + ''.join(f"{label:>14}" for label in labels) + f"{'expoente':>10}"
+    print(header, file=out)
+    print(f"{'linhas':<26}" + ''.join(f"{results[label]['linhas']:>14}" for label in labels), file=out)
+    for name in names:
+        points = [
+            (results[label]['linhas'], results[label]['tempos'][name]['mediana'])
+            for label in labels if name in results[label]['tempos']
+        ]
+        exponent = scaling_exponent(points) if len(points) > 1 else None
+        cells = ''.join(
+            f"{_ms(results[label]['tempos'][name]['mediana']):>14}" if name in results[label]['tempos'] else f"{'-':>14}"
+            for label in labels
+        )
+        print(f"{name:<26}{cells}{exponent:>10.2f}" if exponent is not None else f"{name:<26}{cells}{'-':>10}",
+              file=out)
+
+
+def main(argv=None):
+    """Ponto de entrada (python -m wegscan.bench)"""
+    parser = argparse.ArgumentParser(prog='python -m wegscan.bench', description="Benchmarks do WEG SCAN")
+    parser.add_argument('--tamanhos', default=','.join(size_label(size) for size in DEFAULT_SIZES),
+                        help="Lista motoresxleituras_por_diaxanos separada por vírgula")
+    parser.add_argument('--repeticoes', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--somente', help="Caminhos a medir, separados por vírgula")
+    parser.add_argument('--salvar', help="Grava os resultados (JSON) como referência")
+    parser.add_argument('--comparar', help="Compara com uma referência gravada")
+    parser.add_argument('--tolerancia', type=float, default=DEFAULT_TOLERANCE,
+                        help="Aumento relativo tolerado (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(text) for text in args.tamanhos.split(',') if text.strip()]
+    only = set(args.somente.split(',')) if args.somente else None
+    results = {}
+    for size in sizes:
+        print(f"Medindo frota {size_label(size)}...", file=sys.stderr)
+        results[size_label(size)] = run_size(size, args.repeticoes, only)
+
+    print_report(results)
+
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerancia)
+        for label, name, old, new in regressions:
+            print(f"REGRESSÃO {label} {name}: {old * 1000:.1f} ms -> {new * 1000:.1f} ms")
+        if regressions:
+            return 1
+        print("Sem regressões em relação à referência")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Módulo do log de alterações
+Registra no arquivo JSON cada valor gravado (valor anterior e novo valor)
+"""
+
+from datetime import datetime
+
+from wegscan.config import CHANGE_LOG_FILE
+from wegscan.files import read_json, write_json
+from wegscan.profiling import timed
+
+
+def load_change_log(path=CHANGE_LOG_FILE):
+    """Carrega o log de alterações do arquivo JSON"""
+    return read_json(path, [])
+
+
+def save_change_log(log_data, path=CHANGE_LOG_FILE):
+    """Salva o log de alterações em arquivo JSON"""
+    write_json(path, log_data)
+
+
+def make_change_log_entry(equipamento, variavel, valor_anterior, novo_valor, usuario="Operador Local"):
+    """Monta uma entrada do log de alterações"""
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'equipamento': equipamento,
+        'variavel': variavel,
+        'valor_anterior': valor_anterior,
+        'novo_valor': novo_valor,
+        'usuario': usuario
+    }
+
+
+@timed('gravacao.log_alteracoes')
+def append_change_log_entries(entries, path=CHANGE_LOG_FILE):
+    """Acrescenta várias entradas ao log com uma única leitura e gravação do arquivo"""
+    if not entries:
+        return
+    log_data = load_change_log(path)
+    log_data.extend(entries)
+    save_change_log(log_data, path)
@@ -0,0 +1,248 @@
+"""
+Módulo de construção de gráficos
+Monta as figuras Plotly de tendência sem depender da sessão Streamlit,
+para uso no dashboard e na geração de relatórios
+"""
+
+from wegscan.measurements import ALERT_LIMITS
+
+
+def has_chart_data(df_equipment, variable):
+    """Indica se há leituras válidas da variável para montar o gráfico"""
+    return variable in df_equipment.columns and df_equipment[variable].notna().any()
+
+
+def build_trend_chart(df_equipment, equipment, variable, title, limits=ALERT_LIMITS, height=400, trend=None):
+    """Monta o gráfico de linha com tendência (df já filtrado pelo equipamento)
+
+    trend é a média móvel já calculada (derived.trend_line); None calcula aqui.
+    """
+    # Plotly só é importado quando o primeiro gráfico é montado
+    import plotly.graph_objects as go
+
+    # Remover valores NaN
+    df_equipment = df_equipment.dropna(subset=[variable])
+    
+    # Criar figura
+    fig = go.Figure()
+    
+    # Adicionar linha de dados
+    fig.add_trace(go.Scatter(
+        x=df_equipment['DateTime'],
+        y=df_equipment[variable],
+        mode='lines+markers',
+        name=variable,
+        line=dict(color='#1f77b4', width=2),
+        marker=dict(size=6)
+    ))
+    
+    # Adicionar linha de tendência (média móvel)
+    if len(df_equipment) > 1:
+        if trend is None:
+            trend = df_equipment[variable].rolling(window=min(3, len(df_equipment)), center=True).mean()
+        fig.add_trace(go.Scatter(
+            x=df_equipment['DateTime'],
+            y=trend,
+            mode='lines',
+            name='Tendência',
+            line=dict(color='#ff7f0e', width=2, dash='dash')
+        ))
+    
+    # Adicionar limites de alerta
+    if variable in limits:
+        variable_limits = limits[variable]
+        fig.add_hline(y=variable_limits['max'], line_dash="dash", line_color="red", 
+                     annotation_text=f"Limite Máx: {variable_limits['max']}", annotation_position="right")
+        fig.add_hline(y=variable_limits['min'], line_dash="dash", line_color="green",
+                     annotation_text=f"Limite Mín: {variable_limits['min']}", annotation_position="right")
+    
+    # Atualizar layout
+    fig.update_layout(
+        title=f"{title} - {equipment}",
+        xaxis_title="Data/Hora",
+        yaxis_title=variable,
+        hovermode='x unified',
+        height=height,
+        template='plotly_white'
+    )
+    
+    return fig
+
+
+def build_spectrum_chart(freqs, amplitudes, title, unit, bands=None, height=350):
+    """Monta o gráfico de um espectro de amplitude, com as faixas de frequência sombreadas"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=freqs,
+        y=amplitudes,
+        mode='lines',
+        name=title,
+        line=dict(color='#1f77b4', width=1)
+    ))
+
+    # Faixas alternadas ao fundo, para ler a energia por faixa no gráfico
+    top = float(freqs[-1]) if len(freqs) else 0.0
+    for idx, (name, low, high) in enumerate(bands or []):
+        if low >= top:
+            break
+        fig.add_vrect(
+            x0=low, x1=min(high if high is not None else top, top),
+            fillcolor='#ff7f0e' if idx % 2 else '#2ca02c', opacity=0.06, line_width=0,
+            annotation_text=name, annotation_position='top left'
+        )
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="Frequência (Hz)",
+        yaxis_title=f"Amplitude ({unit})",
+        hovermode='x unified',
+        height=height,
+        template='plotly_white'
+    )
+    return fig
+
+
+# Escala de cores da frota: verde até 80% do limite, amarelo até o limite, vermelho acima
+FLEET_COLORSCALE = [
+    [0.0, '#2ca02c'],
+    [0.8 / 1.5, '#ffdd57'],
+    [1.0 / 1.5, '#ff7f0e'],
+    [1.0, '#d62728'],
+]
+
+
+def build_fleet_heatmap(grid, variable=None, height=None):
+    """Mapa de calor equipamento × tempo do valor relativo ao limite máximo
+
+    variable None mostra a pior variável de cada célula. Lacunas ficam em branco.
+    """
+    import numpy as np
+    import plotly.graph_objects as go
+
+    if variable is None:
+        ratio, index = grid.worst()
+        names = np.array(grid.variables + [''], dtype=object)[index]
+        values = np.take_along_axis(grid.values, np.maximum(index, 0)[..., np.newaxis], axis=2)[..., 0]
+        age = grid.age.max(axis=2)
+        title = "Pior variável em relação ao limite"
+    else:
+        j = grid.variables.index(variable)
+        ratio, values, age = grid.ratio[:, :, j], grid.values[:, :, j], grid.age[:, :, j]
+        names = np.full(ratio.shape, variable, dtype=object)
+        title = f"{variable} em relação ao limite"
+
+    fig = go.Figure(go.Heatmap(
+        z=ratio * 100,
+        x=grid.starts,
+        y=grid.equipments,
+        zmin=0,
+        zmax=150,
+        colorscale=FLEET_COLORSCALE,
+        colorbar=dict(title="% do limite"),
+        customdata=np.dstack([names, values, age]),
+        hovertemplate=(
+            "%{y}<br>%{x}<br>%{customdata[0]}: %{customdata[1]:.2f}"
+            "<br>%{z:.0f}% do limite<br>intervalos desde a leitura: %{customdata[2]}<extra></extra>"
+        ),
+        hoverongaps=False,
+        xgap=1,
+        ygap=1
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title="Data/Hora",
+        height=height or max(300, 120 + 22 * len(grid.equipments)),
+        template='plotly_white'
+    )
+    fig.update_yaxes(autorange='reversed')
+    return fig
+
+
+def build_load_chart(analysis, equipment, variable, sigma=3.0, height=650):
+    """Valor, valor normalizado pela carga, correlação móvel com a corrente e desvio do esperado
+
+    analysis é o resultado de load_analysis.analyze_load (já recortado no período).
+    """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    column = analysis[variable]
+    times = analysis.index
+    deviation = column['Desvio (σ)']
+    abnormal = deviation.abs() >= sigma
+
+    fig = make_subplots(
+        rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.06, row_heights=[0.5, 0.25, 0.25],
+        subplot_titles=(variable, "Correlação móvel com a corrente", "Desvio do esperado para a carga (σ)")
+    )
+    fig.add_trace(go.Scatter(
+        x=times, y=column['Valor'], mode='lines+markers', name='Medido',
+        line=dict(color='#1f77b4', width=2), marker=dict(size=5)
+    ), row=1, col=1)
+    fig.add_trace(go.Scatter(
+        x=times, y=column['Normalizado'], mode='lines', name='Normalizado (carga de referência)',
+        line=dict(color='#2ca02c', width=2)
+    ), row=1, col=1)
+    fig.add_trace(go.Scatter(
+        x=times, y=column['Esperado'], mode='lines', name='Esperado para a corrente',
+        line=dict(color='#ff7f0e', width=2, dash='dash')
+    ), row=1, col=1)
+    fig.add_trace(go.Scatter(
+        x=times[abnormal], y=column['Valor'][abnormal], mode='markers', name='Anormal para a carga',
+        marker=dict(color='#d62728', size=10, symbol='x')
+    ), row=1, col=1)
+
+    fig.add_trace(go.Scatter(
+        x=times, y=column['Correlação'], mode='lines', name='Correlação',
+        line=dict(color='#9467bd', width=2), showlegend=False
+    ), row=2, col=1)
+    fig.update_yaxes(range=[-1.05, 1.05], row=2, col=1)
+
+    fig.add_trace(go.Bar(
+        x=times, y=deviation, name='Desvio (σ)', showlegend=False,
+        marker_color=['#d62728' if flag else '#7f7f7f' for flag in abnormal]
+    ), row=3, col=1)
+    for level in (sigma, -sigma):
+        fig.add_hline(y=level, line_dash="dash", line_color="red", row=3, col=1)
+
+    fig.update_layout(
+        title=f"{variable} em relação à carga - {equipment}",
+        hovermode='x unified',
+        height=height,
+        template='plotly_white'
+    )
+    return fig
+
+
+def build_load_scatter(analysis, equipment, variable, height=400):
+    """Dispersão da variável pela corrente, com a cor indicando a data da leitura"""
+    import plotly.graph_objects as go
+
+    column = analysis[variable]
+    current = analysis[('Carga', 'Corrente')]
+    valid = column['Valor'].notna() & current.notna()
+    times = analysis.index[valid]
+
+    fig = go.Figure(go.Scatter(
+        x=current[valid],
+        y=column['Valor'][valid],
+        mode='markers',
+        text=times.strftime('%d/%m/%Y %H:%M'),
+        marker=dict(
+            size=7,
+            color=times.asi8,
+            colorscale='Viridis',
+            showscale=False
+        ),
+        hovertemplate="%{text}<br>Corrente: %{x:.1f} A<br>%{y:.2f}<extra></extra>"
+    ))
+    fig.update_layout(
+        title=f"{variable} × corrente - {equipment} (mais claro: mais recente)",
+        xaxis_title="Corrente Elétrica (A)",
+        yaxis_title=variable,
+        height=height,
+        template='plotly_white'
+    )
+    return fig
@@ -0,0 +1,57 @@
+"""
+Módulo de configuração do núcleo
+Lê as configurações de variáveis de ambiente ou do mesmo arquivo
+.streamlit/secrets.toml usado pelo dashboard, sem depender do Streamlit
+"""
+
+import os
+import tomllib
+
+# Arquivos de dados (relativos ao diretório de trabalho, como no dashboard)
+EXCEL_FILE = 'DADOSWEGSCAN.xlsx'
+CHANGE_LOG_FILE = 'alteracoes_log.json'
+ALERT_LOG_FILE = 'alertas_enviados.json'
+
+# Arquivo de lock que serializa as gravações de todos os processos (dashboard, serviço)
+WRITE_LOCK_FILE = '.wegscan-gravacao.lock'
+
+# Pasta das partições mensais (Parquet) derivadas da planilha
+PARTITIONS_DIR = 'particoes'
+
+# Pasta das formas de onda de vibração (amostras float32 + índice)
+WAVEFORMS_DIR = 'formas_onda'
+
+SECRETS_FILE = os.path.join('.streamlit', 'secrets.toml')
+
+_secrets = None
+
+
+def load_secrets(path=SECRETS_FILE):
+    """Carrega (uma vez) o arquivo de secrets, se existir"""
+    global _secrets
+    if _secrets is None:
+        try:
+            with open(path, 'rb') as f:
+                _secrets = tomllib.load(f)
+        except (OSError, tomllib.TOMLDecodeError):
+            _secrets = {}
+    return _secrets
+
+
+def get_setting(name, default=None):
+    """Retorna a configuração: variável de ambiente, depois secrets.toml, depois o default"""
+    if name in os.environ:
+        return os.environ[name]
+    return load_secrets().get(name, default)
+
+
+def get_email_config(settings=None):
+    """Monta a configuração de e-mail a partir de um mapeamento (secrets) ou das configurações"""
+    get = settings.get if settings is not None else get_setting
+    return {
+        'sender_email': get("EMAIL_SENDER", None),
+        'sender_password': get("EMAIL_PASSWORD", None),
+        'recipient_emails': get("EMAIL_RECIPIENTS", "").split(','),
+        'smtp_server': get("SMTP_SERVER", "smtp.gmail.com"),
+        'smtp_port': int(get("SMTP_PORT", "587"))
+    }
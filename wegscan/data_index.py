@@ -0,0 +1,103 @@
+"""
+Módulo de indexação temporal dos dados
+Mantém as leituras ordenadas por equipamento e DateTime para que os filtros
+da barra lateral sejam resolvidos com busca binária, sem varrer o DataFrame
+"""
+
+from datetime import date, datetime, timedelta
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# Contador de versões único no processo (chave dos caches compartilhados)
+_versions = itertools.count(1)
+
+
+def next_data_version():
+    """Retorna um novo número de versão de dados, único no processo"""
+    return next(_versions)
+
+
+class TimeIndex:
+    """Índice equipamento -> fatia contígua ordenada por DateTime"""
+
+    def __init__(self, df, version=0):
+        frame = df.dropna(subset=['EQUIPAMENTO', 'DateTime'])
+        frame = frame.sort_values(['EQUIPAMENTO', 'DateTime'], kind='stable')
+        self.frame = frame.reset_index(drop=True)
+        self.version = version
+
+        # Posições onde o equipamento muda delimitam as fatias de cada um
+        equipamentos = self.frame['EQUIPAMENTO'].to_numpy()
+        inicios = np.flatnonzero(equipamentos[1:] != equipamentos[:-1]) + 1
+        limites = np.concatenate(([0], inicios, [len(self.frame)]))
+
+        self._times = self.frame['DateTime'].to_numpy()
+        self._slices = {
+            equipamentos[start]: (int(start), int(stop))
+            for start, stop in zip(limites[:-1], limites[1:])
+            if stop > start
+        }
+
+    @property
+    def equipments(self):
+        """Retorna os equipamentos indexados em ordem alfabética"""
+        return sorted(self._slices)
+
+    def time_bounds(self):
+        """Retorna o primeiro e o último DateTime indexados"""
+        if self.frame.empty:
+            return None, None
+        return self._times.min(), self._times.max()
+
+    def _positions(self, equipment, start, end):
+        """Resolve as posições [início, fim) de um equipamento no intervalo"""
+        if equipment not in self._slices:
+            return 0, 0
+
+        lo, hi = self._slices[equipment]
+        times = self._times[lo:hi]
+
+        if start is not None:
+            lo += int(np.searchsorted(times, _to_datetime64(start), side='left'))
+        if end is not None:
+            # Uma data pura inclui o dia inteiro, como no filtro "Até"
+            if isinstance(end, date) and not isinstance(end, datetime):
+                end_limit, side = datetime.combine(end, datetime.min.time()) + timedelta(days=1), 'left'
+            else:
+                end_limit, side = end, 'right'
+            hi = self._slices[equipment][0] + int(
+                np.searchsorted(times, _to_datetime64(end_limit), side=side)
+            )
+
+        return lo, max(lo, hi)
+
+    def slice(self, equipment, start=None, end=None):
+        """Retorna a visão (sem cópia) das leituras de um equipamento no período"""
+        lo, hi = self._positions(equipment, start, end)
+        return self.frame.iloc[lo:hi]
+
+    def count(self, equipments, start=None, end=None):
+        """Conta as leituras dos equipamentos no período sem materializar linhas"""
+        total = 0
+        for equipment in equipments:
+            lo, hi = self._positions(equipment, start, end)
+            total += hi - lo
+        return total
+
+    def query(self, equipments, start=None, end=None):
+        """Retorna as leituras de vários equipamentos no período"""
+        pieces = [self.slice(equipment, start, end) for equipment in equipments]
+        pieces = [piece for piece in pieces if not piece.empty]
+
+        if not pieces:
+            return self.frame.iloc[0:0]
+        if len(pieces) == 1:
+            return pieces[0]
+        return pd.concat(pieces)
+
+
+def _to_datetime64(value):
+    """Converte date/datetime/Timestamp para numpy.datetime64"""
+    return pd.Timestamp(value).to_datetime64()
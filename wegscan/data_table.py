@@ -0,0 +1,100 @@
+"""
+Módulo de paginação da tabela de dados
+Ordena e filtra no servidor sobre as consultas do índice temporal e entrega
+apenas as linhas da página visível para o navegador; compara a página editada
+com a original para obter só as células alteradas
+"""
+
+import numpy as np
+import pandas as pd
+
+from wegscan.result_cache import ResultCache
+
+# Tamanhos de página oferecidos na aba Dados
+PAGE_SIZES = [50, 100, 250, 500]
+
+_positions = ResultCache(maxsize=16)
+
+
+def out_of_limits_mask(df, limits, variables):
+    """Marca as linhas com alguma variável fora dos limites de alerta"""
+    mask = np.zeros(len(df), dtype=bool)
+    for var in variables:
+        if var in df.columns and var in limits:
+            values = df[var].to_numpy(dtype=float, na_value=np.nan)
+            mask |= (values > limits[var]['max']) | (values < limits[var]['min'])
+    return mask
+
+
+def row_positions(df, sort_column, ascending=True, mask=None):
+    """Retorna as posições das linhas (filtradas pela máscara) na ordem pedida"""
+    column = df[sort_column].reset_index(drop=True)
+    if mask is not None:
+        column = column[mask]
+    ordered = column.sort_values(ascending=ascending, kind='stable', na_position='last')
+    return ordered.index.to_numpy()
+
+
+def cached_row_positions(key, df, sort_column, ascending=True, mask_builder=None):
+    """Posições ordenadas em cache por (versão dos dados, filtro, ordenação)"""
+    def compute():
+        mask = mask_builder() if mask_builder is not None else None
+        return row_positions(df, sort_column, ascending, mask)
+    return _positions.get_or_compute(key, compute)
+
+
+def page_count(total_rows, page_size):
+    """Número de páginas (ao menos uma) para o total de linhas"""
+    return max(1, -(-total_rows // page_size))
+
+
+def get_page(df, positions, page, page_size):
+    """Materializa apenas as linhas da página (1-indexada)"""
+    start = (page - 1) * page_size
+    return df.take(positions[start:start + page_size])
+
+
+def column_summary(stats, variables):
+    """Resume cada variável sobre todos os equipamentos a partir das estatísticas agregadas"""
+    rows = []
+    available = stats.columns.get_level_values(0)
+    for var in variables:
+        if var not in available:
+            continue
+        counts = stats[(var, 'Leituras')]
+        total = counts.sum()
+        if total == 0:
+            continue
+        rows.append({
+            'Variável': var,
+            'Leituras': int(total),
+            'Média': (stats[(var, 'Média')] * counts).sum() / total,
+            'Mínimo': stats[(var, 'Mínimo')].min(),
+            'Máximo': stats[(var, 'Máximo')].max(),
+        })
+    return pd.DataFrame(rows)
+
+
+def cell_changes(original, edited, columns):
+    """Células alteradas entre a página original e a editada (mesmas linhas, mesma ordem)
+
+    Retorna uma alteração por célula, no formato de storage.update_cells.
+    """
+    before = original[columns].to_numpy(dtype=float, na_value=np.nan)
+    after = edited[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    changed = ~((before == after) | (np.isnan(before) & np.isnan(after)))
+
+    def python_value(value):
+        return None if np.isnan(value) else float(value)
+
+    rows, cols = np.nonzero(changed)
+    return [
+        {
+            'EQUIPAMENTO': original['EQUIPAMENTO'].iat[row],
+            'DateTime': original['DateTime'].iat[row],
+            'variavel': columns[col],
+            'valor_anterior': python_value(before[row, col]),
+            'novo_valor': python_value(after[row, col]),
+        }
+        for row, col in zip(rows, cols)
+    ]
@@ -0,0 +1,471 @@
+"""
+Módulo do conjunto de dados compartilhado
+Mantém uma única cópia das leituras por processo, com versão crescente e um
+feed de alterações: cada gravação do escritor publica só as linhas novas, e as
+sessões se atualizam aplicando as linhas acrescentadas desde a sua versão.
+
+Só a partição recente (últimos meses) fica sempre em memória; os meses antigos
+são lidos das partições mensais quando o período pedido chega até eles e
+ficam em um cache LRU limitado
+"""
+
+from collections import OrderedDict, deque
+from datetime import datetime
+import logging
+import os
+import threading
+
+import pandas as pd
+
+from wegscan import storage
+from wegscan.config import EXCEL_FILE, PARTITIONS_DIR
+from wegscan.data_index import TimeIndex, next_data_version
+from wegscan.measurements import MEASURED_VARIABLES
+from wegscan.partitions import PartitionStore, month_key, month_start
+from wegscan.profiling import timed
+
+logger = logging.getLogger(__name__)
+
+# Quantidade de lotes mantidos no feed; sessões mais atrasadas recebem a cópia completa
+FEED_SIZE = 256
+
+# Meses mais recentes mantidos sempre em memória (partição quente)
+HOT_MONTHS = 2
+
+# Meses antigos mantidos em memória depois de lidos (LRU)
+COLD_CACHE_SIZE = 12
+
+# Combinações de meses antigos + partição quente mantidas para as sessões
+WINDOW_CACHE_SIZE = 8
+
+
+def file_signature(path=EXCEL_FILE):
+    """Identifica o estado do arquivo em disco (mtime, tamanho), ou None se não existir"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def reading_frame(records):
+    """Converte registros normalizados no formato de DataFrame do dashboard"""
+    df = pd.DataFrame(records, columns=storage.RECORD_COLUMNS)
+    df['DateTime'] = pd.to_datetime([
+        datetime.combine(record['DATA'], record['HORÁRIO']) for record in records
+    ])
+    df['HORÁRIO'] = df['HORÁRIO'].astype(str)
+    # Medições ausentes (None) não podem deixar a coluna com dtype object
+    df[MEASURED_VARIABLES] = df[MEASURED_VARIABLES].astype(float)
+    return df
+
+
+def _empty_frame():
+    """DataFrame vazio com as colunas das leituras"""
+    return pd.DataFrame(columns=storage.RECORD_COLUMNS + ['DateTime'])
+
+
+def _concat_sorted(frames):
+    """Concatena partições mantendo a ordenação por DateTime"""
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return _empty_frame()
+    if len(frames) == 1:
+        return frames[0]
+    combined = pd.concat(frames, ignore_index=True)
+    return combined.sort_values('DateTime', kind='stable').reset_index(drop=True)
+
+
+def apply_delta(df, delta):
+    """Acrescenta as linhas novas mantendo a ordenação por DateTime"""
+    if delta is None or delta.empty:
+        return df
+    return _concat_sorted([df, delta])
+
+
+class Changes:
+    """Alterações do feed desde uma versão: linhas acrescentadas e células alteradas, em ordem
+
+    equipments são os equipamentos cujas leituras mudaram (None: todos, por
+    exemplo quando a partição quente foi deslocada).
+    """
+
+    def __init__(self, rows, updates=(), equipments=None):
+        self.rows = rows
+        self.updates = list(updates)
+        self.equipments = equipments
+
+    @property
+    def empty(self):
+        return self.rows.empty and not self.updates
+
+
+def apply_changes(df, changes):
+    """Aplica as alterações do feed: acrescenta as linhas novas e corrige as células alteradas
+
+    Lança KeyError se uma célula alterada não estiver em df com o valor anterior.
+    """
+    if changes is None or changes.empty:
+        return df
+    df = apply_delta(df, changes.rows)
+    return storage.apply_cell_updates(df, changes.updates) if changes.updates else df
+
+
+def _hot_start(store):
+    """Início da partição quente: os HOT_MONTHS meses de calendário até o último com dados"""
+    if not store.months:
+        return None
+    return month_start(store.months[-1]) - pd.DateOffset(months=HOT_MONTHS - 1)
+
+
+class SharedDataset:
+    """Leituras compartilhadas por todas as sessões do processo"""
+
+    def __init__(self, path=EXCEL_FILE, partitions_dir=PARTITIONS_DIR, feed_size=FEED_SIZE):
+        self.path = path
+        self.partitions_dir = partitions_dir
+        self._lock = threading.Lock()
+        self._store = None
+        self._hot = None
+        # Início da partição quente (None: todo o histórico em memória)
+        self._hot_start = None
+        self._version = 0
+        self._signature = None
+        # Lotes (versão anterior, nova versão, linhas acrescentadas, células alteradas, equipamentos)
+        self._feed = deque(maxlen=feed_size)
+        self._cold = OrderedDict()
+        self._windows = OrderedDict()
+        self._indexes = {}
+        self._listeners = []
+
+    @property
+    def version(self):
+        """Versão atual (0 enquanto não carregado); leitura barata para polling"""
+        return self._version
+
+    @property
+    def loaded(self):
+        return self._hot is not None
+
+    @property
+    def hot_start(self):
+        """Primeiro instante mantido sempre em memória (None: todo o histórico)"""
+        return self._hot_start
+
+    @timed('carga.conjunto')
+    def _load(self):
+        signature = file_signature(self.path)
+        try:
+            store = PartitionStore(self.path, self.partitions_dir)
+        except ImportError as e:
+            logger.warning("%s; carregando o histórico inteiro em memória", e)
+            store = None
+
+        if store is None:
+            self._hot = storage.load_readings(self.path)
+            self._hot_start = None
+        else:
+            store.ensure_current(signature)
+            self._hot_start = _hot_start(store)
+            self._hot = _concat_sorted([
+                store.read(key) for key in store.months
+                if month_start(key) >= self._hot_start
+            ]) if self._hot_start is not None else _empty_frame()
+
+        self._store = store
+        self._signature = signature
+        self._version = next_data_version()
+        self._feed.clear()
+        self._cold.clear()
+        self._invalidate_windows()
+        self._notify()
+
+    def subscribe(self, listener):
+        """Registra listener(versão, partição quente, equipamentos alterados ou None)
+
+        Chamado a cada carga e a cada lote publicado, com o lock do conjunto: o
+        listener deve só enfileirar o trabalho. Se já carregado, é chamado na hora.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+            if self._hot is not None:
+                listener(self._version, self._hot, None)
+
+    def _notify(self, equipments=None):
+        for listener in self._listeners:
+            try:
+                listener(self._version, self._hot, equipments)
+            except Exception as e:
+                logger.error("Erro ao notificar nova versão do conjunto: %s", e)
+
+    def _ensure_loaded(self):
+        if self._hot is None:
+            self._load()
+
+    def _invalidate_windows(self):
+        self._windows.clear()
+        self._indexes.clear()
+
+    def _cold_partition(self, key):
+        """Lê (ou obtém do cache LRU) um mês antigo"""
+        if key in self._cold:
+            self._cold.move_to_end(key)
+            return self._cold[key]
+        frame = self._store.read(key)
+        self._cold[key] = frame
+        while len(self._cold) > COLD_CACHE_SIZE:
+            self._cold.popitem(last=False)
+        return frame
+
+    def catalog(self):
+        """Retorna (primeiro DateTime, último DateTime, equipamentos) de todo o histórico"""
+        with self._lock:
+            self._ensure_loaded()
+            if self._store is not None:
+                first, last = self._store.bounds()
+                return first, last, self._store.equipments()
+            if self._hot.empty:
+                return None, None, []
+            return (
+                self._hot['DateTime'].min(), self._hot['DateTime'].max(),
+                sorted(self._hot['EQUIPAMENTO'].dropna().unique().tolist())
+            )
+
+    def total_rows(self):
+        """Quantidade de leituras de todo o histórico, incluindo os meses fora da memória"""
+        with self._lock:
+            self._ensure_loaded()
+            if self._store is not None:
+                return self._store.rows()
+            return len(self._hot)
+
+    def cold_months(self, start, end):
+        """Meses antigos (fora da partição quente) necessários para o período"""
+        with self._lock:
+            self._ensure_loaded()
+            if self._store is None or self._hot_start is None or start is None:
+                return ()
+            hot_key = month_key(self._hot_start)
+            first = month_key(start)
+            last = month_key(end) if end is not None else hot_key
+            return tuple(
+                key for key in self._store.months
+                if first <= key <= last and key < hot_key
+            )
+
+    def latest_cold_reading(self, equipment):
+        """Última leitura do equipamento nos meses antigos (linha de DataFrame), ou None
+
+        Para equipamentos sem leituras na partição quente: o manifesto indica o
+        mês antigo mais recente com o equipamento, e só esse mês é lido.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if self._store is None or self._hot_start is None:
+                return None
+            hot_key = month_key(self._hot_start)
+            months = [key for key in self._store.months_with(equipment) if key < hot_key]
+            if not months:
+                return None
+            frame = self._cold_partition(months[-1])
+            rows = frame[frame['EQUIPAMENTO'] == equipment]
+            return rows.iloc[-1:] if not rows.empty else None
+
+    def window(self, months=()):
+        """Retorna (versão do conjunto, versão da janela, DataFrame) com a partição
+        quente e os meses antigos pedidos
+
+        O DataFrame é compartilhado entre as sessões e não deve ser alterado.
+        """
+        months = tuple(months)
+        with self._lock:
+            self._ensure_loaded()
+            if not months:
+                return self._version, self._version, self._hot
+            if months in self._windows:
+                self._windows.move_to_end(months)
+                version, frame = self._windows[months]
+                return self._version, version, frame
+
+            frame = _concat_sorted([self._cold_partition(key) for key in months] + [self._hot])
+            version = next_data_version()
+            self._windows[months] = (version, frame)
+            while len(self._windows) > WINDOW_CACHE_SIZE:
+                evicted, _ = self._windows.popitem(last=False)[1]
+                self._indexes.pop(evicted, None)
+            return self._version, version, frame
+
+    def reload(self):
+        """Recarrega a planilha; as sessões recebem a cópia completa"""
+        with self._lock:
+            self._load()
+            return self._version
+
+    def refresh_if_changed(self):
+        """Recarrega se a planilha foi alterada fora deste processo; retorna a versão"""
+        with self._lock:
+            if self._hot is not None and file_signature(self.path) != self._signature:
+                logger.info("%s alterado externamente; recarregando", self.path)
+                self._load()
+            return self._version
+
+    def publish(self, records, signature_before):
+        """Publica registros gravados pelo escritor como um novo lote do feed
+
+        signature_before é o estado do arquivo antes da gravação: se o conjunto foi
+        carregado depois dela, as linhas já estão presentes e nada é acrescentado.
+        """
+        with self._lock:
+            if self._hot is None:
+                return self._version
+            signature_after = file_signature(self.path)
+            if self._signature == signature_after:
+                return self._version
+            delta = reading_frame(records)
+            if self._signature != signature_before or (
+                self._store is not None and not self._store.append(delta, signature_before, signature_after)
+            ):
+                # Carregado de um estado desconhecido: recarregar é o único caminho seguro
+                self._load()
+                return self._version
+
+            if self._hot_start is None:
+                hot_rows = delta
+            else:
+                is_hot = delta['DateTime'] >= self._hot_start
+                hot_rows = delta[is_hot]
+                # Meses antigos alterados são relidos da partição na próxima consulta
+                for key in delta.loc[~is_hot, 'DateTime'].dt.strftime('%Y-%m').unique():
+                    self._cold.pop(key, None)
+            self._hot = apply_delta(self._hot, hot_rows)
+            advanced = self._advance_hot_start()
+
+            previous = self._version
+            self._signature = signature_after
+            self._version = next_data_version()
+            # Com a partição quente deslocada, todos os equipamentos perderam leituras
+            equipments = None if advanced else set(hot_rows['EQUIPAMENTO'])
+            self._feed.append((previous, self._version, delta, [], equipments))
+            self._invalidate_windows()
+            self._notify(equipments)
+            return self._version
+
+    def publish_updates(self, updates, signature_before):
+        """Publica alterações de células gravadas pelo escritor (storage.update_cells)
+
+        As alterações entram no feed com as chaves das leituras e os novos valores.
+        A partição quente e as janelas em memória são corrigidas só nas linhas
+        alteradas (as janelas sem leituras alteradas mantêm versão e índice), e só
+        os equipamentos alterados são recalculados pelos listeners.
+        """
+        with self._lock:
+            if self._hot is None:
+                return self._version
+            signature_after = file_signature(self.path)
+            if self._signature == signature_after:
+                return self._version
+            if self._signature != signature_before or (
+                self._store is not None and not self._store.update(updates, signature_before, signature_after)
+            ):
+                self._load()
+                return self._version
+
+            hot = [u for u in updates if self._hot_start is None or pd.Timestamp(u['DateTime']) >= self._hot_start]
+            try:
+                self._hot = storage.apply_cell_updates(self._hot, hot) if hot else self._hot
+                windows = self._patched_windows(updates, hot)
+            except KeyError:
+                self._load()
+                return self._version
+            for update in updates:
+                self._cold.pop(month_key(update['DateTime']), None)
+
+            previous = self._version
+            self._signature = signature_after
+            self._version = next_data_version()
+            self._windows = windows
+            for version in list(self._indexes):
+                if version == previous or not any(v == version for v, _ in windows.values()):
+                    del self._indexes[version]
+            equipments = {str(u['EQUIPAMENTO']).strip() for u in updates}
+            self._feed.append((previous, self._version, _empty_frame(), list(updates), equipments))
+            self._notify({str(u['EQUIPAMENTO']).strip() for u in hot})
+            return self._version
+
+    def _patched_windows(self, updates, hot):
+        """Janelas em cache com as células alteradas; as que não têm leituras alteradas ficam como estão"""
+        windows = OrderedDict()
+        for months, (version, frame) in self._windows.items():
+            touched = hot + [u for u in updates if u not in hot and month_key(u['DateTime']) in months]
+            if touched:
+                version, frame = next_data_version(), storage.apply_cell_updates(frame, touched)
+            windows[months] = (version, frame)
+        return windows
+
+    def _advance_hot_start(self):
+        """Quando começa um mês novo, o mais antigo da partição quente passa a ser frio
+
+        Retorna True se a partição quente foi deslocada.
+        """
+        if self._store is None:
+            return False
+        start = _hot_start(self._store)
+        if start is not None and (self._hot_start is None or start > self._hot_start):
+            self._hot = self._hot[self._hot['DateTime'] >= start].reset_index(drop=True)
+            self._hot_start = start
+            return True
+        return False
+
+    def changes_since(self, version):
+        """Retorna (versão atual, Changes desde version)
+
+        As alterações são None quando o feed não cobre version (recarga ou sessão
+        muito atrasada); nesse caso a sessão deve usar window().
+        """
+        with self._lock:
+            current = self._version
+            if version == current:
+                return current, Changes(_empty_frame(), equipments=set())
+            entries = []
+            for entry in self._feed:
+                if entries or entry[0] == version:
+                    entries.append(entry)
+            if not entries:
+                return current, None
+
+            rows = [delta for _, _, delta, _, _ in entries if not delta.empty]
+            updates = [update for _, _, _, batch, _ in entries for update in batch]
+            equipments = set()
+            for _, _, _, _, changed in entries:
+                equipments = None if equipments is None or changed is None else equipments | changed
+            rows = pd.concat(rows, ignore_index=True) if len(rows) > 1 else (rows[0] if rows else _empty_frame())
+            return current, Changes(rows, updates, equipments)
+
+    def time_index(self, version):
+        """Índice temporal de uma versão compartilhada, construído uma vez para todas as
+        sessões; None se a versão não está mais em memória"""
+        with self._lock:
+            if version in self._indexes:
+                return self._indexes[version]
+            if version == self._version and self._hot is not None:
+                frame = self._hot
+            else:
+                frame = next((frame for v, frame in self._windows.values() if v == version), None)
+            if frame is None:
+                return None
+            index = TimeIndex(frame, version=version)
+            self._indexes[version] = index
+            return index
+
+
+_dataset = None
+_dataset_lock = threading.Lock()
+
+
+def get_dataset():
+    """Retorna o conjunto de dados compartilhado do processo"""
+    global _dataset
+    with _dataset_lock:
+        if _dataset is None:
+            _dataset = SharedDataset()
+        return _dataset
@@ -0,0 +1,249 @@
+"""
+Módulo de artefatos derivados em segundo plano
+A cada carga ou lote publicado no conjunto compartilhado, recalcula por
+equipamento (em um pool de processos, usando os núcleos da máquina) os
+artefatos que as abas mostram para a partição quente inteira: estatísticas,
+varredura de alertas e linhas de tendência. O resultado de uma versão é
+publicado de uma vez, como um instantâneo imutável; a interface usa o
+instantâneo quando ele é da versão que está exibindo e cobre o filtro, e
+calcula na hora (como antes) nos demais casos
+
+DERIVED_WORKERS nos secrets ou no ambiente define a quantidade de processos
+(0 desliga o cálculo em segundo plano)
+"""
+
+import logging
+import os
+import queue
+import threading
+
+import pandas as pd
+
+from wegscan.alerts import limit_violations
+from wegscan.config import get_setting
+from wegscan.measurements import ALERT_LIMITS, MEASURED_VARIABLES
+from wegscan.profiling import span
+from wegscan.stats_engine import RECORDS_COLUMN, compute_statistics
+
+logger = logging.getLogger(__name__)
+
+# Janela da média móvel da linha de tendência (a mesma do gráfico)
+TREND_WINDOW = 3
+
+# Tarefas por processo em cada recálculo (equipamentos são agrupados em lotes)
+TASKS_PER_WORKER = 2
+
+# Colunas enviadas aos processos
+FRAME_COLUMNS = ['DateTime', 'EQUIPAMENTO'] + MEASURED_VARIABLES
+
+
+def trend_line(series):
+    """Média móvel centrada das leituras válidas (a linha 'Tendência' do gráfico)"""
+    series = series.dropna()
+    if len(series) < 2:
+        return None
+    return series.rolling(window=min(TREND_WINDOW, len(series)), center=True).mean().to_numpy()
+
+
+def equipment_artifacts(df_equipment, variables=MEASURED_VARIABLES, limits=ALERT_LIMITS):
+    """Artefatos de um equipamento (df com todas as leituras dele, ordenado por DateTime)"""
+    return {
+        'registros': len(df_equipment),
+        'estatisticas': compute_statistics(df_equipment, variables),
+        'tendencias': {var: trend_line(df_equipment[var]) for var in variables},
+        'alertas': {var: limit_violations(df_equipment, var, limits) for var in variables},
+    }
+
+
+def compute_artifacts(frames, variables=MEASURED_VARIABLES, limits=ALERT_LIMITS):
+    """Artefatos de um lote de equipamentos: equipamento -> artefatos (executado nos processos)"""
+    return {
+        equipment: equipment_artifacts(frame, variables, limits)
+        for equipment, frame in frames.items()
+    }
+
+
+class DerivedSnapshot:
+    """Artefatos de todos os equipamentos de uma versão do conjunto (não é alterado depois de publicado)"""
+
+    def __init__(self, version, artifacts):
+        self.version = version
+        self.artifacts = artifacts
+
+    def covering(self, equipments, rows):
+        """Artefatos dos equipamentos se as rows linhas do filtro são todas as leituras deles, senão None
+
+        Os filtros são subconjuntos da mesma versão: a mesma quantidade de linhas
+        significa as mesmas linhas. Equipamentos ausentes não têm leituras.
+        """
+        found = [self.artifacts[eq] for eq in equipments if eq in self.artifacts]
+        if sum(artifacts['registros'] for artifacts in found) != rows:
+            return None
+        return found
+
+    def statistics(self, equipments, rows, variables):
+        """Tabela de estatísticas (como stats_engine.compute_statistics) ou None se não cobre o filtro"""
+        found = self.covering(equipments, rows)
+        if not found:
+            return None
+        stats = pd.concat([artifacts['estatisticas'] for artifacts in found]).sort_index()
+        keep = stats.columns.get_level_values(0).isin(list(variables) + [RECORDS_COLUMN[0]])
+        return stats.loc[:, keep]
+
+    def equipment(self, equipment, rows):
+        """Artefatos de um equipamento ou None se o filtro não tem todas as leituras dele"""
+        found = self.covering([equipment], rows)
+        return found[0] if found else None
+
+
+def _chunks(items, count):
+    """Divide a lista em até count partes de tamanho parecido"""
+    count = max(1, min(count, len(items)))
+    return [items[i::count] for i in range(count)]
+
+
+class DerivedCompute:
+    """Recálculo em segundo plano dos artefatos derivados, compartilhado pelas sessões do processo"""
+
+    def __init__(self, workers=None):
+        self.workers = workers if workers is not None else max(1, (os.cpu_count() or 2) - 1)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._executor = None
+        self._snapshot = None
+        self._attached = set()
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def snapshot(self, version):
+        """Instantâneo publicado para a versão, ou None (ainda calculando ou versão antiga)"""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        return None
+
+    def attach(self, dataset):
+        """Passa a recalcular a cada carga ou lote publicado no conjunto (uma vez por conjunto)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if id(dataset) in self._attached:
+                return
+            self._attached.add(id(dataset))
+        dataset.subscribe(self.schedule)
+
+    def schedule(self, version, frame, equipments=None):
+        """Enfileira o recálculo de uma versão; equipments são os alterados (None: todos)
+
+        Chamado com o lock do conjunto: só enfileira, o cálculo é feito na thread própria.
+        """
+        self._ensure_started()
+        self._queue.put((version, frame, None if equipments is None else set(equipments)))
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='wegscan-derivados', daemon=True)
+                self._thread.start()
+
+    def _next_job(self):
+        """Aguarda uma versão e junta as que chegaram depois: só a mais nova é calculada"""
+        version, frame, equipments = self._queue.get()
+        while True:
+            try:
+                version, frame, changed = self._queue.get_nowait()
+            except queue.Empty:
+                return version, frame, equipments
+            equipments = None if equipments is None or changed is None else equipments | changed
+
+    def _run(self):
+        while True:
+            version, frame, equipments = self._next_job()
+            try:
+                with span('derivados.lote'):
+                    self._recompute(version, frame, equipments)
+            except Exception:
+                logger.exception("Erro ao recalcular os artefatos derivados da versão %s", version)
+
+    def _recompute(self, version, frame, equipments):
+        previous = self._snapshot
+        frames = {
+            equipment: group.reset_index(drop=True)
+            for equipment, group in frame[FRAME_COLUMNS].groupby('EQUIPAMENTO', sort=True)
+        }
+
+        # Equipamentos sem leituras novas mantêm os artefatos do instantâneo anterior
+        artifacts = {}
+        if previous is not None and equipments is not None:
+            for equipment, group in frames.items():
+                kept = previous.artifacts.get(equipment)
+                if equipment not in equipments and kept is not None and kept['registros'] == len(group):
+                    artifacts[equipment] = kept
+        pending = {eq: group for eq, group in frames.items() if eq not in artifacts}
+
+        if pending:
+            artifacts.update(self._compute(pending))
+        # Publicação atômica: as sessões veem o instantâneo anterior inteiro ou o novo inteiro
+        self._snapshot = DerivedSnapshot(version, artifacts)
+        logger.info("Artefatos derivados da versão %s: %d recalculado(s), %d mantido(s)",
+                    version, len(pending), len(artifacts) - len(pending))
+
+    def _compute(self, frames):
+        """Calcula os lotes de equipamentos no pool de processos (na própria thread se o pool falhar)"""
+        executor = self._get_executor()
+        if executor is None:
+            return compute_artifacts(frames)
+        names = sorted(frames, key=lambda eq: -len(frames[eq]))
+        chunks = _chunks(names, self.workers * TASKS_PER_WORKER)
+        try:
+            futures = [executor.submit(compute_artifacts, {eq: frames[eq] for eq in chunk}) for chunk in chunks]
+            results = {}
+            for future in futures:
+                results.update(future.result())
+            return results
+        except Exception as e:
+            logger.warning("Pool de processos indisponível (%s); calculando na thread de segundo plano", e)
+            self._shutdown_executor()
+            return compute_artifacts(frames)
+
+    def _get_executor(self):
+        if self._executor is None:
+            # Importado só quando o primeiro recálculo acontece
+            from concurrent.futures import ProcessPoolExecutor
+            import multiprocessing
+
+            try:
+                # spawn: o processo do Streamlit tem várias threads, fork não é seguro
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            except (OSError, ValueError) as e:
+                logger.warning("Não foi possível criar o pool de processos: %s", e)
+                return None
+        return self._executor
+
+    def _shutdown_executor(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _workers_setting():
+    value = get_setting('DERIVED_WORKERS', None)
+    return int(value) if value not in (None, '') else None
+
+
+_derived = None
+_derived_lock = threading.Lock()
+
+
+def get_derived():
+    """Retorna o recálculo em segundo plano compartilhado do processo"""
+    global _derived
+    with _derived_lock:
+        if _derived is None:
+            _derived = DerivedCompute(workers=_workers_setting())
+        return _derived
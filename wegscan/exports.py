@@ -0,0 +1,192 @@
+"""
+Módulo de exportação de dados
+Gera os arquivos de download em memória, em blocos de linhas, com cache
+por (versão dos dados, filtro) para que downloads repetidos não regerem o arquivo
+"""
+
+import gzip
+from io import BytesIO, TextIOWrapper
+
+import numpy as np
+
+from wegscan.result_cache import ResultCache
+from wegscan.stats_engine import summary_table
+
+# Rótulos das colunas nos arquivos exportados
+EXPORT_LABELS = {
+    'DateTime': 'Data/Hora',
+    'EQUIPAMENTO': 'Equipamento',
+    'VIBRAÇÃO AXIAL(mm/s)': 'Vibração Axial (mm/s)',
+    'VIBRAÇÃO RADIAL-Y (mm/s)': 'Vibração Radial-Y (mm/s)',
+    'VIBRAÇÃO RADIAL-X (mm/s)': 'Vibração Radial-X (mm/s)',
+    'TEMPERATURA(°C)': 'Temperatura (°C)',
+    'CORRENTE ELÉTRICA (A)': 'Corrente Elétrica (A)',
+}
+
+# Linhas convertidas por bloco durante a escrita
+CHUNK_ROWS = 10_000
+
+# Linhas por row group/record batch nos formatos colunares
+ARROW_CHUNK_ROWS = 100_000
+
+# Formatos de exportação analítica (nomes e tipos nativos das colunas)
+ANALYTICS_FORMATS = {
+    'parquet': {
+        'label': 'Parquet (zstd)',
+        'extension': 'parquet',
+        'mime': 'application/vnd.apache.parquet',
+    },
+    'arrow': {
+        'label': 'Arrow IPC',
+        'extension': 'arrow',
+        'mime': 'application/vnd.apache.arrow.file',
+    },
+    'csv.gz': {
+        'label': 'CSV (gzip)',
+        'extension': 'csv.gz',
+        'mime': 'application/gzip',
+    },
+}
+
+_exports = ResultCache(maxsize=4)
+
+
+def export_columns(df, variables):
+    """Retorna as colunas exportadas: Data/Hora, Equipamento e variáveis presentes"""
+    return ['DateTime', 'EQUIPAMENTO'] + [var for var in variables if var in df.columns]
+
+
+def iter_chunks(df, columns, chunk_size=CHUNK_ROWS):
+    """Percorre o DataFrame em blocos de linhas com as colunas selecionadas"""
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size][columns]
+
+
+def _python_rows(frame):
+    """Converte um bloco em listas de valores Python, com None no lugar de NaN"""
+    values = frame.astype(object)
+    return values.where(frame.notna(), None).to_numpy().tolist()
+
+
+def export_to_excel(df, stats, variables, chunk_size=CHUNK_ROWS):
+    """Gera o Excel (planilhas Dados e Resumo) em memória com escrita em memória constante"""
+    import xlsxwriter
+
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    date_format = workbook.add_format({'num_format': 'dd/mm/yyyy hh:mm:ss'})
+
+    # Planilha principal, escrita linha a linha em ordem (exigência do constant_memory)
+    columns = export_columns(df, variables)
+    sheet = workbook.add_worksheet('Dados')
+    sheet.write_row(0, 0, [EXPORT_LABELS.get(col, col) for col in columns])
+
+    row = 1
+    for chunk in iter_chunks(df, columns, chunk_size):
+        times = chunk['DateTime'].dt.to_pydatetime()
+        for timestamp, values in zip(times, _python_rows(chunk[columns[1:]])):
+            sheet.write_datetime(row, 0, timestamp, date_format)
+            sheet.write_row(row, 1, values)
+            row += 1
+
+    # Planilha de resumo por equipamento (mesmo motor de estatísticas da interface)
+    df_summary = summary_table(stats, variables)
+    summary_sheet = workbook.add_worksheet('Resumo')
+    summary_sheet.write_row(0, 0, list(df_summary.columns))
+    for row, values in enumerate(_python_rows(df_summary), start=1):
+        summary_sheet.write_row(row, 0, values)
+
+    workbook.close()
+    return output.getvalue()
+
+
+def export_to_csv(df, variables, compress=False, chunk_size=CHUNK_ROWS):
+    """Gera o CSV em memória bloco a bloco, opcionalmente comprimido com gzip"""
+    output = BytesIO()
+    columns = export_columns(df, variables)
+    binary = gzip.GzipFile(fileobj=output, mode='wb', compresslevel=6) if compress else output
+
+    text = TextIOWrapper(binary, encoding='utf-8', newline='')
+    df.iloc[0:0][columns].to_csv(text, index=False)
+    for chunk in iter_chunks(df, columns, chunk_size):
+        chunk.to_csv(text, index=False, header=False)
+    text.flush()
+    text.detach()
+
+    if compress:
+        binary.close()
+    return output.getvalue()
+
+
+def _require_pyarrow():
+    """Importa o pyarrow, necessário apenas para os formatos colunares"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Instale pyarrow para exportar em Parquet/Arrow.") from e
+    return pyarrow
+
+
+def _arrow_schema(pa, df, columns):
+    """Esquema Arrow explícito: timestamp nativo, equipamento texto e variáveis float64"""
+    fields = []
+    for col in columns:
+        if col == 'DateTime':
+            unit = np.datetime_data(df['DateTime'].dtype)[0]
+            fields.append(pa.field(col, pa.timestamp(unit)))
+        elif col == 'EQUIPAMENTO':
+            fields.append(pa.field(col, pa.string()))
+        else:
+            fields.append(pa.field(col, pa.float64()))
+    return pa.schema(fields)
+
+
+def _iter_record_batches(pa, df, columns, schema, chunk_size):
+    """Converte o DataFrame em record batches, um bloco de linhas por vez"""
+    for chunk in iter_chunks(df, columns, chunk_size):
+        yield pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False)
+
+
+def export_to_parquet(df, variables, chunk_size=ARROW_CHUNK_ROWS):
+    """Gera o Parquet (zstd) em memória, um row group por bloco de linhas"""
+    pa = _require_pyarrow()
+    columns = export_columns(df, variables)
+    schema = _arrow_schema(pa, df, columns)
+
+    output = BytesIO()
+    with pa.parquet.ParquetWriter(output, schema, compression='zstd') as writer:
+        for batch in _iter_record_batches(pa, df, columns, schema, chunk_size):
+            writer.write_batch(batch)
+    return output.getvalue()
+
+
+def export_to_arrow(df, variables, chunk_size=ARROW_CHUNK_ROWS):
+    """Gera o arquivo Arrow IPC (zstd) em memória, um record batch por bloco de linhas"""
+    pa = _require_pyarrow()
+    columns = export_columns(df, variables)
+    schema = _arrow_schema(pa, df, columns)
+
+    output = BytesIO()
+    options = pa.ipc.IpcWriteOptions(compression='zstd')
+    with pa.ipc.new_file(output, schema, options=options) as writer:
+        for batch in _iter_record_batches(pa, df, columns, schema, chunk_size):
+            writer.write_batch(batch)
+    return output.getvalue()
+
+
+def export_analytics(export_format, df, variables):
+    """Gera a exportação analítica no formato pedido ('parquet', 'arrow' ou 'csv.gz')"""
+    if export_format == 'parquet':
+        return export_to_parquet(df, variables)
+    if export_format == 'arrow':
+        return export_to_arrow(df, variables)
+    if export_format == 'csv.gz':
+        return export_to_csv(df, variables, compress=True)
+    raise ValueError(f"Formato de exportação desconhecido: {export_format}")
+
+
+def cached_export(export_format, key, build):
+    """Retorna o arquivo exportado em cache para (formato, versão dos dados, filtro)"""
+    return _exports.get_or_compute((export_format, key), build)
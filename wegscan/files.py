@@ -0,0 +1,71 @@
+"""
+Módulo de utilidades de arquivos
+Leitura e escrita atômica dos arquivos JSON de log compartilhados e lock
+exclusivo entre processos para as gravações
+"""
+
+from contextlib import contextmanager
+import json
+import os
+import tempfile
+
+
+def replace_atomically(path, write):
+    """Escreve em um arquivo temporário no mesmo diretório e substitui o destino de uma vez"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.splitext(path)[1])
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_json(path, default):
+    """Lê um arquivo JSON, retornando o default se ele não existir"""
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    """Grava um arquivo JSON de forma atômica"""
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    replace_atomically(path, write)
+
+
+@contextmanager
+def exclusive_lock(path):
+    """Lock exclusivo entre processos sobre o arquivo path (criado se não existir)
+
+    Bloqueia até o lock ser obtido; é liberado ao sair do bloco ou se o processo terminar.
+    """
+    with open(path, 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK tenta por cerca de 10s antes de lançar OSError
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,110 @@
+"""
+Módulo de visão geral da frota
+Reamostra as leituras manuais (irregulares) de todos os equipamentos em uma
+grade de tempo comum, com detecção de lacunas, e monta em uma única passagem
+vetorizada a matriz densa equipamento × tempo × variável com cada valor
+relativo aos limites de alerta (0 = limite mínimo, 1 = limite máximo)
+"""
+
+import numpy as np
+import pandas as pd
+
+from wegscan.measurements import ALERT_LIMITS
+from wegscan.profiling import timed
+from wegscan.result_cache import ResultCache
+
+# Quantidade máxima de colunas (intervalos de tempo) da grade
+MAX_COLUMNS = 120
+
+# Passos possíveis da grade, do menor para o maior
+GRID_STEPS = ['1h', '3h', '6h', '12h', '1D', '2D', '7D', '14D', '30D']
+
+# Sem leitura há mais que isso, a célula é lacuna (não repete a última leitura)
+MAX_GAP = pd.Timedelta(days=14)
+
+_grids = ResultCache(maxsize=8)
+
+
+class FleetGrid:
+    """Grade da frota: matrizes (equipamentos × intervalos × variáveis)"""
+
+    def __init__(self, equipments, starts, variables, step, values, ratio, age):
+        self.equipments = equipments
+        # Início de cada intervalo (datetime64)
+        self.starts = starts
+        self.variables = variables
+        self.step = step
+        # Maior leitura do intervalo, ou a última leitura até MAX_GAP
+        self.values = values
+        # Valor relativo aos limites (NaN nas lacunas)
+        self.ratio = ratio
+        # Intervalos desde a última leitura (0: lido no intervalo, -1: lacuna)
+        self.age = age
+
+    def worst(self):
+        """Pior variável de cada célula: (razão, índice da variável), NaN/-1 nas lacunas"""
+        ratio = np.where(np.isnan(self.ratio), -np.inf, self.ratio)
+        index = ratio.argmax(axis=2)
+        worst = np.take_along_axis(ratio, index[..., np.newaxis], axis=2)[..., 0]
+        gap = np.isneginf(worst)
+        return np.where(gap, np.nan, worst), np.where(gap, -1, index)
+
+
+def grid_step(start, end, max_columns=MAX_COLUMNS):
+    """Menor passo de GRID_STEPS que cobre o período com até max_columns intervalos"""
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for step in GRID_STEPS:
+        if span / pd.Timedelta(step) < max_columns:
+            return pd.Timedelta(step)
+    return pd.Timedelta(GRID_STEPS[-1])
+
+
+def _limit_arrays(variables, limits):
+    low = np.array([limits.get(var, {}).get('min', np.nan) for var in variables], dtype=np.float64)
+    high = np.array([limits.get(var, {}).get('max', np.nan) for var in variables], dtype=np.float64)
+    return low, high
+
+
+@timed('frota.grade')
+def build_fleet_grid(df, variables, limits=ALERT_LIMITS, max_columns=MAX_COLUMNS, max_gap=MAX_GAP):
+    """Monta a grade da frota em uma passagem (None se não há leituras)"""
+    times = df['DateTime'].to_numpy('datetime64[ns]')
+    keep = ~np.isnat(times)
+    if not keep.any():
+        return None
+    times = times[keep]
+    codes, equipments = pd.factorize(df['EQUIPAMENTO'].to_numpy()[keep], sort=True)
+    values = df[variables].to_numpy(np.float64)[keep]
+
+    start = pd.Timestamp(times.min()).floor('h')
+    step = grid_step(start, times.max(), max_columns)
+    step_ns = np.timedelta64(step.value, 'ns')
+    bins = ((times - start.to_datetime64()) // step_ns).astype(np.int64)
+    n_equipments, n_bins, n_variables = len(equipments), int(bins.max()) + 1, len(variables)
+
+    # Maior leitura de cada (equipamento, intervalo, variável); fmax ignora NaN
+    grid = np.full((n_equipments * n_bins, n_variables), np.nan)
+    np.fmax.at(grid, codes * n_bins + bins, values)
+    grid = grid.reshape(n_equipments, n_bins, n_variables)
+
+    # Repetir a última leitura nos intervalos sem leitura, até max_gap
+    observed = ~np.isnan(grid)
+    positions = np.arange(n_bins)[np.newaxis, :, np.newaxis]
+    last_seen = np.maximum.accumulate(np.where(observed, positions, -1), axis=1)
+    age = np.where(last_seen >= 0, positions - last_seen, -1)
+    limit = max(int(max_gap // step), 0)
+    filled = (age >= 0) & (age <= limit)
+    source = np.take_along_axis(grid, np.maximum(last_seen, 0), axis=1)
+    grid = np.where(filled, source, np.nan)
+    age = np.where(filled, age, -1)
+
+    low, high = _limit_arrays(variables, limits)
+    ratio = (grid - low) / (high - low)
+
+    starts = start.to_datetime64() + np.arange(n_bins) * step_ns
+    return FleetGrid(list(equipments), starts, list(variables), step, grid, ratio, age)
+
+
+def cached_fleet_grid(key, df, variables, limits=ALERT_LIMITS):
+    """Grade da frota em cache para (versão dos dados, filtro)"""
+    return _grids.get_or_compute((key, tuple(variables)), lambda: build_fleet_grid(df, variables, limits))
@@ -0,0 +1,201 @@
+"""
+Módulo de sincronização com o GitHub Gist
+Mantém as leituras em um Gist como um CSV base seguido de partes
+(dados_dashboard.parte-0001.csv, ...) só com as linhas novas. As consultas são
+condicionais (ETag / If-None-Match), arquivos truncados pela API são lidos
+em streaming pelo raw_url e todas as chamadas usam uma sessão HTTP com pool
+de conexões e timeout
+
+O endereço da API é configurável (GIST_API_URL) para testes com um servidor local
+"""
+
+from io import StringIO
+import re
+import threading
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from wegscan.measurements import MEASURED_VARIABLES
+
+DEFAULT_API_URL = 'https://api.github.com'
+
+# Arquivo base no Gist; as partes acrescentadas seguem o mesmo nome
+DATA_FILE = 'dados_dashboard.csv'
+
+# Timeout (conexão, leitura) em segundos de cada chamada
+DEFAULT_TIMEOUT = (5, 30)
+
+# Conexões mantidas abertas por host
+POOL_SIZE = 4
+
+# Quantidade de partes a partir da qual o próximo envio regrava o arquivo base
+MAX_CHUNKS = 50
+
+
+def _chunk_name(filename, number):
+    """Nome da parte de número `number` do arquivo"""
+    stem = filename[:-len('.csv')] if filename.endswith('.csv') else filename
+    return f"{stem}.parte-{number:04d}.csv"
+
+
+def _chunk_number(filename, name):
+    """Número da parte (0 para o arquivo base, None se não for arquivo de dados)"""
+    if name == filename:
+        return 0
+    stem = filename[:-len('.csv')] if filename.endswith('.csv') else filename
+    match = re.fullmatch(re.escape(stem) + r'\.parte-(\d+)\.csv', name)
+    return int(match.group(1)) if match else None
+
+
+def _row_hashes(frame):
+    """Hash de cada linha do CSV (colunas como texto)"""
+    return pd.util.hash_pandas_object(frame, index=False)
+
+
+def _read_csv(source):
+    """Lê um CSV mantendo os valores como texto (mesma forma para local e remoto)"""
+    return pd.read_csv(source, dtype=str, keep_default_na=False)
+
+
+def typed_frame(frame):
+    """Converte o CSV lido do Gist para os tipos usados pelo dashboard"""
+    df = frame.replace('', None)
+    for col in MEASURED_VARIABLES:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    if 'DATA' in df.columns:
+        df['DATA'] = pd.to_datetime(df['DATA'], errors='coerce').dt.date
+    if 'DateTime' in df.columns:
+        df['DateTime'] = pd.to_datetime(df['DateTime'], errors='coerce')
+    return df
+
+
+class GistSync:
+    """Sincronizador das leituras com um Gist, compartilhado entre as sessões"""
+
+    def __init__(self, token, gist_id, api_url=DEFAULT_API_URL, filename=DATA_FILE,
+                 timeout=DEFAULT_TIMEOUT, session=None):
+        self.url = f"{api_url.rstrip('/')}/gists/{gist_id}"
+        self.filename = filename
+        self.timeout = timeout
+
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f"token {token}",
+            'Accept': 'application/vnd.github+json',
+        })
+
+        self._lock = threading.Lock()
+        self._etag = None
+        # Partes atuais em ordem: (nome, raw_url)
+        self._files = []
+        # Conteúdo lido de cada raw_url (o raw_url muda quando o conteúdo muda)
+        self._parsed = {}
+        self._frame = None
+        self._typed = None
+        self._hashes = None
+
+    def _read_file(self, meta):
+        """Lê o conteúdo de um arquivo do Gist, em streaming se a API o truncou"""
+        raw_url = meta.get('raw_url')
+        if raw_url in self._parsed:
+            return self._parsed[raw_url]
+
+        if meta.get('truncated') or meta.get('content') is None:
+            with self.session.get(raw_url, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                frame = _read_csv(response.raw)
+        else:
+            frame = _read_csv(StringIO(meta['content']))
+        self._parsed[raw_url] = frame
+        return frame
+
+    def _apply_gist(self, gist):
+        """Atualiza o estado local a partir do JSON do Gist"""
+        numbered = []
+        for name, meta in (gist.get('files') or {}).items():
+            number = _chunk_number(self.filename, name)
+            if number is not None and meta is not None:
+                numbered.append((number, name, meta))
+        numbered.sort()
+
+        frames = [self._read_file(meta) for _, _, meta in numbered]
+        self._files = [(name, meta.get('raw_url')) for _, name, meta in numbered]
+        current = {raw_url for _, raw_url in self._files}
+        self._parsed = {url: frame for url, frame in self._parsed.items() if url in current}
+
+        frames = [frame for frame in frames if len(frame.columns)]
+        self._frame = pd.concat(frames, ignore_index=True) if frames else None
+        self._hashes = set(_row_hashes(self._frame)) if self._frame is not None else set()
+        self._typed = None
+
+    def fetch(self):
+        """Consulta condicional do Gist; retorna True se o conteúdo mudou"""
+        headers = {'If-None-Match': self._etag} if self._etag else {}
+        response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return False
+        response.raise_for_status()
+        self._apply_gist(response.json())
+        self._etag = response.headers.get('ETag')
+        return True
+
+    def load(self):
+        """Retorna as leituras do Gist (None se o arquivo não existir)"""
+        with self._lock:
+            self.fetch()
+            if self._frame is None:
+                return None
+            if self._typed is None:
+                self._typed = typed_frame(self._frame)
+            return self._typed.copy()
+
+    def save(self, df):
+        """Envia só as linhas novas como uma parte; regrava o arquivo base quando
+        linhas foram alteradas/removidas ou as partes passam de MAX_CHUNKS
+
+        Retorna a quantidade de linhas enviadas.
+        """
+        with self._lock:
+            self.fetch()
+            csv_content = df.to_csv(index=False)
+            local = _read_csv(StringIO(csv_content))
+
+            chunk_names = [name for name, _ in self._files if name != self.filename]
+            rewrite = (
+                self._frame is None
+                or list(local.columns) != list(self._frame.columns)
+                or len(chunk_names) >= MAX_CHUNKS
+            )
+            if not rewrite:
+                local_hashes = _row_hashes(local)
+                # Linhas remotas que não existem mais localmente exigem regravar a base
+                rewrite = not self._hashes.issubset(set(local_hashes))
+
+            if rewrite:
+                files = {self.filename: {'content': csv_content}}
+                files.update({name: None for name in chunk_names})
+                sent = len(local)
+            else:
+                new_rows = local[~local_hashes.isin(self._hashes).to_numpy()]
+                if new_rows.empty:
+                    return 0
+                last = max((_chunk_number(self.filename, name) for name, _ in self._files), default=0)
+                files = {_chunk_name(self.filename, last + 1): {'content': new_rows.to_csv(index=False)}}
+                sent = len(new_rows)
+
+            response = self.session.patch(self.url, json={'files': files}, timeout=self.timeout)
+            response.raise_for_status()
+            # A resposta traz o Gist atualizado; o ETag da próxima consulta é outro
+            self._apply_gist(response.json())
+            self._etag = None
+            return sent
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,118 @@
+"""
+Módulo de verificação do tempo de importação
+Mede, em processos novos, o custo de importar os módulos carregados pelo
+dashboard antes da primeira renderização e falha se o orçamento for excedido
+ou se alguma dependência pesada voltar a ser importada na inicialização
+
+Uso:
+    python -m wegscan.import_budget                 # orçamento padrão
+    python -m wegscan.import_budget --limite 80     # orçamento em ms
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Módulos importados pelo app.py na inicialização (além do Streamlit e do pandas)
+STARTUP_MODULES = [
+    'email_alerts',
+    'wegscan.changelog',
+    'wegscan.charts',
+    'wegscan.data_index',
+    'wegscan.data_table',
+    'wegscan.dataset',
+    'wegscan.derived',
+    'wegscan.exports',
+    'wegscan.fleet',
+    'wegscan.ingest',
+    'wegscan.load_analysis',
+    'wegscan.measurements',
+    'wegscan.profiling',
+    'wegscan.reports',
+    'wegscan.spectra',
+    'wegscan.stats_engine',
+    'wegscan.waveforms',
+    'wegscan.writer',
+]
+
+# Dependências que só devem ser importadas nos caminhos que as usam
+DEFERRED_MODULES = [
+    'email.mime',
+    'kaleido',
+    'openpyxl',
+    'plotly.graph_objects',
+    'plotly.express',
+    'requests',
+    'smtplib',
+    'xlsxwriter',
+]
+
+# Orçamento padrão (ms) para importar STARTUP_MODULES
+DEFAULT_BUDGET_MS = 100.0
+
+# Processos medidos; vale o menor tempo, menos sujeito a ruído
+DEFAULT_RUNS = 3
+
+# Executado em cada processo novo: importa a base inevitável, depois mede os módulos
+_PROBE = """
+import importlib, json, sys, time
+import numpy, pandas, streamlit
+modules, deferred = json.loads(sys.argv[1]), json.loads(sys.argv[2])
+before = set(sys.modules)
+start = time.perf_counter()
+for name in modules:
+    importlib.import_module(name)
+elapsed = (time.perf_counter() - start) * 1000
+loaded = [name for name in deferred if name in sys.modules and name not in before]
+print(json.dumps({'ms': elapsed, 'pesados': loaded}))
+"""
+
+
+def measure(modules=STARTUP_MODULES, deferred=DEFERRED_MODULES, root=None):
+    """Importa os módulos em um processo novo e retorna (ms, dependências pesadas carregadas)"""
+    root = root or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, '-c', _PROBE, json.dumps(modules), json.dumps(deferred)],
+        cwd=root, capture_output=True, text=True, check=True
+    )
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    return data['ms'], data['pesados']
+
+
+def check(budget_ms=DEFAULT_BUDGET_MS, runs=DEFAULT_RUNS):
+    """Retorna a lista de violações do orçamento (vazia quando tudo está dentro)"""
+    samples = [measure() for _ in range(runs)]
+    best = min(ms for ms, _ in samples)
+    heavy = sorted({name for _, loaded in samples for name in loaded})
+
+    problems = []
+    if best > budget_ms:
+        problems.append(f"Importação levou {best:.1f} ms (orçamento: {budget_ms:.1f} ms)")
+    if heavy:
+        problems.append(f"Dependências pesadas importadas na inicialização: {', '.join(heavy)}")
+    return best, problems
+
+
+def main(argv=None):
+    """Ponto de entrada (python -m wegscan.import_budget)"""
+    parser = argparse.ArgumentParser(
+        prog='python -m wegscan.import_budget',
+        description="Verifica o tempo de importação da inicialização do dashboard"
+    )
+    parser.add_argument('--limite', type=float, default=DEFAULT_BUDGET_MS, help="Orçamento em ms")
+    parser.add_argument('--execucoes', type=int, default=DEFAULT_RUNS, help="Processos medidos")
+    args = parser.parse_args(argv)
+
+    best, problems = check(args.limite, args.execucoes)
+    for problem in problems:
+        print(f"ERRO: {problem}")
+    if problems:
+        return 1
+    print(f"OK: {best:.1f} ms (orçamento: {args.limite:.1f} ms)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Módulo de ingestão de leituras
+Valida as leituras recebidas (formulário, arquivos ou HTTP) e as correções de
+células de leituras existentes, grava na planilha, registra o log de alterações
+e dispara os alertas
+"""
+
+from datetime import date, datetime, time
+import json
+import logging
+import math
+import os
+
+import pandas as pd
+
+from wegscan import alerts
+from wegscan.measurements import MEASURED_VARIABLES
+from wegscan.writer import get_writer
+
+logger = logging.getLogger(__name__)
+
+# Usuário registrado no log quando a origem não informa
+DEFAULT_USER = "Operador Local"
+
+# Extensões aceitas na pasta de entrada
+READING_FILE_EXTENSIONS = ('.csv', '.json')
+
+
+def _parse_date(value):
+    """Converte texto/datetime em date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def _parse_time(value):
+    """Converte texto/datetime em time"""
+    if isinstance(value, datetime):
+        return value.time()
+    if isinstance(value, time):
+        return value
+    return pd.Timestamp(f"2000-01-01 {value}").time()
+
+
+def _parse_measurement(value):
+    """Converte a medição em float, com None para valores ausentes"""
+    if value is None or value == '':
+        return None
+    number = float(value)
+    return None if math.isnan(number) else number
+
+
+def normalize_reading(raw):
+    """Valida uma leitura bruta e retorna o registro normalizado
+
+    Aceita DATA e HORÁRIO separados ou um DateTime combinado. Lança ValueError
+    se a leitura estiver incompleta ou inválida.
+    """
+    if not raw.get('EQUIPAMENTO'):
+        raise ValueError("Leitura sem EQUIPAMENTO")
+
+    try:
+        if raw.get('DateTime') not in (None, ''):
+            moment = pd.Timestamp(raw['DateTime']).to_pydatetime()
+            data, horario = moment.date(), moment.time()
+        else:
+            data, horario = _parse_date(raw['DATA']), _parse_time(raw['HORÁRIO'])
+        measurements = {var: _parse_measurement(raw.get(var)) for var in MEASURED_VARIABLES}
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Leitura inválida: {e}") from e
+
+    # Validar entrada
+    for var, value in measurements.items():
+        if var.startswith('VIBRAÇÃO') and value is not None and value < 0:
+            raise ValueError("Valores de vibração não podem ser negativos!")
+
+    return {
+        'DATA': data,
+        'HORÁRIO': horario,
+        'EQUIPAMENTO': str(raw['EQUIPAMENTO']).strip(),
+        **measurements,
+    }
+
+
+def read_readings_file(path):
+    """Lê as leituras brutas de um arquivo CSV ou JSON (objeto ou lista de objetos)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        return df.to_dict('records')
+    if extension == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else [data]
+    raise ValueError(f"Formato de arquivo não suportado: {path}")
+
+
+def persist_readings(records, usuario=DEFAULT_USER):
+    """Grava os registros na planilha e no log de alterações pelo escritor único do processo
+
+    Bloqueia até o lote que contém os registros ser gravado e retorna o resultado da gravação.
+    """
+    return get_writer().submit_readings(records, usuario).result()
+
+
+def ingest_readings(raw_readings, usuario=DEFAULT_USER, alert_config=None, alert_sender=None):
+    """Ingere leituras: valida, grava, registra alterações e envia alertas
+
+    Retorna um dicionário com os registros gravados e os alertas enviados.
+    """
+    records = [normalize_reading(raw) for raw in raw_readings]
+    if not records:
+        return {'registros': [], 'alertas': []}
+
+    written = persist_readings(records, usuario)
+
+    # As leituras estão gravadas: os alertas são enviados mesmo se o log de alterações falhou
+    alertas = []
+    for record in records:
+        alertas.extend(alerts.dispatch_alerts(
+            record, config=alert_config, sender=alert_sender or alerts.send_alert_email
+        ))
+
+    result = {'registros': records, 'alertas': alertas}
+    if written.get('aviso_log'):
+        logger.warning(written['aviso_log'])
+        result['aviso_log'] = written['aviso_log']
+    return result
+
+
+def normalize_cell_update(raw):
+    """Valida uma correção de célula e retorna a alteração normalizada (None se o valor não mudou)
+
+    A correção tem EQUIPAMENTO, DateTime, variavel, valor_anterior e novo_valor.
+    Lança ValueError se estiver incompleta ou inválida.
+    """
+    variable = raw.get('variavel')
+    if variable not in MEASURED_VARIABLES:
+        raise ValueError(f"Variável não editável: {variable}")
+    try:
+        update = {
+            'EQUIPAMENTO': str(raw['EQUIPAMENTO']).strip(),
+            'DateTime': pd.Timestamp(raw['DateTime']),
+            'variavel': variable,
+            'valor_anterior': _parse_measurement(raw.get('valor_anterior')),
+            'novo_valor': _parse_measurement(raw.get('novo_valor')),
+        }
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Alteração inválida: {e}") from e
+
+    if variable.startswith('VIBRAÇÃO') and update['novo_valor'] is not None and update['novo_valor'] < 0:
+        raise ValueError("Valores de vibração não podem ser negativos!")
+    if update['novo_valor'] == update['valor_anterior']:
+        return None
+    return update
+
+
+def update_readings(raw_updates, usuario=DEFAULT_USER, alert_config=None, alert_sender=None):
+    """Corrige células de leituras existentes: valida, grava só as células, registra e reavalia alertas
+
+    Os alertas são reavaliados só para as células alteradas: um e-mail é enviado
+    quando o novo valor está fora dos limites e o anterior não estava.
+    Retorna um dicionário com as alterações gravadas e os alertas enviados.
+    """
+    updates = [update for update in map(normalize_cell_update, raw_updates) if update is not None]
+    if not updates:
+        return {'alteracoes': [], 'alertas': []}
+
+    written = get_writer().submit_cell_updates(updates, usuario).result()
+
+    alertas = []
+    for update in updates:
+        variable = update['variavel']
+        if alerts.is_alert_triggered(variable, update['valor_anterior'])[0]:
+            continue
+        moment = update['DateTime'].to_pydatetime()
+        reading = {
+            'EQUIPAMENTO': update['EQUIPAMENTO'],
+            'DATA': moment.date(),
+            'HORÁRIO': moment.time(),
+            variable: update['novo_valor'],
+        }
+        alertas.extend(alerts.dispatch_alerts(
+            reading, config=alert_config, sender=alert_sender or alerts.send_alert_email
+        ))
+
+    result = {'alteracoes': updates, 'alertas': alertas}
+    if written.get('aviso_log'):
+        logger.warning(written['aviso_log'])
+        result['aviso_log'] = written['aviso_log']
+    return result
@@ -0,0 +1,151 @@
+"""
+Módulo de análise de vibração e temperatura em relação à carga
+Usa a corrente elétrica como medida da carga do motor: correlação móvel entre
+a corrente e cada variável, valor normalizado para a carga de referência
+(corrente mediana do equipamento) e o desvio, em desvios padrão, da leitura
+em relação ao esperado para a mesma corrente por uma regressão linear sobre a
+janela anterior. Todas as variáveis são calculadas juntas com médias móveis
+vetorizadas sobre a fatia do equipamento no índice temporal
+"""
+
+import numpy as np
+import pandas as pd
+
+from wegscan.measurements import MEASURED_VARIABLES
+from wegscan.profiling import timed
+from wegscan.result_cache import ResultCache
+
+# Variável usada como carga
+CURRENT = 'CORRENTE ELÉTRICA (A)'
+
+# Variáveis analisadas em relação à carga
+LOAD_VARIABLES = [var for var in MEASURED_VARIABLES if var != CURRENT]
+
+# Janelas (quantidade de leituras) oferecidas na interface
+WINDOWS = [10, 20, 50]
+DEFAULT_WINDOW = 20
+
+# Abaixo desta fração da corrente de referência o motor é considerado parado
+MIN_LOAD_FRACTION = 0.1
+
+# Desvio (em desvios padrão) a partir do qual a leitura é anormal para a carga
+ANOMALY_SIGMA = 3.0
+
+# Estatísticas calculadas por variável (segundo nível das colunas)
+METRICS = ['Valor', 'Normalizado', 'Correlação', 'Esperado', 'Desvio (σ)']
+
+_analyses = ResultCache(maxsize=64)
+
+
+def min_periods(window):
+    """Leituras mínimas na janela para as estatísticas móveis"""
+    return max(3, window // 2)
+
+
+@timed('carga.analise')
+def analyze_load(df_equipment, window=DEFAULT_WINDOW, variables=LOAD_VARIABLES):
+    """Análise de carga das leituras de um equipamento (ordenadas por DateTime)
+
+    Retorna um DataFrame indexado por DateTime com a corrente em ('Carga', 'Corrente')
+    e as colunas (variável, estatística) de METRICS; None se não há corrente medida.
+    """
+    current = df_equipment[CURRENT].to_numpy(np.float64)
+    # Corrente de referência: mediana das leituras com corrente (0 costuma ser campo não preenchido)
+    loaded = current[np.isfinite(current) & (current > 0)]
+    if not len(loaded):
+        return None
+    reference = float(np.median(loaded))
+
+    # Leituras com o motor parado não dizem nada sobre a relação com a carga
+    running = current >= MIN_LOAD_FRACTION * reference
+    values = df_equipment[variables].to_numpy(np.float64)
+    valid = running[:, np.newaxis] & np.isfinite(values) & np.isfinite(current)[:, np.newaxis]
+    x = pd.DataFrame(np.where(valid, current[:, np.newaxis], np.nan), columns=variables)
+    y = pd.DataFrame(np.where(valid, values, np.nan), columns=variables)
+
+    def rolling_mean(frame):
+        return frame.rolling(window, min_periods=min_periods(window)).mean()
+
+    # Momentos móveis de todas as variáveis de uma vez
+    mean_x, mean_y = rolling_mean(x), rolling_mean(y)
+    cov = rolling_mean(x * y) - mean_x * mean_y
+    var_x = rolling_mean(x * x) - mean_x ** 2
+    var_y = rolling_mean(y * y) - mean_y ** 2
+    flat_x = var_x <= 1e-9 * np.maximum(mean_x ** 2, 1.0)
+    correlation = (cov / np.sqrt(var_x * var_y)).where(~flat_x & (var_y > 0)).clip(-1.0, 1.0)
+
+    # Esperado pela reta da janela anterior (sem a própria leitura); corrente constante: média
+    slope = (cov / var_x).where(~flat_x, 0.0)
+    intercept = mean_y - slope * mean_x
+    expected = intercept.shift(1) + slope.shift(1) * x
+    residual = y - expected
+    spread = residual.rolling(window, min_periods=min_periods(window)).std().shift(1)
+    deviation = residual / spread.where(spread > 0)
+
+    normalized = y * reference / x
+
+    parts = {
+        'Valor': y,
+        'Normalizado': normalized,
+        'Correlação': correlation,
+        'Esperado': expected,
+        'Desvio (σ)': deviation,
+    }
+    result = pd.concat(parts, axis=1).swaplevel(axis=1)
+    result = result.reindex(columns=pd.MultiIndex.from_product([variables, METRICS]))
+    result[('Carga', 'Corrente')] = current
+    result.index = pd.DatetimeIndex(df_equipment['DateTime'].to_numpy(), name='DateTime')
+    result.attrs['corrente_referencia'] = reference
+    return result
+
+
+def cached_load_analysis(time_index, equipment, window=DEFAULT_WINDOW):
+    """Análise de todo o histórico do equipamento no índice, em cache por (equipamento, janela, versão)
+
+    O período do filtro é recortado depois (period_rows), para que a janela móvel
+    do início do período use as leituras anteriores a ele.
+    """
+    return _analyses.get_or_compute(
+        (equipment, window, time_index.version),
+        lambda: analyze_load(time_index.slice(equipment), window)
+    )
+
+
+def period_rows(analysis, start=None, end=None):
+    """Linhas da análise no período (end como data pura inclui o dia inteiro)"""
+    if analysis is None:
+        return None
+    times = analysis.index
+    mask = np.ones(len(times), dtype=bool)
+    if start is not None:
+        mask &= times >= pd.Timestamp(start)
+    if end is not None:
+        mask &= times < pd.Timestamp(end) + pd.Timedelta(days=1)
+    return analysis[mask]
+
+
+def anomalies(analysis, variable, sigma=ANOMALY_SIGMA):
+    """Leituras da variável acima de sigma desvios padrão do esperado para a carga"""
+    deviation = analysis[(variable, 'Desvio (σ)')]
+    return analysis[deviation.abs() >= sigma]
+
+
+def load_summary(analyses, variable, sigma=ANOMALY_SIGMA):
+    """Resumo por equipamento (equipamento -> análise do período) de uma variável"""
+    rows = []
+    for equipment, analysis in analyses.items():
+        if analysis is None or analysis.empty:
+            continue
+        column = analysis[variable]
+        correlation = column['Correlação'].dropna()
+        deviation = column['Desvio (σ)']
+        last_deviation = deviation.dropna()
+        rows.append({
+            'Equipamento': equipment,
+            'Corrente de referência (A)': analysis.attrs.get('corrente_referencia'),
+            'Correlação atual': correlation.iloc[-1] if len(correlation) else np.nan,
+            'Normalizado (média)': column['Normalizado'].mean(),
+            'Último desvio (σ)': last_deviation.iloc[-1] if len(last_deviation) else np.nan,
+            'Leituras anormais': int((deviation.abs() >= sigma).sum()),
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,419 @@
+"""
+Módulo de teste de carga com sessões simultâneas
+Executa o app.py sem navegador pelo AppTest do Streamlit, com N sessões em
+paralelo (uma thread por sessão) alterando filtros, usando os controles das
+abas e enviando o form_novo_registro sobre uma frota sintética
+(wegscan.synthetic). O SMTP e o Gist são substituídos pelos serviços locais
+de wegscan.standins (o Gist é configurado via GIST_API_URL; nenhuma chamada
+sai para a rede)
+
+Relata a latência das execuções do script (p50/p95/p99, geral e por ação),
+o pico de memória (RSS) do processo e a vazão de gravações
+
+Uso:
+    python -m wegscan.loadtest                           # 12 sessões, 10 ações cada
+    python -m wegscan.loadtest --sessoes 24 --acoes 20
+    python -m wegscan.loadtest --tamanho 20x4x2 --pausa 0.5 --salvar carga.json
+"""
+
+import argparse
+from contextlib import ExitStack, chdir, contextmanager
+from datetime import time as clock, timedelta
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILE = os.path.join(ROOT, 'app.py')
+
+DEFAULT_SESSIONS = 12
+DEFAULT_ACTIONS = 10
+
+# Frota padrão: (motores, leituras por dia, anos)
+DEFAULT_SIZE = (10, 4, 1.0)
+
+# Tempo máximo (s) de uma execução do script
+DEFAULT_TIMEOUT = 300
+
+PERCENTILES = (50, 95, 99)
+
+# Peso de cada ação no sorteio (operadores mais consultam do que gravam)
+ACTION_WEIGHTS = {
+    'filtro_equipamentos': 3,
+    'filtro_periodo': 3,
+    'filtro_variaveis': 2,
+    'aba_graficos': 2,
+    'aba_dados': 4,
+    'aba_historico': 1,
+    'novo_registro': 2,
+}
+
+# Fração dos registros enviados com medições acima dos limites (dispara e-mails)
+ALERT_RATE = 0.2
+
+# Campos numéricos do form_novo_registro -> variável medida
+FORM_FIELDS = {
+    'Vibração Axial (mm/s)': 'VIBRAÇÃO AXIAL(mm/s)',
+    'Vibração Radial-Y (mm/s)': 'VIBRAÇÃO RADIAL-Y (mm/s)',
+    'Vibração Radial-X (mm/s)': 'VIBRAÇÃO RADIAL-X (mm/s)',
+    'Temperatura (°C)': 'TEMPERATURA(°C)',
+    'Corrente Elétrica (A)': 'CORRENTE ELÉTRICA (A)',
+}
+
+
+def parse_size(text):
+    """Converte 'motoresxleituras_por_diaxanos' em tupla"""
+    motors, readings, years = text.lower().split('x')
+    return int(motors), int(readings), float(years)
+
+
+@contextmanager
+def shared_streamlit_runtime():
+    """Faz as sessões do AppTest compartilharem um Runtime, como no servidor real
+
+    O AppTest foi feito para uma sessão por vez: cada execução instala o próprio
+    Runtime falso como global e o remove ao terminar, e compila o script de novo.
+    Com várias threads isso derruba as execuções das outras sessões, então o
+    Runtime (caches st.cache_*) e o cache de bytecode passam a ser únicos.
+    """
+    from unittest.mock import MagicMock, patch
+
+    from streamlit import config, logger
+    from streamlit.components.v2.component_manager import BidiComponentManager
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage('/mock/media'))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    registry = BidiComponentManager()
+    registry.discover_and_register_components(start_file_watching=False)
+    runtime.bidi_component_registry = registry
+    script_cache = ScriptCache()
+
+    with ExitStack() as stack:
+        stack.enter_context(patch.object(Runtime, 'instance', classmethod(lambda cls: runtime)))
+        stack.enter_context(patch.object(Runtime, 'exists', classmethod(lambda cls: True)))
+        stack.enter_context(patch.object(app_test, 'ScriptCache', lambda: script_cache))
+        # Cada execução também troca config.get_option; fixar a opção evita que uma
+        # sessão terminando desfaça a da outra no meio da execução
+        previous = config.get_option('global.appTest')
+        config.set_option('global.appTest', True)
+        stack.callback(config.set_option, 'global.appTest', previous)
+
+        # Avisos de sessão fora de um servidor e de parâmetros obsoletos, repetidos a cada
+        # execução (logger.level vale também quando a configuração é relida)
+        level = config.get_option('logger.level')
+        config.set_option('logger.level', 'error')
+        logger.set_log_level('error')
+        stack.callback(logger.set_log_level, level)
+        stack.callback(config.set_option, 'logger.level', level)
+        yield runtime
+
+
+def write_secrets(directory, gist_api_url):
+    """Grava .streamlit/secrets.toml apontando e-mail e Gist para os serviços locais"""
+    secrets = {
+        'EMAIL_SENDER': 'carga@localhost',
+        'EMAIL_PASSWORD': 'carga',
+        'EMAIL_RECIPIENTS': 'operador@localhost',
+        'SMTP_SERVER': '127.0.0.1',
+        'SMTP_PORT': '25',
+        'GITHUB_TOKEN': 'carga',
+        'GIST_ID': 'local',
+        'GIST_API_URL': gist_api_url,
+    }
+    os.makedirs(os.path.join(directory, '.streamlit'), exist_ok=True)
+    with open(os.path.join(directory, '.streamlit', 'secrets.toml'), 'w', encoding='utf-8') as f:
+        for key, value in secrets.items():
+            f.write(f"{key} = {json.dumps(value)}\n")
+
+
+def _widget(at, kind, label=None, key=None):
+    """Widget de um tipo pelo rótulo ou pela chave (None se não estiver na tela)"""
+    return next((
+        w for w in getattr(at, kind)
+        if (label is None or w.label == label) and (key is None or w.key == key)
+    ), None)
+
+
+def _subset(rng, options):
+    """Subconjunto aleatório não vazio, na ordem original"""
+    chosen = set(rng.sample(list(options), rng.randint(1, len(options))))
+    return [option for option in options if option in chosen]
+
+
+def _filter_equipments(at, rng):
+    widget = _widget(at, 'multiselect', 'Equipamentos')
+    return widget is not None and widget.set_value(_subset(rng, widget.options))
+
+
+def _filter_period(at, rng):
+    start, end = _widget(at, 'date_input', 'De'), _widget(at, 'date_input', 'Até')
+    if start is None or end is None:
+        return False
+    # Às vezes o período alcança meses fora da partição quente
+    first = start.min or start.value
+    value = max(end.value - timedelta(days=rng.choice([7, 30, 60, 120, 240])), first)
+    start.set_value(value)
+    return True
+
+
+def _filter_variables(at, rng):
+    widget = _widget(at, 'multiselect', 'Variáveis')
+    return widget is not None and widget.set_value(_subset(rng, widget.options))
+
+
+def _charts_tab(at, rng):
+    widget = _widget(at, 'selectbox', 'Formato do relatório')
+    return widget is not None and widget.set_value(rng.choice(widget.options))
+
+
+def _data_tab(at, rng):
+    choice = rng.randrange(5)
+    if choice < 2:
+        widget = _widget(at, 'toggle', key=('table_sort_desc', 'table_only_alerts')[choice])
+        return widget is not None and widget.set_value(not widget.value)
+    if choice == 2:
+        widget = _widget(at, 'selectbox', key='table_sort_column')
+        return widget is not None and widget.set_value(rng.choice(widget.options))
+    if choice == 3:
+        widget = _widget(at, 'selectbox', key='table_page_size')
+        return widget is not None and widget.select_index(rng.randrange(len(widget.options)))
+    widget = _widget(at, 'number_input', 'Página')
+    return widget is not None and widget.set_value(rng.randint(1, int(widget.max or 1)))
+
+
+def _history_tab(at, rng):
+    # O filtro só aparece quando o log de alterações tem entradas
+    widget = _widget(at, 'multiselect', key='filter_eq_log')
+    return widget is not None and bool(widget.options) and widget.set_value(_subset(rng, widget.options))
+
+
+def _new_record(at, rng):
+    from wegscan.synthetic import BASELINES
+
+    button = _widget(at, 'button', '✅ Adicionar Registro')
+    last_day = _widget(at, 'date_input', 'Até')
+    equipment = _widget(at, 'selectbox', '⚙️ Equipamento')
+    if button is None or last_day is None or equipment is None:
+        return False
+    # Leituras no último dia da frota, para não deslocar a partição quente
+    _widget(at, 'date_input', '📅 Data').set_value(last_day.value)
+    _widget(at, 'time_input', '🕐 Hora').set_value(clock(rng.randrange(24), rng.randrange(60)))
+    equipment.set_value(rng.choice(equipment.options))
+    scale = 3.0 if rng.random() < ALERT_RATE else 1.0
+    for label, variable in FORM_FIELDS.items():
+        mean, std = BASELINES[variable]
+        _widget(at, 'number_input', label).set_value(round(abs(rng.gauss(mean, std)) * scale, 2))
+    button.click()
+    return True
+
+
+ACTIONS = {
+    'filtro_equipamentos': _filter_equipments,
+    'filtro_periodo': _filter_period,
+    'filtro_variaveis': _filter_variables,
+    'aba_graficos': _charts_tab,
+    'aba_dados': _data_tab,
+    'aba_historico': _history_tab,
+    'novo_registro': _new_record,
+}
+
+
+class Session:
+    """Uma sessão de operador: abre o dashboard e executa ações sorteadas"""
+
+    def __init__(self, number, actions, seed, pause=0.0, timeout=DEFAULT_TIMEOUT):
+        self.number = number
+        self.actions = actions
+        self.rng = random.Random(seed * 1000 + number)
+        self.pause = pause
+        self.timeout = timeout
+        # (ação, segundos) de cada execução do script
+        self.samples = []
+        self.writes = 0
+        self.errors = []
+
+    def _run(self, at, action):
+        started = time.perf_counter()
+        at.run(timeout=self.timeout)
+        self.samples.append((action, time.perf_counter() - started))
+        failures = [e.value for e in at.exception] + [e.value for e in at.error]
+        if failures:
+            self.errors.append((action, failures[0]))
+        return not failures
+
+    def run(self):
+        from streamlit.testing.v1 import AppTest
+
+        try:
+            at = AppTest.from_file(APP_FILE, default_timeout=self.timeout)
+            self._run(at, 'abrir_sessao')
+            names, weights = zip(*ACTION_WEIGHTS.items())
+            for _ in range(self.actions):
+                if self.pause:
+                    time.sleep(self.rng.uniform(0, self.pause))
+                action = self.rng.choices(names, weights)[0]
+                if not ACTIONS[action](at, self.rng):
+                    continue
+                if self._run(at, action) and action == 'novo_registro':
+                    self.writes += 1
+        except Exception as e:
+            self.errors.append(('sessao', repr(e)))
+
+
+def _peak_rss_mb():
+    """Pico de memória residente do processo em MB (None fora do Unix)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def summarize(seconds):
+    """Quantidade e percentis (ms) de uma lista de durações"""
+    if not seconds:
+        return {'execucoes': 0}
+    values = np.percentile(np.asarray(seconds) * 1000, PERCENTILES)
+    summary = {'execucoes': len(seconds)}
+    summary.update({f"p{p}": float(value) for p, value in zip(PERCENTILES, values)})
+    return summary
+
+
+def run_load_test(sessions=DEFAULT_SESSIONS, actions=DEFAULT_ACTIONS, size=DEFAULT_SIZE,
+                  seed=0, pause=0.0, smtp_latency=0.0):
+    """Executa o teste de carga em uma frota sintética temporária; retorna o resultado"""
+    from wegscan.standins import GistStandIn, SMTPStandIn
+    from wegscan.synthetic import generate_fleet
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    with ExitStack() as stack:
+        directory = stack.enter_context(tempfile.TemporaryDirectory(prefix='wegscan-carga-'))
+        gist = stack.enter_context(GistStandIn())
+        smtp = SMTPStandIn(latency=smtp_latency)
+        stack.enter_context(chdir(directory))
+        write_secrets(directory, gist.api_url)
+
+        from wegscan import storage
+        from wegscan.config import EXCEL_FILE
+
+        motors, readings, years = size
+        fleet = generate_fleet(EXCEL_FILE, motors, readings, years, seed=seed)
+        stack.enter_context(smtp.installed())
+        stack.enter_context(shared_streamlit_runtime())
+
+        rss_before = _peak_rss_mb()
+        workers = [Session(number, actions, seed, pause) for number in range(sessions)]
+        threads = [threading.Thread(target=worker.run, name=f"sessao-{worker.number}") for worker in workers]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        # Cada envio do form espera a gravação do escritor; nada fica pendente aqui
+        rows_written = len(storage.load_readings()) - len(fleet)
+
+    samples = [sample for worker in workers for sample in worker.samples]
+    reruns = [seconds for action, seconds in samples if action != 'abrir_sessao']
+    per_action = {}
+    for action, seconds in samples:
+        per_action.setdefault(action, []).append(seconds)
+    writes = sum(worker.writes for worker in workers)
+
+    return {
+        'sessoes': sessions,
+        'linhas_frota': len(fleet),
+        'duracao_s': elapsed,
+        'latencia_ms': summarize(reruns),
+        'por_acao': {action: summarize(values) for action, values in sorted(per_action.items())},
+        'rss_inicial_mb': rss_before,
+        'rss_pico_mb': _peak_rss_mb(),
+        'gravacoes': writes,
+        'linhas_gravadas': rows_written,
+        'gravacoes_por_s': writes / elapsed if elapsed else 0.0,
+        'emails': len(smtp.messages),
+        'requisicoes_gist': len(gist.requests),
+        'erros': [
+            {'sessao': worker.number, 'acao': action, 'erro': str(error)}
+            for worker in workers for action, error in worker.errors
+        ],
+    }
+
+
+def _row(name, summary):
+    if not summary.get('execucoes'):
+        return f"{name:<22}{0:>8}"
+    return f"{name:<22}{summary['execucoes']:>8}" + ''.join(
+        f"{summary[f'p{p}']:>12.1f}" for p in PERCENTILES
+    )
+
+
+def print_report(result, out=sys.stdout):
+    """Imprime latências, memória e vazão de um teste de carga"""
+    print(f"{result['sessoes']} sessões, frota de {result['linhas_frota']} linhas, "
+          f"{result['duracao_s']:.1f} s", file=out)
+    print(f"{'execução (ms)':<22}{'n':>8}" + ''.join(f"{f'p{p}':>12}" for p in PERCENTILES), file=out)
+    print(_row('todas (reexecuções)', result['latencia_ms']), file=out)
+    for action, summary in result['por_acao'].items():
+        print(_row(f"  {action}", summary), file=out)
+
+    if result['rss_pico_mb'] is not None:
+        print(f"RSS: {result['rss_inicial_mb']:.0f} MB antes das sessões, pico {result['rss_pico_mb']:.0f} MB",
+              file=out)
+    print(f"Gravações: {result['gravacoes']} ({result['gravacoes_por_s']:.2f}/s), "
+          f"{result['linhas_gravadas']} linhas na planilha", file=out)
+    print(f"E-mails no SMTP local: {result['emails']}; requisições ao Gist local: {result['requisicoes_gist']}",
+          file=out)
+    for error in result['erros'][:10]:
+        print(f"ERRO sessão {error['sessao']} ({error['acao']}): {error['erro']}", file=out)
+
+
+def main(argv=None):
+    """Ponto de entrada (python -m wegscan.loadtest)"""
+    parser = argparse.ArgumentParser(prog='python -m wegscan.loadtest',
+                                     description="Teste de carga com sessões simultâneas do WEG SCAN")
+    parser.add_argument('--sessoes', type=int, default=DEFAULT_SESSIONS, help="Sessões simultâneas")
+    parser.add_argument('--acoes', type=int, default=DEFAULT_ACTIONS, help="Ações por sessão")
+    parser.add_argument('--tamanho', default='x'.join(f"{v:g}" for v in DEFAULT_SIZE),
+                        help="Frota sintética motoresxleituras_por_diaxanos")
+    parser.add_argument('--pausa', type=float, default=0.0,
+                        help="Pausa máxima (s) entre as ações de uma sessão")
+    parser.add_argument('--latencia-smtp', type=float, default=0.0,
+                        help="Tempo (s) de cada envio no SMTP local")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--salvar', help="Grava o resultado em JSON")
+    args = parser.parse_args(argv)
+
+    print(f"Executando {args.sessoes} sessões...", file=sys.stderr)
+    result = run_load_test(args.sessoes, args.acoes, parse_size(args.tamanho),
+                           args.semente, args.pausa, args.latencia_smtp)
+    print_report(result)
+
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return 1 if result['erros'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,22 @@
+"""
+Módulo de definição das variáveis medidas
+Colunas de medição e limites de alerta usados pelo dashboard e pelos relatórios
+"""
+
+# Definir limites de alerta para cada variável
+ALERT_LIMITS = {
+    'VIBRAÇÃO AXIAL(mm/s)': {'min': 0, 'max': 5},
+    'VIBRAÇÃO RADIAL-Y (mm/s)': {'min': 0, 'max': 5},
+    'VIBRAÇÃO RADIAL-X (mm/s)': {'min': 0, 'max': 7},
+    'TEMPERATURA(°C)': {'min': 0, 'max': 70},
+    'CORRENTE ELÉTRICA (A)': {'min': 0, 'max': 100}
+}
+
+# Colunas de variáveis medidas
+MEASURED_VARIABLES = [
+    'VIBRAÇÃO AXIAL(mm/s)',
+    'VIBRAÇÃO RADIAL-Y (mm/s)',
+    'VIBRAÇÃO RADIAL-X (mm/s)',
+    'TEMPERATURA(°C)',
+    'CORRENTE ELÉTRICA (A)'
+]
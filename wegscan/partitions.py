@@ -0,0 +1,186 @@
+"""
+Módulo de partições mensais das leituras
+Mantém ao lado da planilha uma cópia das leituras dividida por mês (Parquet),
+com um manifesto que registra o estado da planilha de origem. A planilha
+continua sendo a fonte dos dados; as partições são reconstruídas quando ela é
+alterada fora do escritor e atualizadas mês a mês a cada gravação
+"""
+
+import os
+
+import pandas as pd
+
+from wegscan import storage
+from wegscan.config import EXCEL_FILE, PARTITIONS_DIR
+from wegscan.files import read_json, replace_atomically, write_json
+from wegscan.profiling import timed
+
+MANIFEST_FILE = 'manifesto.json'
+
+
+def _require_pyarrow():
+    """Importa o pyarrow, necessário para gravar e ler as partições"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Instale pyarrow para particionar as leituras.") from e
+    return pyarrow
+
+
+def month_key(value):
+    """Chave AAAA-MM da partição de uma data/datetime"""
+    return pd.Timestamp(value).strftime('%Y-%m')
+
+
+def month_start(key):
+    """Primeiro instante do mês de uma chave AAAA-MM"""
+    return pd.Timestamp(f"{key}-01")
+
+
+def _month_entry(df):
+    """Resumo de uma partição guardado no manifesto"""
+    return {
+        'linhas': int(len(df)),
+        'inicio': df['DateTime'].min().isoformat(),
+        'fim': df['DateTime'].max().isoformat(),
+        'equipamentos': sorted(df['EQUIPAMENTO'].dropna().astype(str).unique().tolist()),
+    }
+
+
+class PartitionStore:
+    """Partições mensais (Parquet) derivadas da planilha principal"""
+
+    def __init__(self, path=EXCEL_FILE, directory=PARTITIONS_DIR):
+        self.pa = _require_pyarrow()
+        self.path = path
+        self.directory = directory
+        self.manifest = None
+
+    def _partition_path(self, key):
+        return os.path.join(self.directory, f"{key}.parquet")
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_FILE)
+
+    def _write_partition(self, key, df):
+        table = self.pa.Table.from_pandas(df, preserve_index=False)
+        replace_atomically(self._partition_path(key), lambda tmp: self.pa.parquet.write_table(table, tmp))
+
+    def _save_manifest(self):
+        write_json(self._manifest_path(), self.manifest)
+
+    def ensure_current(self, signature):
+        """Garante partições correspondentes ao estado da planilha, reconstruindo se preciso"""
+        if self.manifest is None:
+            self.manifest = read_json(self._manifest_path(), None)
+        if self.manifest is None or tuple(self.manifest.get('assinatura') or ()) != tuple(signature or ()):
+            self.rebuild(signature)
+        return self.manifest
+
+    @timed('carga.particoes')
+    def rebuild(self, signature):
+        """Relê a planilha inteira e regrava todas as partições"""
+        os.makedirs(self.directory, exist_ok=True)
+        df = storage.load_readings(self.path)
+        months = df['DateTime'].dt.strftime('%Y-%m')
+
+        partitions = {}
+        for key, part in df.groupby(months, sort=True):
+            part = part.reset_index(drop=True)
+            self._write_partition(key, part)
+            partitions[key] = _month_entry(part)
+
+        # Remover partições de meses que não existem mais na planilha
+        for name in os.listdir(self.directory):
+            if name.endswith('.parquet') and name[:-len('.parquet')] not in partitions:
+                os.remove(os.path.join(self.directory, name))
+
+        self.manifest = {'assinatura': list(signature or ()), 'particoes': partitions}
+        self._save_manifest()
+
+    @property
+    def months(self):
+        """Chaves AAAA-MM das partições em ordem cronológica"""
+        return sorted(self.manifest['particoes'])
+
+    def bounds(self):
+        """Primeiro e último DateTime de todo o histórico"""
+        entries = [self.manifest['particoes'][key] for key in self.months]
+        if not entries:
+            return None, None
+        return pd.Timestamp(entries[0]['inicio']), pd.Timestamp(entries[-1]['fim'])
+
+    def months_with(self, equipment):
+        """Chaves AAAA-MM das partições com leituras do equipamento, em ordem cronológica"""
+        return [key for key in self.months if equipment in self.manifest['particoes'][key]['equipamentos']]
+
+    def rows(self):
+        """Quantidade de leituras de todo o histórico"""
+        return sum(entry['linhas'] for entry in self.manifest['particoes'].values())
+
+    def equipments(self):
+        """Equipamentos presentes em qualquer partição"""
+        return sorted({
+            equipment
+            for entry in self.manifest['particoes'].values()
+            for equipment in entry['equipamentos']
+        })
+
+    @timed('carga.mes')
+    def read(self, key):
+        """Lê uma partição mensal no formato de DataFrame do dashboard"""
+        return self.pa.parquet.read_table(self._partition_path(key)).to_pandas()
+
+    @timed('gravacao.particoes')
+    def append(self, delta, signature_before, signature_after):
+        """Acrescenta linhas gravadas na planilha às partições dos meses afetados
+
+        Retorna False (e nada grava) se as partições não correspondiam ao estado
+        anterior da planilha; nesse caso serão reconstruídas na próxima carga.
+        """
+        if self.manifest is None or tuple(self.manifest.get('assinatura') or ()) != tuple(signature_before or ()):
+            return False
+
+        os.makedirs(self.directory, exist_ok=True)
+        months = delta['DateTime'].dt.strftime('%Y-%m')
+        for key, rows in delta.groupby(months, sort=True):
+            if key in self.manifest['particoes']:
+                part = pd.concat([self.read(key), rows], ignore_index=True)
+                part = part.sort_values('DateTime', kind='stable').reset_index(drop=True)
+            else:
+                part = rows.reset_index(drop=True)
+            self._write_partition(key, part)
+            self.manifest['particoes'][key] = _month_entry(part)
+
+        self.manifest['assinatura'] = list(signature_after or ())
+        self._save_manifest()
+        return True
+
+    @timed('gravacao.particoes')
+    def update(self, updates, signature_before, signature_after):
+        """Aplica alterações de células (storage.update_cells) às partições dos meses afetados
+
+        Retorna False (e nada grava) se as partições não correspondiam ao estado
+        anterior da planilha ou se alguma leitura não foi encontrada.
+        """
+        if self.manifest is None or tuple(self.manifest.get('assinatura') or ()) != tuple(signature_before or ()):
+            return False
+
+        by_month = {}
+        for update in updates:
+            by_month.setdefault(month_key(update['DateTime']), []).append(update)
+        try:
+            parts = {key: storage.apply_cell_updates(self.read(key), month_updates)
+                     for key, month_updates in by_month.items()
+                     if key in self.manifest['particoes']}
+        except KeyError:
+            return False
+        if len(parts) != len(by_month):
+            return False
+
+        for key, part in parts.items():
+            self._write_partition(key, part)
+        self.manifest['assinatura'] = list(signature_after or ())
+        self._save_manifest()
+        return True
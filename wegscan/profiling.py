@@ -0,0 +1,276 @@
+"""
+Módulo de medição de desempenho
+Intervalos de tempo (spans) em torno das fases do dashboard e do núcleo: carga,
+filtro, cada aba, cada gráfico, cada gravação e cada e-mail. As durações são
+agregadas em histogramas por nome, exibidas no painel "Desempenho" e
+exportadas para um arquivo local no formato texto do Prometheus ou em JSONL
+
+Desligado por padrão (PROFILING=1 nos secrets ou no ambiente liga). Desligado,
+span() devolve um contexto vazio compartilhado e timed() só repassa a chamada
+"""
+
+from bisect import bisect_left
+from contextlib import nullcontext
+from functools import wraps
+import json
+import logging
+import math
+import threading
+import time
+
+from wegscan.config import get_setting
+from wegscan.files import replace_atomically
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores (segundos) dos intervalos dos histogramas
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+# Intervalo mínimo (segundos) entre exportações automáticas do arquivo de métricas
+EXPORT_INTERVAL = 10.0
+
+# Span que envolve uma execução completa do script
+RERUN_SPAN = 'execucao'
+
+METRIC_NAME = 'wegscan_span_seconds'
+
+_NULL_SPAN = nullcontext()
+
+
+class Histogram:
+    """Histograma de durações com intervalos fixos (como o do Prometheus)"""
+
+    __slots__ = ('counts', 'count', 'total', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.minimum = min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+
+    def copy(self):
+        other = Histogram()
+        other.counts = list(self.counts)
+        other.count, other.total = self.count, self.total
+        other.minimum, other.maximum = self.minimum, self.maximum
+        return other
+
+    def quantile(self, q):
+        """Estimativa do quantil por interpolação dentro do intervalo (limitada ao mínimo e ao máximo)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for upper, count in zip(BUCKETS, self.counts):
+            if count and seen + count >= rank:
+                lower, upper = max(lower, self.minimum), min(upper, self.maximum)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return self.maximum
+
+    def to_dict(self):
+        return {
+            'n': self.count,
+            'soma': self.total,
+            'min': self.minimum if self.count else None,
+            'max': self.maximum,
+            'intervalos': dict(zip(('+Inf' if math.isinf(b) else repr(b) for b in BUCKETS), self.counts)),
+        }
+
+
+class Profiler:
+    """Histogramas por nome de span, compartilhados por todas as sessões do processo"""
+
+    def __init__(self, enabled=False, export_path=None):
+        self.enabled = enabled
+        self.export_path = export_path
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_export = 0.0
+
+    def observe(self, name, seconds):
+        """Registra uma duração no histograma do span e na execução em andamento da thread"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+        spans = getattr(self._local, 'spans', None)
+        if spans is not None:
+            spans.append((name, seconds, self._local.depth))
+
+    def span(self, name):
+        """Contexto que mede o bloco com o nome dado"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def start_rerun(self):
+        """Marca o início de uma execução do script na thread atual"""
+        if not self.enabled:
+            return
+        self._local.spans = []
+        self._local.depth = 0
+        self._local.started = time.perf_counter()
+
+    def finish_rerun(self):
+        """Encerra a execução da thread atual; retorna os spans dela (nome, segundos, nível)"""
+        spans = getattr(self._local, 'spans', None)
+        if not self.enabled or spans is None:
+            return []
+        self._local.spans = None
+        self.observe(RERUN_SPAN, time.perf_counter() - self._local.started)
+        self.maybe_export()
+        return spans
+
+    def snapshot(self):
+        """Cópia dos histogramas: nome -> Histogram"""
+        with self._lock:
+            return {name: histogram.copy() for name, histogram in self._histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def maybe_export(self):
+        """Exporta para o arquivo de métricas no máximo a cada EXPORT_INTERVAL segundos"""
+        if not self.export_path:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_export < EXPORT_INTERVAL:
+                return
+            self._last_export = now
+        try:
+            write_metrics(self.export_path, self.snapshot())
+        except OSError as e:
+            logger.warning("Erro ao exportar métricas para %s: %s", self.export_path, e)
+
+
+class _Span:
+    __slots__ = ('_profiler', '_name', '_start')
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        local = self._profiler._local
+        if getattr(local, 'spans', None) is not None:
+            local.depth += 1
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self._start
+        local = self._profiler._local
+        if getattr(local, 'spans', None) is not None:
+            local.depth -= 1
+        self._profiler.observe(self._name, elapsed)
+        return False
+
+
+def summary_rows(histograms):
+    """Uma linha por span com contagem, média, percentis estimados e máximo (ms)"""
+    def ms(seconds):
+        return round(seconds * 1000, 1) if seconds is not None else None
+
+    return [
+        {
+            'Span': name,
+            'Execuções': histogram.count,
+            'Média (ms)': ms(histogram.total / histogram.count),
+            'P50 (ms)': ms(histogram.quantile(0.5)),
+            'P95 (ms)': ms(histogram.quantile(0.95)),
+            'P99 (ms)': ms(histogram.quantile(0.99)),
+            'Máx (ms)': ms(histogram.maximum),
+            'Total (s)': round(histogram.total, 2),
+        }
+        for name, histogram in sorted(histograms.items(), key=lambda item: -item[1].total)
+        if histogram.count
+    ]
+
+
+def to_prometheus(histograms):
+    """Histogramas no formato texto de exposição do Prometheus"""
+    lines = [
+        f"# HELP {METRIC_NAME} Duração das fases do WEG SCAN Dashboard",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    for name, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for upper, count in zip(BUCKETS, histogram.counts):
+            cumulative += count
+            le = '+Inf' if math.isinf(upper) else repr(upper)
+            lines.append(f'{METRIC_NAME}_bucket{{span="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'{METRIC_NAME}_sum{{span="{name}"}} {histogram.total!r}')
+        lines.append(f'{METRIC_NAME}_count{{span="{name}"}} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
+
+def to_jsonl_line(histograms):
+    """Uma linha JSON com o instante e os histogramas"""
+    return json.dumps({
+        'timestamp': time.time(),
+        'spans': {name: histogram.to_dict() for name, histogram in sorted(histograms.items())},
+    }, ensure_ascii=False) + '\n'
+
+
+def write_metrics(path, histograms):
+    """Grava as métricas: .jsonl acrescenta uma linha; outros arquivos recebem o texto do Prometheus"""
+    if path.endswith('.jsonl'):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(to_jsonl_line(histograms))
+        return
+    text = to_prometheus(histograms)
+
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    # Substituição atômica: o coletor nunca lê um arquivo pela metade
+    replace_atomically(path, write)
+
+
+def _enabled_setting():
+    return str(get_setting('PROFILING', '0')).strip().lower() in ('1', 'true', 'sim', 'yes')
+
+
+_profiler = Profiler(enabled=_enabled_setting(), export_path=get_setting('PROFILING_FILE', None))
+
+
+def get_profiler():
+    """Retorna o medidor compartilhado do processo"""
+    return _profiler
+
+
+def enabled():
+    return _profiler.enabled
+
+
+def span(name):
+    """Contexto que mede o bloco (contexto vazio quando a medição está desligada)"""
+    return _profiler.span(name)
+
+
+def timed(name):
+    """Decorador que mede cada chamada da função com o span dado"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _profiler.enabled:
+                return func(*args, **kwargs)
+            with _Span(_profiler, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,207 @@
+"""
+Módulo de relatórios de gráficos
+Renderiza os gráficos de todos os equipamentos e variáveis por um único
+renderizador Kaleido de longa duração (várias abas em paralelo) e empacota
+o resultado em um ZIP de PNGs ou em um PDF, tudo em memória
+
+Uso pela linha de comando:
+    python -m wegscan.reports --saida relatorio_semanal.pdf --dias 7
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import BytesIO
+import os
+import re
+import threading
+import zipfile
+
+from wegscan.charts import build_trend_chart, has_chart_data
+from wegscan.measurements import ALERT_LIMITS, MEASURED_VARIABLES
+
+# Formatos de relatório suportados
+REPORT_FORMATS = {
+    'zip': {'label': 'ZIP (PNG)', 'mime': 'application/zip'},
+    'pdf': {'label': 'PDF', 'mime': 'application/pdf'},
+}
+
+# Dimensões das imagens exportadas
+IMAGE_WIDTH = 1200
+IMAGE_HEIGHT = 600
+
+# Abas do navegador (renderizações simultâneas) e threads de montagem de figuras
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class ChartRenderer:
+    """Renderizador Kaleido de longa duração com várias abas trabalhando em paralelo"""
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.workers = workers
+        self._loop = None
+        self._thread = None
+        self._kaleido = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._kaleido is not None
+
+    def start(self):
+        """Abre o navegador headless uma única vez, em um loop asyncio dedicado"""
+        with self._lock:
+            if self.running:
+                return
+            try:
+                import kaleido
+            except ImportError as e:
+                raise ImportError("Instale kaleido para exportar gráficos como imagem.") from e
+
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+            self._thread.start()
+
+            async def open_kaleido():
+                renderer = kaleido.Kaleido(n=self.workers)
+                await renderer.open()
+                return renderer
+
+            self._kaleido = asyncio.run_coroutine_threadsafe(open_kaleido(), self._loop).result()
+
+    def submit(self, fig, image_format='png', width=IMAGE_WIDTH, height=IMAGE_HEIGHT):
+        """Agenda a renderização de uma figura e retorna um Future com os bytes"""
+        self.start()
+        opts = {'format': image_format, 'width': width, 'height': height}
+        return asyncio.run_coroutine_threadsafe(self._kaleido.calc_fig(fig, opts=opts), self._loop)
+
+    def render(self, fig, image_format='png', width=IMAGE_WIDTH, height=IMAGE_HEIGHT):
+        """Renderiza uma figura e retorna os bytes da imagem"""
+        return self.submit(fig, image_format, width, height).result()
+
+    def close(self):
+        """Fecha o navegador e encerra o loop"""
+        with self._lock:
+            if not self.running:
+                return
+            asyncio.run_coroutine_threadsafe(self._kaleido.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._kaleido = None
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer():
+    """Retorna o renderizador compartilhado pelo processo"""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = ChartRenderer()
+        return _renderer
+
+
+def render_chart_image(fig, image_format='png', width=IMAGE_WIDTH, height=IMAGE_HEIGHT):
+    """Exporta um gráfico Plotly como imagem (bytes) pelo renderizador compartilhado"""
+    return get_renderer().render(fig, image_format, width, height)
+
+
+def build_report_figures(time_index, equipments, variables, start=None, end=None,
+                         limits=ALERT_LIMITS, workers=DEFAULT_WORKERS):
+    """Monta as figuras de todos os pares (equipamento, variável) com dados no período"""
+    pairs = []
+    for equipment in equipments:
+        df_equipment = time_index.slice(equipment, start, end)
+        for variable in variables:
+            if has_chart_data(df_equipment, variable):
+                pairs.append((equipment, variable, df_equipment))
+
+    def build(pair):
+        equipment, variable, df_equipment = pair
+        fig = build_trend_chart(df_equipment, equipment, variable, variable, limits)
+        return equipment, variable, fig.to_dict()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(build, pairs))
+
+
+def _report_filename(equipment, variable):
+    """Nome de arquivo seguro para o gráfico de um equipamento/variável"""
+    name = f"{equipment}_{variable}"
+    return re.sub(r'[^0-9A-Za-zÀ-ÿ_-]+', '_', name).strip('_') + '.png'
+
+
+def generate_report(time_index, equipments, variables, start=None, end=None,
+                    report_format='zip', limits=ALERT_LIMITS, renderer=None):
+    """Gera o relatório de gráficos em memória (ZIP de PNGs ou PDF com uma página por gráfico)"""
+    if report_format not in REPORT_FORMATS:
+        raise ValueError(f"Formato de relatório desconhecido: {report_format}")
+
+    renderer = renderer or get_renderer()
+    figures = build_report_figures(time_index, equipments, variables, start, end, limits, renderer.workers)
+
+    # Todas as figuras são enviadas de uma vez: as abas do renderizador trabalham em paralelo
+    futures = [renderer.submit(fig) for _, _, fig in figures]
+    images = [
+        (_report_filename(equipment, variable), future.result())
+        for (equipment, variable, _), future in zip(figures, futures)
+    ]
+
+    output = BytesIO()
+    if report_format == 'zip':
+        with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for filename, image in images:
+                archive.writestr(filename, image)
+    else:
+        from PIL import Image
+
+        pages = [Image.open(BytesIO(image)).convert('RGB') for _, image in images]
+        if not pages:
+            raise ValueError("Nenhum gráfico com dados no período selecionado.")
+        pages[0].save(output, format='PDF', save_all=True, append_images=pages[1:])
+
+    return output.getvalue()
+
+
+def main(argv=None):
+    """Gera o relatório de gráficos pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Gera o relatório de gráficos do WEG SCAN")
+    parser.add_argument('--saida', required=True, help="Arquivo de saída (.zip ou .pdf)")
+    parser.add_argument('--formato', choices=list(REPORT_FORMATS),
+                        help="Formato do relatório (padrão: extensão do arquivo de saída)")
+    parser.add_argument('--dias', type=int, help="Incluir apenas os últimos N dias (ex.: 7 para semanal)")
+    parser.add_argument('--equipamento', action='append', help="Equipamento a incluir (repetível)")
+    parser.add_argument('--variavel', action='append', choices=MEASURED_VARIABLES,
+                        help="Variável a incluir (repetível)")
+    args = parser.parse_args(argv)
+
+    from wegscan.data_index import TimeIndex
+    from wegscan.storage import load_readings
+
+    time_index = TimeIndex(load_readings())
+    start = datetime.now() - timedelta(days=args.dias) if args.dias else None
+    report_format = args.formato or ('pdf' if args.saida.lower().endswith('.pdf') else 'zip')
+
+    renderer = get_renderer()
+    try:
+        report = generate_report(
+            time_index,
+            args.equipamento or time_index.equipments,
+            args.variavel or MEASURED_VARIABLES,
+            start=start,
+            report_format=report_format,
+            renderer=renderer
+        )
+    finally:
+        renderer.close()
+
+    with open(args.saida, 'wb') as f:
+        f.write(report)
+    print(f"Relatório salvo em {args.saida} ({len(report)} bytes)")
+
+
+if __name__ == '__main__':
+    main()
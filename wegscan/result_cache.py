@@ -0,0 +1,46 @@
+"""
+Módulo de cache de resultados derivados
+Cache LRU simples, seguro entre threads, compartilhado por todas as sessões do processo
+"""
+
+from collections import OrderedDict
+import threading
+
+
+class ResultCache:
+    """Cache LRU de resultados indexados por (versão dos dados, filtro, ...)"""
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Retorna o valor em cache ou o default"""
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        """Armazena um valor, descartando os menos usados recentemente"""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Retorna o valor em cache ou calcula, armazena e retorna"""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Descarta todos os valores"""
+        with self._lock:
+            self._items.clear()
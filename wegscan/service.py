@@ -0,0 +1,157 @@
+"""
+Módulo do serviço de ingestão
+Recebe leituras por uma pasta de entrada ou por um endpoint HTTP local,
+independente do dashboard
+
+Uso:
+    python -m wegscan pasta entrada/            # monitora a pasta de entrada
+    python -m wegscan http --porta 8502         # endpoint POST /leituras
+    python -m wegscan arquivo leituras.csv      # ingere um arquivo e sai
+"""
+
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import os
+import shutil
+import time
+
+from wegscan.ingest import READING_FILE_EXTENSIONS, ingest_readings, read_readings_file
+
+logger = logging.getLogger(__name__)
+
+# Subpastas para onde os arquivos da pasta de entrada são movidos
+PROCESSED_DIR = 'processados'
+FAILED_DIR = 'erros'
+
+# Intervalo padrão (segundos) entre varreduras da pasta de entrada
+DEFAULT_POLL_INTERVAL = 5.0
+
+DEFAULT_HTTP_HOST = '127.0.0.1'
+DEFAULT_HTTP_PORT = 8502
+
+
+def _json_default(value):
+    """Serializa date/time dos registros como texto ISO"""
+    return value.isoformat()
+
+
+def ingest_file(path):
+    """Ingere todas as leituras de um arquivo e retorna o resultado"""
+    result = ingest_readings(read_readings_file(path))
+    logger.info("%s: %d registro(s), %d alerta(s)", path, len(result['registros']), len(result['alertas']))
+    return result
+
+
+def process_folder(folder):
+    """Ingere os arquivos pendentes da pasta e move cada um para processados/ ou erros/"""
+    processed = 0
+    names = sorted(
+        (name for name in os.listdir(folder) if name.lower().endswith(READING_FILE_EXTENSIONS)),
+        key=lambda name: os.path.getmtime(os.path.join(folder, name))
+    )
+    for name in names:
+        path = os.path.join(folder, name)
+        try:
+            ingest_file(path)
+            destination = PROCESSED_DIR
+            processed += 1
+        except Exception as e:
+            logger.error("Erro ao ingerir %s: %s", path, e)
+            destination = FAILED_DIR
+        os.makedirs(os.path.join(folder, destination), exist_ok=True)
+        shutil.move(path, os.path.join(folder, destination, name))
+    return processed
+
+
+def watch_folder(folder, interval=DEFAULT_POLL_INTERVAL):
+    """Monitora a pasta de entrada indefinidamente"""
+    os.makedirs(folder, exist_ok=True)
+    logger.info("Monitorando %s a cada %.1fs", folder, interval)
+    while True:
+        process_folder(folder)
+        time.sleep(interval)
+
+
+class ReadingsHandler(BaseHTTPRequestHandler):
+    """Endpoint HTTP local: POST /leituras com um objeto ou uma lista de leituras"""
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/saude':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'erro': 'Rota não encontrada'})
+
+    def do_POST(self):
+        if self.path != '/leituras':
+            self._send_json(404, {'erro': 'Rota não encontrada'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'null')
+            readings = payload if isinstance(payload, list) else [payload]
+            result = ingest_readings(readings, usuario=self.headers.get('X-Usuario', 'Serviço HTTP'))
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {'erro': str(e)})
+            return
+        except Exception as e:
+            logger.exception("Erro ao ingerir leituras")
+            self._send_json(500, {'erro': str(e)})
+            return
+
+        self._send_json(200, result)
+
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+def serve_http(host=DEFAULT_HTTP_HOST, port=DEFAULT_HTTP_PORT):
+    """Atende o endpoint HTTP local de ingestão indefinidamente"""
+    server = ThreadingHTTPServer((host, port), ReadingsHandler)
+    logger.info("Recebendo leituras em http://%s:%d/leituras", host, port)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    """Ponto de entrada do serviço (python -m wegscan)"""
+    parser = argparse.ArgumentParser(prog='python -m wegscan', description="Serviço de ingestão do WEG SCAN")
+    commands = parser.add_subparsers(dest='comando', required=True)
+
+    folder_parser = commands.add_parser('pasta', help="Monitora uma pasta de entrada (CSV/JSON)")
+    folder_parser.add_argument('pasta', help="Pasta de entrada")
+    folder_parser.add_argument('--intervalo', type=float, default=DEFAULT_POLL_INTERVAL,
+                               help="Segundos entre varreduras")
+    folder_parser.add_argument('--uma-vez', action='store_true', help="Processa os arquivos pendentes e sai")
+
+    http_parser = commands.add_parser('http', help="Endpoint HTTP local POST /leituras")
+    http_parser.add_argument('--host', default=DEFAULT_HTTP_HOST)
+    http_parser.add_argument('--porta', type=int, default=DEFAULT_HTTP_PORT)
+
+    file_parser = commands.add_parser('arquivo', help="Ingere um arquivo de leituras e sai")
+    file_parser.add_argument('arquivo')
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    if args.comando == 'pasta':
+        if args.uma_vez:
+            process_folder(args.pasta)
+        else:
+            watch_folder(args.pasta, args.intervalo)
+    elif args.comando == 'http':
+        serve_http(args.host, args.porta)
+    else:
+        ingest_file(args.arquivo)
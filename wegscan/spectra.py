@@ -0,0 +1,131 @@
+"""
+Módulo de análise espectral das formas de onda
+Espectro de amplitude, espectro do envelope (demodulação para falhas de
+rolamento) e energia por faixa de frequência, calculados em lote com NumPy:
+capturas com o mesmo tamanho e a mesma taxa de amostragem são empilhadas em
+uma matriz e transformadas com uma única FFT
+"""
+
+import numpy as np
+
+# Faixas de frequência (Hz) usadas na energia por faixa
+# (fim None: até a frequência de Nyquist da captura)
+BANDS = [
+    ('até 10 Hz', 0.0, 10.0),          # folgas, roçamento, fenômenos subsíncronos
+    ('10-100 Hz', 10.0, 100.0),        # desbalanceamento, desalinhamento (1x, 2x, 3x da rotação)
+    ('100-1000 Hz', 100.0, 1000.0),    # harmônicas, passagem de pás, engrenamento
+    ('1-5 kHz', 1000.0, 5000.0),       # defeitos de rolamento, ressonâncias estruturais
+    ('acima de 5 kHz', 5000.0, None),  # impactos de rolamento em estágio inicial, lubrificação
+]
+
+# Faixa padrão (Hz) filtrada antes do envelope, limitada pela taxa de amostragem
+ENVELOPE_BAND = (1000.0, 10000.0)
+
+
+def _window(n):
+    return np.hanning(n).astype(np.float32)
+
+
+def _groups(signals, sample_rates):
+    """Índices das capturas agrupados por (tamanho, taxa de amostragem)"""
+    groups = {}
+    for i, (signal, rate) in enumerate(zip(signals, sample_rates)):
+        groups.setdefault((len(signal), float(rate)), []).append(i)
+    return groups
+
+
+def _stack(signals, indexes):
+    """Empilha as capturas de um grupo sem a componente contínua"""
+    batch = np.stack([np.asarray(signals[i], dtype=np.float32) for i in indexes])
+    return batch - batch.mean(axis=1, keepdims=True)
+
+
+def amplitude_spectrum(batch, sample_rate):
+    """Espectro de amplitude de um lote (n capturas x amostras); retorna (frequências, amplitudes)"""
+    n = batch.shape[1]
+    window = _window(n)
+    spectrum = np.fft.rfft(batch * window, axis=1)
+    # Amplitude de pico de uma senoide, corrigida pelo ganho da janela
+    amplitudes = np.abs(spectrum) * (2.0 / window.sum())
+    amplitudes[:, 0] /= 2.0
+    return np.fft.rfftfreq(n, 1.0 / sample_rate), amplitudes
+
+
+def power_spectrum(batch, sample_rate):
+    """Potência por raia de um lote; a soma das raias é o valor quadrático médio do sinal"""
+    n = batch.shape[1]
+    window = _window(n)
+    spectrum = np.fft.rfft(batch * window, axis=1)
+    power = (np.abs(spectrum) ** 2) * (2.0 / (n * np.square(window).sum()))
+    power[:, 0] /= 2.0
+    if n % 2 == 0:
+        power[:, -1] /= 2.0
+    return np.fft.rfftfreq(n, 1.0 / sample_rate), power
+
+
+def envelope_band(sample_rate, band=ENVELOPE_BAND):
+    """Faixa do envelope ajustada à taxa de amostragem (abaixo de Nyquist)"""
+    nyquist = sample_rate / 2.0
+    low, high = band
+    high = min(high, 0.9 * nyquist)
+    if low >= high:
+        low, high = nyquist / 8.0, 0.9 * nyquist
+    return low, high
+
+
+def envelope_spectrum(batch, sample_rate, band=ENVELOPE_BAND):
+    """Espectro do envelope de um lote: filtra a faixa, demodula (sinal analítico) e transforma"""
+    n = batch.shape[1]
+    low, high = envelope_band(sample_rate, band)
+    freqs = np.fft.fftfreq(n, 1.0 / sample_rate)
+    # Filtro passa-faixa e transformada de Hilbert no mesmo passo: só as frequências
+    # positivas da faixa, em dobro, formam o sinal analítico filtrado
+    gain = np.where((freqs >= low) & (freqs <= high), 2.0, 0.0)
+    analytic = np.fft.ifft(np.fft.fft(batch, axis=1) * gain, axis=1)
+    envelope = np.abs(analytic).astype(np.float32)
+    envelope -= envelope.mean(axis=1, keepdims=True)
+    return amplitude_spectrum(envelope, sample_rate)
+
+
+def band_energies(freqs, power, bands=BANDS):
+    """Soma da potência de cada faixa: matriz (capturas x faixas)"""
+    energies = np.zeros((power.shape[0], len(bands)), dtype=np.float64)
+    for j, (_, low, high) in enumerate(bands):
+        mask = (freqs >= low) & (freqs < (high if high is not None else np.inf))
+        energies[:, j] = power[:, mask].sum(axis=1)
+    return energies
+
+
+def batch_features(signals, sample_rates, bands=BANDS, band=ENVELOPE_BAND):
+    """Indicadores de muitas capturas de uma vez
+
+    Retorna uma lista (na ordem das capturas) de dicionários com RMS, pico, fator
+    de crista, frequência dominante, frequência dominante do envelope e energia
+    por faixa.
+    """
+    features = [None] * len(signals)
+    for (n, rate), indexes in _groups(signals, sample_rates).items():
+        if n < 2:
+            continue
+        batch = _stack(signals, indexes)
+        rms = np.sqrt(np.mean(np.square(batch), axis=1))
+        peak = np.max(np.abs(batch), axis=1)
+        freqs, amplitudes = amplitude_spectrum(batch, rate)
+        _, power = power_spectrum(batch, rate)
+        energies = band_energies(freqs, power, bands)
+        env_freqs, env_amplitudes = envelope_spectrum(batch, rate, band)
+
+        # Frequência dominante ignorando a componente contínua
+        dominant = freqs[1 + np.argmax(amplitudes[:, 1:], axis=1)]
+        env_dominant = env_freqs[1 + np.argmax(env_amplitudes[:, 1:], axis=1)]
+
+        for row, i in enumerate(indexes):
+            features[i] = {
+                'RMS': float(rms[row]),
+                'Pico': float(peak[row]),
+                'Fator de Crista': float(peak[row] / rms[row]) if rms[row] > 0 else float('nan'),
+                'Frequência Dominante (Hz)': float(dominant[row]),
+                'Envelope Dominante (Hz)': float(env_dominant[row]),
+                **{name: float(energies[row, j]) for j, (name, _, _) in enumerate(bands)},
+            }
+    return features
@@ -0,0 +1,183 @@
+"""
+Módulo de serviços locais substitutos
+Servidor HTTP local no lugar da API do GitHub Gist e servidor SMTP falso no
+lugar do smtplib, para exercitar os caminhos de sincronização e de alertas
+sem acesso à rede (teste de carga e verificações manuais)
+
+O substituto do Gist segue o comportamento da API usado por wegscan.gist_sync:
+ETag / If-None-Match, conteúdo truncado acima de um limite (lido pelo raw_url)
+e PATCH com arquivos removidos (valor null)
+"""
+
+from contextlib import contextmanager
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+
+# Conteúdo inline acima deste tamanho (bytes) vem truncado, como na API real
+TRUNCATE_BYTES = 1024 * 1024
+
+
+class _GistHandler(BaseHTTPRequestHandler):
+    """Atende GET/PATCH do Gist e GET dos raw_url"""
+
+    def _send(self, status, body=b'', etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server.standin
+        server.record('GET', self.path)
+        if self.path.startswith('/raw/'):
+            content = server.files.get(self.path.rsplit('/', 1)[-1])
+            if content is None:
+                self._send(404)
+            else:
+                self._send(200, content.encode('utf-8'))
+            return
+
+        body, etag = server.gist_body()
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, etag=etag)
+        else:
+            self._send(200, body, etag)
+
+    def do_PATCH(self):
+        server = self.server.standin
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        server.record('PATCH', self.path)
+        with server.lock:
+            for name, meta in (payload.get('files') or {}).items():
+                if meta is None:
+                    server.files.pop(name, None)
+                else:
+                    server.files[name] = meta.get('content', '')
+        body, etag = server.gist_body()
+        self._send(200, body, etag)
+
+    def log_message(self, *args):
+        pass
+
+
+class GistStandIn:
+    """API do Gist em memória servida em 127.0.0.1 (use como GIST_API_URL)"""
+
+    def __init__(self, gist_id='local', truncate_bytes=TRUNCATE_BYTES):
+        self.gist_id = gist_id
+        self.truncate_bytes = truncate_bytes
+        self.files = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        self._server = None
+
+    @property
+    def api_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def record(self, method, path):
+        with self.lock:
+            self.requests.append((method, path))
+
+    def gist_body(self):
+        """JSON do Gist e seu ETag"""
+        with self.lock:
+            files = {}
+            for name, content in self.files.items():
+                sha = hashlib.sha1(content.encode('utf-8')).hexdigest()
+                truncated = len(content) > self.truncate_bytes
+                files[name] = {
+                    'filename': name,
+                    'raw_url': f"{self.api_url}/raw/{sha}/{name}",
+                    'size': len(content),
+                    'truncated': truncated,
+                    'content': content[:self.truncate_bytes] if truncated else content,
+                }
+        body = json.dumps({'id': self.gist_id, 'files': files}).encode('utf-8')
+        return body, '"' + hashlib.sha1(body).hexdigest() + '"'
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _GistHandler)
+        self._server.daemon_threads = True
+        self._server.standin = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class SMTPStandIn:
+    """Substituto de smtplib.SMTP que só guarda as mensagens enviadas
+
+    latency simula o tempo de resposta do servidor em cada envio (segundos).
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.messages = []
+        self._lock = threading.Lock()
+
+    def connect(self, host, port=None, *args, **kwargs):
+        """Usado no lugar do construtor smtplib.SMTP(host, port)"""
+        return _SMTPConnection(self)
+
+    def deliver(self, msg):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.messages.append(msg)
+
+    @contextmanager
+    def installed(self):
+        """Substitui smtplib.SMTP enquanto o bloco executa"""
+        import smtplib
+
+        original = smtplib.SMTP
+        smtplib.SMTP = self.connect
+        try:
+            yield self
+        finally:
+            smtplib.SMTP = original
+
+
+class _SMTPConnection:
+    """Conexão falsa com a interface usada por wegscan.alerts.deliver_alert_email"""
+
+    def __init__(self, standin):
+        self._standin = standin
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def starttls(self, *args, **kwargs):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def send_message(self, msg, *args, **kwargs):
+        self._standin.deliver(msg)
+        return {}
+
+    def quit(self):
+        pass
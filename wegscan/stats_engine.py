@@ -0,0 +1,135 @@
+"""
+Módulo de estatísticas por equipamento
+Calcula todos os agregados em uma única passada groupby e mantém um cache
+por (versão dos dados, filtro) compartilhado pela interface e pelas exportações
+"""
+
+import numpy as np
+import pandas as pd
+
+from wegscan.result_cache import ResultCache
+
+# Percentis calculados para todas as variáveis
+PERCENTILES = {
+    'P5': 0.05,
+    'Mediana': 0.50,
+    'P95': 0.95,
+}
+
+# Agregados simples do pandas e seus rótulos na interface
+BASE_AGGREGATES = {
+    'count': 'Leituras',
+    'mean': 'Média',
+    'max': 'Máximo',
+    'min': 'Mínimo',
+    'std': 'Desvio Padrão',
+    'last': 'Última Leitura',
+}
+
+# Métricas extras de vibração
+VIBRATION_PREFIX = 'VIBRAÇÃO'
+
+# Coluna com o total de registros por equipamento
+RECORDS_COLUMN = ('Geral', 'Registros')
+
+_cache = ResultCache(maxsize=32)
+
+
+def is_vibration(variable):
+    """Indica se a variável é uma medição de vibração"""
+    return variable.startswith(VIBRATION_PREFIX)
+
+
+def compute_statistics(df, variables):
+    """Calcula as estatísticas de todas as variáveis por equipamento em uma passada
+
+    O DataFrame deve estar ordenado por DateTime dentro de cada equipamento
+    (como as consultas do TimeIndex) para que 'Última Leitura' seja a mais recente.
+    Retorna um DataFrame indexado por EQUIPAMENTO com colunas (variável, estatística).
+    """
+    variables = [var for var in variables if var in df.columns]
+    grouped = df.groupby('EQUIPAMENTO', sort=True)
+
+    parts = {}
+    if variables:
+        values = grouped[variables]
+        aggregated = values.agg(list(BASE_AGGREGATES))
+        for func, label in BASE_AGGREGATES.items():
+            parts[label] = aggregated.xs(func, axis=1, level=1)
+
+        quantiles = values.quantile(list(PERCENTILES.values()))
+        for label, q in PERCENTILES.items():
+            parts[label] = quantiles.xs(q, level=1)
+
+        vibration = [var for var in variables if is_vibration(var)]
+        if vibration:
+            squares = df[vibration].pow(2).groupby(df['EQUIPAMENTO'], sort=True).mean()
+            parts['RMS'] = np.sqrt(squares)
+            parts['Pico a Pico'] = parts['Máximo'][vibration] - parts['Mínimo'][vibration]
+
+    stats = pd.concat(parts, axis=1) if parts else pd.DataFrame(index=grouped.size().index)
+    if parts:
+        stats = stats.swaplevel(axis=1)
+    stats[RECORDS_COLUMN] = grouped.size()
+    return stats
+
+
+def update_statistics(previous, df, variables, equipments):
+    """Estatísticas de df recalculando só os equipamentos alterados
+
+    previous são as estatísticas do mesmo filtro em uma versão anterior, em que
+    as leituras dos demais equipamentos eram as mesmas.
+    """
+    changed = df[df['EQUIPAMENTO'].isin(equipments)]
+    fresh = compute_statistics(changed, variables)
+    kept = previous.drop(index=list(equipments), errors='ignore')
+    if fresh.empty:
+        return kept
+    return pd.concat([kept, fresh.reindex(columns=previous.columns)]).sort_index()
+
+
+def get_statistics(df, variables, key, base=None):
+    """Retorna as estatísticas em cache para a chave (versão dos dados, filtro)
+
+    base=(chave anterior, equipamentos alterados desde ela): se as estatísticas
+    da chave anterior estão em cache, só os equipamentos alterados são recalculados.
+    """
+    def compute():
+        previous = _cache.get((base[0], tuple(variables))) if base is not None and base[1] is not None else None
+        if previous is not None:
+            return update_statistics(previous, df, variables, base[1])
+        return compute_statistics(df, variables)
+
+    return _cache.get_or_compute((key, tuple(variables)), compute)
+
+
+def clear_statistics_cache():
+    """Descarta todas as estatísticas em cache"""
+    _cache.clear()
+
+
+def variable_statistics(stats, equipment, variable):
+    """Retorna o dicionário de estatísticas de um equipamento/variável ou None"""
+    if equipment not in stats.index or variable not in stats.columns.get_level_values(0):
+        return None
+
+    row = stats.loc[equipment, variable]
+    if row['Leituras'] == 0:
+        return None
+
+    return row.to_dict()
+
+
+def summary_table(stats, variables, aggregate='Média'):
+    """Monta a tabela de resumo por equipamento (uma coluna por variável)"""
+    summary = pd.DataFrame({
+        'Equipamento': stats.index,
+        'Registros': stats[RECORDS_COLUMN].to_numpy(),
+    })
+    available = stats.columns.get_level_values(0)
+    for var in variables:
+        if var in available:
+            summary[f'{var} ({aggregate})'] = stats[(var, aggregate)].to_numpy()
+        else:
+            summary[f'{var} ({aggregate})'] = np.nan
+    return summary
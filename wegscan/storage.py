@@ -0,0 +1,262 @@
+"""
+Módulo de persistência das leituras no Excel
+Lê e acrescenta leituras no arquivo DADOSWEGSCAN.xlsx preservando o layout
+da planilha (cabeçalho na linha 2, células de DATA mescladas e demais abas)
+"""
+
+from datetime import date, datetime, time
+import math
+import os
+
+import pandas as pd
+
+from wegscan.config import EXCEL_FILE
+from wegscan.files import replace_atomically
+from wegscan.measurements import MEASURED_VARIABLES
+from wegscan.profiling import timed
+
+SHEET_NAME = 'Planilha1'
+
+# Linha (1-indexada) do cabeçalho na planilha principal
+HEADER_ROW = 2
+
+# Colunas gravadas para cada leitura
+RECORD_COLUMNS = ['DATA', 'HORÁRIO', 'EQUIPAMENTO'] + MEASURED_VARIABLES
+
+# Formatos de célula usados pela planilha original
+DATE_FORMAT = 'mm-dd-yy'
+TIME_FORMAT = 'h:mm'
+
+
+@timed('carga.planilha')
+def load_readings(path=EXCEL_FILE):
+    """Carrega as leituras da planilha principal com a coluna DateTime combinada"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Arquivo {path} nao encontrado!")
+
+    df = pd.read_excel(path, sheet_name=SHEET_NAME, header=HEADER_ROW - 1)
+
+    # Remover coluna sem nome (indice) e linhas vazias
+    df = df.drop(columns=['Unnamed: 0'], errors='ignore')
+    df = df.dropna(how='all')
+
+    # DATA fica em células mescladas: só a primeira linha de cada grupo tem valor
+    df['DATA'] = pd.to_datetime(df['DATA'], errors='coerce').ffill()
+    df = df.dropna(subset=['DATA'])
+    df['DATA'] = df['DATA'].dt.date
+
+    if 'HORÁRIO' in df.columns:
+        df['HORÁRIO'] = df['HORÁRIO'].astype(str)
+
+    # Converter colunas numéricas
+    for col in MEASURED_VARIABLES:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    # Adicionar coluna CORRENTE ELÉTRICA se nao existir
+    if 'CORRENTE ELÉTRICA (A)' not in df.columns:
+        df['CORRENTE ELÉTRICA (A)'] = 0.0
+
+    # Criar coluna DateTime combinando DATA e HORÁRIO
+    df['DateTime'] = pd.to_datetime(
+        df['DATA'].astype(str) + ' ' + df['HORÁRIO'].astype(str),
+        errors='coerce'
+    )
+    df = df.dropna(subset=['DateTime'])
+
+    return df.sort_values('DateTime', kind='stable').reset_index(drop=True)
+
+
+def _load_workbook(path):
+    """Abre a planilha para edição; openpyxl só é importado na primeira gravação"""
+    import openpyxl
+
+    return openpyxl.load_workbook(path)
+
+
+def _header_columns(ws):
+    """Mapeia nome da coluna -> índice, criando cabeçalhos de medição ausentes"""
+    columns = {}
+    last_column = 1
+    for cell in ws[HEADER_ROW]:
+        if cell.value is not None:
+            columns[str(cell.value).strip()] = cell.column
+            last_column = max(last_column, cell.column)
+
+    for name in RECORD_COLUMNS:
+        if name not in columns:
+            last_column += 1
+            ws.cell(row=HEADER_ROW, column=last_column, value=name)
+            columns[name] = last_column
+
+    return {name: columns[name] for name in RECORD_COLUMNS}
+
+
+def _last_data_row(ws, columns):
+    """Última linha com algum valor nas colunas de leitura"""
+    for row in range(ws.max_row, HEADER_ROW, -1):
+        if any(ws.cell(row=row, column=col).value is not None for col in columns):
+            return row
+    return HEADER_ROW
+
+
+def _cell_value(name, value):
+    """Converte o valor da leitura para o tipo gravado na célula"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if name == 'DATA' and isinstance(value, date) and not isinstance(value, datetime):
+        return datetime.combine(value, time())
+    if name == 'HORÁRIO' and isinstance(value, str):
+        return time.fromisoformat(value)
+    return value
+
+
+def _write_record(ws, row, columns, record):
+    """Grava um registro em uma linha, com os formatos de data/hora da planilha"""
+    for name, col in columns.items():
+        value = _cell_value(name, record.get(name))
+        if value is None:
+            continue
+        cell = ws.cell(row=row, column=col, value=value)
+        if name == 'DATA':
+            cell.number_format = DATE_FORMAT
+        elif name == 'HORÁRIO':
+            cell.number_format = TIME_FORMAT
+
+
+@timed('gravacao.planilha')
+def append_readings(records, path=EXCEL_FILE):
+    """Acrescenta leituras ao final da planilha principal em uma única gravação
+
+    Cada registro é um dicionário com DATA (date), HORÁRIO (time), EQUIPAMENTO e
+    as variáveis medidas. Retorna as linhas da planilha onde os registros foram gravados.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Arquivo {path} nao encontrado!")
+
+    workbook = _load_workbook(path)
+    ws = workbook[SHEET_NAME]
+    columns = _header_columns(ws)
+
+    first_row = _last_data_row(ws, columns.values()) + 1
+    for offset, record in enumerate(records):
+        _write_record(ws, first_row + offset, columns, record)
+
+    replace_atomically(path, workbook.save)
+    return list(range(first_row, first_row + len(records)))
+
+
+def _same_value(current, expected):
+    """Compara o valor da célula com o valor anterior esperado (vazio e NaN são iguais)"""
+    missing = current is None or (isinstance(current, float) and math.isnan(current))
+    if expected is None or (isinstance(expected, float) and math.isnan(expected)):
+        return missing
+    if missing:
+        return False
+    try:
+        return math.isclose(float(current), float(expected), rel_tol=1e-9, abs_tol=1e-9)
+    except (TypeError, ValueError):
+        return False
+
+
+def _row_moment(data, horario):
+    """Instante de uma linha da planilha, combinado como em load_readings"""
+    if data is None or horario is None:
+        return None
+    if isinstance(data, datetime):
+        data = data.date()
+    if isinstance(horario, datetime):
+        horario = horario.time()
+    moment = pd.to_datetime(f"{data} {horario}", errors='coerce')
+    return None if pd.isna(moment) else moment
+
+
+def _update_key(update):
+    return str(update['EQUIPAMENTO']).strip(), pd.Timestamp(update['DateTime'])
+
+
+@timed('gravacao.celulas')
+def update_cells(updates, path=EXCEL_FILE):
+    """Grava alterações de medições em leituras existentes, só nas células alteradas
+
+    Cada alteração é um dicionário com EQUIPAMENTO, DateTime, variavel,
+    valor_anterior e novo_valor. A leitura é localizada por (EQUIPAMENTO, DateTime)
+    e a célula precisa ainda ter o valor anterior; senão nada é gravado e
+    ValueError é lançado (alteração feita sobre dados desatualizados).
+    Retorna as linhas da planilha alteradas, na ordem das alterações.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Arquivo {path} nao encontrado!")
+
+    workbook = _load_workbook(path)
+    ws = workbook[SHEET_NAME]
+    columns = _header_columns(ws)
+
+    # Linhas de cada leitura procurada, em uma única passada (DATA mesclada vale para as linhas seguintes)
+    wanted = {_update_key(update) for update in updates}
+    candidates = {}
+    current_date = None
+    for number in range(HEADER_ROW + 1, ws.max_row + 1):
+        data = ws.cell(row=number, column=columns['DATA']).value
+        if data is not None:
+            current_date = data
+        equipment = ws.cell(row=number, column=columns['EQUIPAMENTO']).value
+        if equipment is None:
+            continue
+        moment = _row_moment(current_date, ws.cell(row=number, column=columns['HORÁRIO']).value)
+        key = (str(equipment).strip(), moment)
+        if key in wanted:
+            candidates.setdefault(key, []).append(number)
+
+    rows = []
+    for update in updates:
+        variable = update['variavel']
+        if variable not in MEASURED_VARIABLES:
+            raise ValueError(f"Variável não editável: {variable}")
+        key = _update_key(update)
+        matches = [
+            number for number in candidates.get(key, [])
+            if _same_value(ws.cell(row=number, column=columns[variable]).value, update['valor_anterior'])
+        ]
+        if not matches:
+            raise ValueError(
+                f"Leitura de {key[0]} em {key[1]:%d/%m/%Y %H:%M} não encontrada com "
+                f"{variable} = {update['valor_anterior']} (alterada por outra sessão?)"
+            )
+        ws.cell(row=matches[0], column=columns[variable], value=_cell_value(variable, update['novo_valor']))
+        rows.append(matches[0])
+
+    replace_atomically(path, workbook.save)
+    return rows
+
+
+def apply_cell_updates(df, updates):
+    """Aplica alterações de células (como em update_cells) a um DataFrame de leituras; retorna a cópia alterada
+
+    Lança KeyError se alguma leitura não for encontrada com o valor anterior.
+    """
+    df = df.copy()
+    equipments = df['EQUIPAMENTO'].astype(str).str.strip().to_numpy()
+    times = df['DateTime'].to_numpy()
+    for update in updates:
+        equipment, moment = _update_key(update)
+        variable = update['variavel']
+        positions = ((equipments == equipment) & (times == moment.to_datetime64())).nonzero()[0]
+        column = df.columns.get_loc(variable)
+        matches = [
+            position for position in positions
+            if _same_value(df.iat[position, column], update['valor_anterior'])
+        ]
+        if not matches:
+            raise KeyError(f"{equipment} {moment} {variable}")
+        novo_valor = update['novo_valor']
+        df.iat[matches[0], column] = float('nan') if novo_valor is None else float(novo_valor)
+    return df
+
+
+def read_workbook_bytes(path=EXCEL_FILE):
+    """Retorna o conteúdo do arquivo Excel para download"""
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    return None
@@ -0,0 +1,128 @@
+"""
+Módulo de geração de frota sintética
+Gera leituras realistas (motores × leituras por dia × anos) e grava no mesmo
+layout do DADOSWEGSCAN.xlsx: cabeçalho na linha 2, coluna A vazia, DATA em
+células mescladas por dia, uma aba por equipamento e a aba GRÁFICOS.
+Usado pelos benchmarks e pelo teste de carga
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from wegscan.measurements import MEASURED_VARIABLES
+from wegscan.storage import DATE_FORMAT, HEADER_ROW, RECORD_COLUMNS, SHEET_NAME, TIME_FORMAT
+
+# Nível típico (média, desvio) de cada variável em operação normal
+BASELINES = {
+    'VIBRAÇÃO AXIAL(mm/s)': (2.0, 0.6),
+    'VIBRAÇÃO RADIAL-Y (mm/s)': (1.8, 0.5),
+    'VIBRAÇÃO RADIAL-X (mm/s)': (3.0, 1.2),
+    'TEMPERATURA(°C)': (50.0, 6.0),
+    'CORRENTE ELÉTRICA (A)': (45.0, 12.0),
+}
+
+# Fração de medições ausentes (sensor sem leitura)
+MISSING_RATE = 0.03
+
+DEFAULT_START = datetime(2023, 1, 2)
+
+
+def motor_names(motors):
+    """Nomes dos equipamentos no padrão da planilha original"""
+    prefixes = ['GARO', 'FB', 'B OLEO', 'MOTOR']
+    return [f"{prefixes[i % len(prefixes)]} {i + 1:04d}" for i in range(motors)]
+
+
+def generate_readings(motors=10, readings_per_day=4, years=1.0, start=DEFAULT_START, seed=0):
+    """Gera as leituras no formato de DataFrame do dashboard (com DateTime)"""
+    rng = np.random.default_rng(seed)
+    days = max(1, int(round(years * 365)))
+    hours = np.linspace(7, 19, readings_per_day).round().astype(int) if readings_per_day > 1 else np.array([13])
+    names = motor_names(motors)
+
+    moments = [
+        start + timedelta(days=day, hours=int(hour))
+        for day in range(days)
+        for hour in hours
+    ]
+    n = len(moments) * motors
+    df = pd.DataFrame({
+        'DateTime': np.repeat(np.array(moments, dtype='datetime64[us]'), motors),
+        'EQUIPAMENTO': np.tile(names, len(moments)),
+    })
+
+    # Desgaste lento por motor: parte dos equipamentos vai passando dos limites
+    wear = np.tile(rng.uniform(0, 1.5, motors), len(moments)) * np.linspace(0, 1, n)
+    for var in MEASURED_VARIABLES:
+        mean, std = BASELINES[var]
+        values = rng.normal(mean, std, n) + wear * std
+        values = np.abs(values).round(3)
+        values[rng.random(n) < MISSING_RATE] = np.nan
+        df[var] = values
+
+    df['DATA'] = df['DateTime'].dt.date
+    df['HORÁRIO'] = df['DateTime'].dt.strftime('%H:%M:%S')
+    return df[RECORD_COLUMNS + ['DateTime']]
+
+
+def write_workbook(df, path):
+    """Grava as leituras no layout do DADOSWEGSCAN.xlsx"""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path)
+    date_format = workbook.add_format({'num_format': DATE_FORMAT, 'valign': 'vcenter'})
+    time_format = workbook.add_format({'num_format': TIME_FORMAT})
+    header_format = workbook.add_format({'bold': True})
+
+    ws = workbook.add_worksheet(SHEET_NAME)
+    header = HEADER_ROW - 1
+    # Coluna A fica vazia, como na planilha original
+    for col, name in enumerate(RECORD_COLUMNS, start=1):
+        ws.write(header, col, name, header_format)
+
+    times = df['DateTime'].dt.time.to_numpy()
+    values = df[MEASURED_VARIABLES].to_numpy()
+    equipments = df['EQUIPAMENTO'].to_numpy()
+    first_row = header + 1
+    for offset in range(len(df)):
+        row = first_row + offset
+        ws.write_datetime(row, 2, times[offset], time_format)
+        ws.write_string(row, 3, equipments[offset])
+        for col, value in enumerate(values[offset], start=4):
+            if not np.isnan(value):
+                ws.write_number(row, col, value)
+
+    # DATA só na primeira linha de cada dia, com as células do dia mescladas
+    days = df['DATA'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    ends = np.r_[starts[1:], len(df)] - 1
+    for start, end in zip(starts, ends):
+        moment = datetime.combine(days[start], datetime.min.time())
+        if end > start:
+            ws.merge_range(first_row + start, 1, first_row + end, 1, moment, date_format)
+        else:
+            ws.write_datetime(first_row + start, 1, moment, date_format)
+
+    # Uma aba de resumo por equipamento e a aba de gráficos, como na original
+    for name in sorted(set(equipments)):
+        sheet = workbook.add_worksheet(name[:31])
+        sheet.write_row(0, 0, ['EQUIPAMENTO', name])
+    charts = workbook.add_worksheet('GRÁFICOS')
+    chart = workbook.add_chart({'type': 'line'})
+    last = first_row + min(len(df), 200) - 1
+    chart.add_series({
+        'name': MEASURED_VARIABLES[3],
+        'values': [SHEET_NAME, first_row, 7, last, 7],
+    })
+    charts.insert_chart('B2', chart)
+
+    workbook.close()
+
+
+def generate_fleet(path, motors=10, readings_per_day=4, years=1.0, seed=0):
+    """Gera a frota sintética e grava a planilha; retorna as leituras geradas"""
+    df = generate_readings(motors, readings_per_day, years, seed=seed)
+    write_workbook(df, path)
+    return df
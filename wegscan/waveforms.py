@@ -0,0 +1,306 @@
+"""
+Módulo de armazenamento das formas de onda de vibração
+Guarda as capturas brutas exportadas pelos sensores WEG Scan (aceleração ou
+velocidade) ligadas à leitura da planilha (EQUIPAMENTO + DateTime) e ao eixo
+medido. As amostras ficam em um único arquivo float32 só de acréscimo, lido
+por mapeamento de memória: abrir uma captura só toca as páginas dela. Os
+metadados (equipamento, instante, eixo, taxa, posição no arquivo) ficam em um
+índice JSON
+
+Uso:
+    python -m wegscan.waveforms importar captura.csv --equipamento "GARO 0001" \\
+        --momento "2025-04-10 07:00" --eixo AXIAL --taxa 25600
+    python -m wegscan.waveforms listar --equipamento "GARO 0001"
+    python -m wegscan.waveforms bandas                       # energia por faixa de todas as capturas
+"""
+
+import argparse
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from wegscan.config import WAVEFORMS_DIR
+from wegscan.data_index import next_data_version
+from wegscan.files import read_json, write_json
+from wegscan.profiling import timed
+from wegscan.result_cache import ResultCache
+
+SAMPLES_FILE = 'amostras.f32'
+INDEX_FILE = 'indice.json'
+
+# Tipo das amostras em disco (float32 little-endian)
+SAMPLE_DTYPE = np.dtype('<f4')
+
+# Eixo da captura -> coluna da leitura escalar correspondente
+AXES = {
+    'AXIAL': 'VIBRAÇÃO AXIAL(mm/s)',
+    'RADIAL-Y': 'VIBRAÇÃO RADIAL-Y (mm/s)',
+    'RADIAL-X': 'VIBRAÇÃO RADIAL-X (mm/s)',
+}
+
+# Grandeza medida -> unidade padrão
+KINDS = {'aceleracao': 'g', 'velocidade': 'mm/s'}
+
+# Tamanho mínimo de uma captura (amostras)
+MIN_SAMPLES = 64
+
+# Indicadores por equipamento e espectros de capturas mantidos para as sessões
+_features = ResultCache(maxsize=16)
+_spectra = ResultCache(maxsize=8)
+
+# Colunas do índice em forma de tabela
+INDEX_COLUMNS = ['id', 'EQUIPAMENTO', 'DateTime', 'eixo', 'tipo', 'unidade', 'taxa', 'amostras', 'inicio']
+
+
+def _moment(value):
+    """Instante da leitura no formato do índice (ISO, precisão de segundos)"""
+    return pd.Timestamp(value).floor('s').isoformat()
+
+
+def read_capture_file(source, sample_rate=None, name=None):
+    """Lê uma captura de um arquivo .npy ou CSV/TXT; retorna (amostras, taxa de amostragem)
+
+    source é um caminho ou um arquivo aberto (name informa a extensão). O CSV pode
+    ter uma coluna (amostras) ou duas (tempo em segundos, amostra); com duas
+    colunas a taxa é deduzida do tempo quando não for informada.
+    """
+    name = name or (source if isinstance(source, str) else '')
+    if name.lower().endswith('.npy'):
+        samples = np.load(source)
+        times = None
+    else:
+        table = pd.read_csv(source, sep=None, engine='python', header=None)
+        # Cabeçalho textual opcional
+        table = table.apply(pd.to_numeric, errors='coerce').dropna(how='all')
+        if table.shape[1] >= 2:
+            times, samples = table.iloc[:, 0].to_numpy(float), table.iloc[:, 1].to_numpy(float)
+        else:
+            times, samples = None, table.iloc[:, 0].to_numpy(float)
+
+    if sample_rate is None:
+        if times is None or len(times) < 2:
+            raise ValueError("Informe a taxa de amostragem (--taxa) para capturas sem coluna de tempo")
+        sample_rate = 1.0 / float(np.median(np.diff(times)))
+    return np.asarray(samples, dtype=np.float32).ravel(), float(sample_rate)
+
+
+class WaveformStore:
+    """Capturas de forma de onda em um diretório, compartilhadas pelas sessões do processo"""
+
+    def __init__(self, directory=WAVEFORMS_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._entries = None
+        self._by_id = {}
+        self._index_signature = None
+        self._memmap = None
+        self._version = 0
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _signature(self):
+        try:
+            stat = os.stat(self._path(INDEX_FILE))
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self):
+        """Relê o índice se ele mudou (capturas importadas por outro processo)"""
+        signature = self._signature()
+        if self._entries is not None and signature == self._index_signature:
+            return
+        self._entries = read_json(self._path(INDEX_FILE), [])
+        self._by_id = {entry['id']: entry for entry in self._entries}
+        self._index_signature = signature
+        self._memmap = None
+        self._version = next_data_version()
+
+    @property
+    def version(self):
+        """Versão do conjunto de capturas (muda a cada importação); usada como chave de cache"""
+        with self._lock:
+            self._refresh()
+            return self._version
+
+    def add(self, equipment, moment, axis, samples, sample_rate, kind='aceleracao', unit=None):
+        """Acrescenta uma captura ligada à leitura (equipamento, instante); retorna o id"""
+        if axis not in AXES:
+            raise ValueError(f"Eixo inválido: {axis} (use {', '.join(AXES)})")
+        if kind not in KINDS:
+            raise ValueError(f"Tipo inválido: {kind} (use {', '.join(KINDS)})")
+        samples = np.asarray(samples, dtype=SAMPLE_DTYPE).ravel()
+        if len(samples) < MIN_SAMPLES:
+            raise ValueError(f"Captura com {len(samples)} amostras (mínimo {MIN_SAMPLES})")
+        if not np.isfinite(samples).all():
+            raise ValueError("Captura com amostras inválidas (NaN ou infinito)")
+        if not sample_rate or sample_rate <= 0:
+            raise ValueError("Taxa de amostragem deve ser positiva")
+
+        with self._lock:
+            self._refresh()
+            os.makedirs(self.directory, exist_ok=True)
+            # Amostras antes do índice: uma falha no meio deixa só bytes não referenciados
+            with open(self._path(SAMPLES_FILE), 'ab') as f:
+                start = f.tell() // SAMPLE_DTYPE.itemsize
+                f.write(samples.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            entry = {
+                'id': max((e['id'] for e in self._entries), default=0) + 1,
+                'EQUIPAMENTO': str(equipment).strip(),
+                'DateTime': _moment(moment),
+                'eixo': axis,
+                'tipo': kind,
+                'unidade': unit or KINDS[kind],
+                'taxa': float(sample_rate),
+                'amostras': int(len(samples)),
+                'inicio': int(start),
+            }
+            write_json(self._path(INDEX_FILE), self._entries + [entry])
+            self._entries = None
+            self._refresh()
+            return entry['id']
+
+    def captures(self, equipment=None):
+        """Metadados das capturas (sem amostras), opcionalmente de um equipamento"""
+        with self._lock:
+            self._refresh()
+            entries = self._entries
+        table = pd.DataFrame(entries, columns=INDEX_COLUMNS)
+        if equipment is not None:
+            table = table[table['EQUIPAMENTO'] == equipment]
+        table['DateTime'] = pd.to_datetime(table['DateTime'])
+        return table.sort_values(['DateTime', 'eixo']).reset_index(drop=True)
+
+    def captures_for_reading(self, equipment, moment):
+        """Capturas ligadas a uma leitura da planilha"""
+        table = self.captures(equipment)
+        return table[table['DateTime'] == pd.Timestamp(_moment(moment))].reset_index(drop=True)
+
+    def entry(self, capture_id):
+        with self._lock:
+            self._refresh()
+            return self._by_id[capture_id]
+
+    def _samples_map(self):
+        if self._memmap is None:
+            self._memmap = np.memmap(self._path(SAMPLES_FILE), dtype=SAMPLE_DTYPE, mode='r')
+        return self._memmap
+
+    @timed('formas_onda.leitura')
+    def samples(self, capture_id):
+        """Amostras de uma captura: visão somente leitura do arquivo mapeado em memória"""
+        with self._lock:
+            self._refresh()
+            entry = self._by_id[capture_id]
+            data = self._samples_map()
+        return data[entry['inicio']:entry['inicio'] + entry['amostras']]
+
+    def load_many(self, capture_ids):
+        """Amostras e taxas de várias capturas, para o processamento em lote"""
+        with self._lock:
+            self._refresh()
+            entries = [self._by_id[i] for i in capture_ids]
+            data = self._samples_map() if entries else None
+        return (
+            [data[e['inicio']:e['inicio'] + e['amostras']] for e in entries],
+            [e['taxa'] for e in entries],
+        )
+
+
+@timed('formas_onda.bandas')
+def capture_features(store, captures):
+    """Indicadores espectrais (spectra.batch_features) de uma tabela de capturas, em lote"""
+    from wegscan.spectra import batch_features
+
+    signals, rates = store.load_many(captures['id'].tolist())
+    rows = batch_features(signals, rates)
+    features = pd.DataFrame([row or {} for row in rows], index=captures.index)
+    return pd.concat([captures[['id', 'EQUIPAMENTO', 'DateTime', 'eixo', 'unidade']], features], axis=1)
+
+
+def cached_features(store, equipment):
+    """Indicadores das capturas do equipamento, calculados em lote uma vez por versão do armazenamento"""
+    captures = store.captures(equipment)
+    if captures.empty:
+        return captures
+    return _features.get_or_compute((store.version, equipment), lambda: capture_features(store, captures))
+
+
+def cached_spectrum(store, capture_id):
+    """Espectro e espectro do envelope de uma captura: (frequências, amplitudes, freq. envelope, amplitudes envelope)
+
+    Só as amostras desta captura são lidas do arquivo.
+    """
+    from wegscan.spectra import amplitude_spectrum, envelope_spectrum
+
+    def compute():
+        samples = np.asarray(store.samples(capture_id), dtype=np.float32)
+        batch = (samples - samples.mean())[np.newaxis, :]
+        rate = store.entry(capture_id)['taxa']
+        freqs, amplitudes = amplitude_spectrum(batch, rate)
+        env_freqs, env_amplitudes = envelope_spectrum(batch, rate)
+        return freqs, amplitudes[0], env_freqs, env_amplitudes[0]
+
+    return _spectra.get_or_compute((store.version, capture_id), compute)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_waveform_store():
+    """Retorna o armazenamento de formas de onda compartilhado do processo"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = WaveformStore()
+        return _store
+
+
+def main(argv=None):
+    """Ponto de entrada (python -m wegscan.waveforms)"""
+    parser = argparse.ArgumentParser(prog='python -m wegscan.waveforms',
+                                     description="Formas de onda de vibração do WEG SCAN")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    importar = sub.add_parser('importar', help="Importa uma captura (.csv, .txt ou .npy)")
+    importar.add_argument('arquivo')
+    importar.add_argument('--equipamento', required=True)
+    importar.add_argument('--momento', required=True, help="Data e hora da leitura (AAAA-MM-DD HH:MM)")
+    importar.add_argument('--eixo', required=True, choices=list(AXES))
+    importar.add_argument('--taxa', type=float, help="Taxa de amostragem (Hz)")
+    importar.add_argument('--tipo', default='aceleracao', choices=list(KINDS))
+    importar.add_argument('--unidade')
+
+    listar = sub.add_parser('listar', help="Lista as capturas")
+    listar.add_argument('--equipamento')
+
+    bandas = sub.add_parser('bandas', help="Indicadores e energia por faixa das capturas")
+    bandas.add_argument('--equipamento')
+    args = parser.parse_args(argv)
+
+    store = get_waveform_store()
+    if args.comando == 'importar':
+        samples, rate = read_capture_file(args.arquivo, args.taxa)
+        capture_id = store.add(args.equipamento, args.momento, args.eixo, samples, rate, args.tipo, args.unidade)
+        print(f"Captura {capture_id}: {len(samples)} amostras a {rate:g} Hz")
+        return 0
+
+    captures = store.captures(args.equipamento)
+    if captures.empty:
+        print("Nenhuma captura encontrada")
+        return 0
+    table = captures if args.comando == 'listar' else capture_features(store, captures)
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(table.drop(columns=['inicio'], errors='ignore').to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
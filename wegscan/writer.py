@@ -0,0 +1,270 @@
+"""
+Módulo do escritor único
+Todas as gravações do processo (leituras, correções de células, log de alterações e log de alertas)
+passam por uma fila atendida por uma única thread, que grava em lotes: uma
+abertura/gravação de cada arquivo por lote, qualquer que seja o número de sessões.
+Cada lote é gravado com um lock exclusivo entre processos (WRITE_LOCK_FILE), para
+que o dashboard e o serviço de ingestão não percam as gravações um do outro
+"""
+
+from concurrent.futures import Future
+import logging
+import queue
+import threading
+import time
+
+from wegscan import alerts, changelog, storage
+from wegscan.config import WRITE_LOCK_FILE
+from wegscan.dataset import file_signature, get_dataset
+from wegscan.files import exclusive_lock
+from wegscan.measurements import MEASURED_VARIABLES
+from wegscan.profiling import span
+
+logger = logging.getLogger(__name__)
+
+# Tempo máximo (segundos) que o primeiro pedido espera por outros no mesmo lote
+MAX_WAIT = 0.05
+
+# Quantidade máxima de pedidos gravados em um lote
+MAX_BATCH = 500
+
+# Tipos de pedido atendidos pelo escritor
+READINGS = 'leituras'
+CELL_UPDATES = 'celulas'
+CHANGE_LOG = 'alteracoes'
+ALERT_LOG = 'alertas'
+
+_STOP = object()
+
+
+class IngestWriter:
+    """Escritor único do processo com gravação em lote (group commit)"""
+
+    def __init__(self, max_wait=MAX_WAIT, max_batch=MAX_BATCH, lock_path=WRITE_LOCK_FILE):
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.lock_path = lock_path
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Inicia a thread de gravação na primeira submissão"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='wegscan-writer', daemon=True)
+                self._thread.start()
+
+    def _submit(self, kind, payload):
+        future = Future()
+        self._ensure_started()
+        self._queue.put((kind, payload, future))
+        return future
+
+    def submit_readings(self, records, usuario):
+        """Enfileira leituras normalizadas; o Future resolve com as linhas gravadas
+
+    Se as leituras foram gravadas mas o log de alterações falhou, o resultado
+    traz 'aviso_log'; o Future só falha quando as leituras não foram gravadas.
+    """
+        return self._submit(READINGS, (list(records), usuario))
+
+    def submit_cell_updates(self, updates, usuario):
+        """Enfileira alterações de células de leituras existentes (storage.update_cells)"""
+        return self._submit(CELL_UPDATES, (list(updates), usuario))
+
+    def submit_change_log(self, entries):
+        """Enfileira entradas do log de alterações"""
+        return self._submit(CHANGE_LOG, list(entries))
+
+    def submit_alert_log(self, entries):
+        """Enfileira registros de alertas enviados"""
+        return self._submit(ALERT_LOG, list(entries))
+
+    def _next_batch(self):
+        """Aguarda um pedido e junta os que chegarem até MAX_WAIT ou MAX_BATCH"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            stop = any(item is _STOP for item in batch)
+            jobs = [item for item in batch if item is not _STOP]
+            if jobs:
+                try:
+                    # Da leitura à gravação de cada arquivo nenhum outro processo grava
+                    with span('gravacao.lote'), exclusive_lock(self.lock_path):
+                        self._commit(jobs)
+                except Exception as e:
+                    logger.exception("Erro inesperado no escritor")
+                    for _, _, future in jobs:
+                        if not future.done():
+                            future.set_exception(e)
+            if stop:
+                return
+
+    def _commit(self, jobs):
+        """Grava um lote: uma transação por arquivo, resolvendo os Futures de cada pedido"""
+        readings = [job for job in jobs if job[0] == READINGS]
+        cell_jobs = [job for job in jobs if job[0] == CELL_UPDATES]
+        change_log_jobs = [job for job in jobs if job[0] == CHANGE_LOG]
+        alert_jobs = [job for job in jobs if job[0] == ALERT_LOG]
+
+        # Leituras de todas as sessões em uma única gravação da planilha
+        change_entries = []
+        completed = []
+        if readings:
+            records = [record for _, (job_records, _), _ in readings for record in job_records]
+            try:
+                signature = file_signature()
+                rows = storage.append_readings(records)
+            except Exception as e:
+                logger.error("Erro ao gravar lote de %d leitura(s): %s", len(records), e)
+                for _, _, future in readings:
+                    future.set_exception(e)
+                readings = []
+            else:
+                # Publicar antes de resolver, para que quem aguarda já veja as linhas novas
+                _publish(records, signature)
+                start = 0
+                for _, (job_records, usuario), future in readings:
+                    job_rows = rows[start:start + len(job_records)]
+                    start += len(job_records)
+                    change_entries.extend(_reading_change_entries(job_records, usuario))
+                    completed.append((future, {'linhas': job_rows, 'lote': len(records)}))
+
+        # Correções de todas as sessões em uma gravação; um pedido inválido não bloqueia os demais
+        if cell_jobs:
+            change_entries.extend(_commit_cell_updates(cell_jobs, completed))
+
+        for _, entries, _ in change_log_jobs:
+            change_entries.extend(entries)
+        log_error = None
+        if change_entries:
+            log_error = _resolve_all(change_log_jobs, changelog.append_change_log_entries, change_entries)
+
+        # Leituras e correções são resolvidas depois do log de alterações: já estão gravadas,
+        # então uma falha do log vira um aviso no resultado, não um erro (reenviar duplicaria)
+        for future, result in completed:
+            if log_error is not None:
+                result['aviso_log'] = f"Dados gravados, mas o log de alterações não foi atualizado: {log_error}"
+            future.set_result(result)
+
+        if alert_jobs:
+            entries = [entry for _, job_entries, _ in alert_jobs for entry in job_entries]
+            _resolve_all(alert_jobs, alerts.append_alert_log_entries, entries)
+
+    def close(self, timeout=None):
+        """Grava os pedidos pendentes e encerra a thread"""
+        with self._lock:
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+
+def _commit_cell_updates(jobs, completed):
+    """Grava os pedidos de alteração de células; retorna as entradas do log dos gravados
+
+    Os pedidos gravados são acrescentados a completed como (Future, resultado),
+    para serem resolvidos depois da gravação do log de alterações.
+    """
+    try:
+        signature = file_signature()
+        storage.update_cells([update for _, (updates, _), _ in jobs for update in updates])
+    except Exception as e:
+        if len(jobs) == 1:
+            logger.error("Erro ao gravar %d alteração(ões) de células: %s", len(jobs[0][1][0]), e)
+            jobs[0][2].set_exception(e)
+            return []
+        # Gravar os pedidos um a um para isolar o que falhou
+        return [entry for job in jobs for entry in _commit_cell_updates([job], completed)]
+
+    _publish_updates([update for _, (updates, _), _ in jobs for update in updates], signature)
+    entries = []
+    for _, (updates, usuario), future in jobs:
+        entries.extend(_cell_change_entries(updates, usuario))
+        completed.append((future, {'celulas': len(updates)}))
+    return entries
+
+
+def _cell_change_entries(updates, usuario):
+    """Entradas do log de alterações para células corrigidas (uma por célula)"""
+    return [
+        changelog.make_change_log_entry(
+            equipamento=update['EQUIPAMENTO'],
+            variavel=update['variavel'],
+            valor_anterior=update['valor_anterior'],
+            novo_valor=update['novo_valor'],
+            usuario=usuario
+        )
+        for update in updates
+    ]
+
+
+def _reading_change_entries(records, usuario):
+    """Entradas do log de alterações para leituras novas (sem valor anterior)"""
+    return [
+        changelog.make_change_log_entry(
+            equipamento=record['EQUIPAMENTO'],
+            variavel=var,
+            valor_anterior=None,
+            novo_valor=record[var],
+            usuario=usuario
+        )
+        for record in records
+        for var in MEASURED_VARIABLES
+    ]
+
+
+def _publish(records, signature):
+    """Publica o lote gravado no conjunto de dados compartilhado das sessões"""
+    try:
+        get_dataset().publish(records, signature)
+    except Exception as e:
+        logger.error("Erro ao publicar lote no conjunto compartilhado: %s", e)
+
+
+def _publish_updates(updates, signature):
+    """Publica as células alteradas no conjunto de dados compartilhado das sessões"""
+    try:
+        get_dataset().publish_updates(updates, signature)
+    except Exception as e:
+        logger.error("Erro ao publicar alterações no conjunto compartilhado: %s", e)
+
+
+def _resolve_all(jobs, commit, entries):
+    """Executa uma gravação em lote e resolve os Futures dos pedidos; retorna o erro ou None"""
+    try:
+        commit(entries)
+    except Exception as e:
+        logger.error("Erro ao gravar lote de %d entrada(s): %s", len(entries), e)
+        for _, _, future in jobs:
+            future.set_exception(e)
+        return e
+    for _, job_entries, future in jobs:
+        future.set_result(len(job_entries))
+    return None
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Retorna o escritor único compartilhado por todas as sessões do processo"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = IngestWriter()
+        return _writer